@@ -6,7 +6,9 @@ import glob
 import json
 import base64
 import posixpath
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import fail
 from flask_sse import sse
 from mutagen.mp4 import MP4
@@ -30,6 +32,7 @@ from metadata_helpers import (
 
 from history import HistoryLogger
 from cache import LibraryCache
+from image_proxy import ImageProxyCache
 from flask_bootstrap import Bootstrap5
 from mutagen import File as MutagenFile
 from downloader import download_manager
@@ -48,6 +51,11 @@ CONFIG_DIR = str(get_config_dir())
 PREFS_FILE = str(get_config_dir() / "preferences.json")
 AUDIO_EXTENSIONS = (".mp3", ".flac", ".wav", ".ogg", ".m4a")
 LIBRARY_CACHE = LibraryCache()
+# The name index of the current audio dir, apart from the LRU of listings
+NAME_INDEX_CACHE = LibraryCache(max_size=1)
+IMAGE_PROXY = ImageProxyCache(
+    get_cache_dir() / "images", upstream=download_manager.upstream
+)
 
 # progress_tracker = ProgressTracker(CONFIG_DIR)
 app = Flask(__name__)
@@ -139,30 +147,91 @@ def get_lyrics_info(audio_path, lyrics_dir):
     }
 
 
-def resolve_playlist_entry(entry, playlist_dir, audio_dir):
-    entry = entry.strip()
+def get_name_index(audio_dir, refresh=False):
+    """
+    basename -> path for every audio file under audio_dir, built once per
+    library snapshot and kept in NAME_INDEX_CACHE. The first file found wins,
+    matching the order os.walk would have found it in.
+    """
+    key = NAME_INDEX_CACHE.get_cache_key(audio_dir, "names")
+    cached = None if refresh else NAME_INDEX_CACHE.get(key)
+    if cached is None:
+        index = {}
+        dir_mtimes = {}
+        for root, _, files in os.walk(audio_dir):
+            try:
+                dir_mtimes[root] = os.path.getmtime(root)
+            except OSError:
+                pass
+            for f in files:
+                if f.lower().endswith(AUDIO_EXTENSIONS):
+                    index.setdefault(f, os.path.join(root, f))
+        cached = {"index": index, "dir_mtimes": dir_mtimes}
+        NAME_INDEX_CACHE.set(key, cached)
+    return cached
 
-    if not entry or entry.startswith("#"):
-        return None
 
-    # Expand env & user
-    entry = os.path.expanduser(os.path.expandvars(entry))
+def name_index_changed(names):
+    """Whether a directory of the index snapshot was modified since (added, moved or removed files)"""
+    for directory, mtime in names["dir_mtimes"].items():
+        try:
+            if os.path.getmtime(directory) != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def resolve_playlist_entries(lines, playlist_dir, audio_dir):
+    """Resolve every playlist line to an existing audio path, in order"""
+    names = None
+    revalidated = False
+    resolved = []
+
+    for line in lines:
+        entry = line.strip()
+
+        if not entry or entry.startswith("#"):
+            continue
 
-    # 1. Absolute path
-    if os.path.isabs(entry):
-        return entry if os.path.isfile(entry) else None
+        # Expand env & user
+        entry = os.path.expanduser(os.path.expandvars(entry))
 
-    # 2. Relative to playlist file
-    rel_to_playlist = os.path.join(playlist_dir, entry)
-    if os.path.isfile(rel_to_playlist):
-        return rel_to_playlist
+        # 1. Absolute path
+        if os.path.isabs(entry):
+            if os.path.isfile(entry):
+                resolved.append(entry)
+            continue
 
-    # 3. Filename only → relative to audio dir (recursive search)
-    for root, _, files in os.walk(audio_dir):
-        if os.path.basename(entry) in files:
-            return os.path.join(root, os.path.basename(entry))
+        # 2. Relative to playlist file
+        rel_to_playlist = os.path.join(playlist_dir, entry)
+        if os.path.isfile(rel_to_playlist):
+            resolved.append(rel_to_playlist)
+            continue
 
-    return None
+        # 3. Filename only → looked up in the audio dir index
+        if names is None:
+            names = get_name_index(audio_dir)
+        name = os.path.basename(entry)
+        path = names["index"].get(name)
+
+        # A miss or a moved file may mean the snapshot is old: check the
+        # directory mtimes, at most once per call, and rescan if they changed
+        if (not path or not os.path.isfile(path)) and not revalidated:
+            revalidated = True
+            if name_index_changed(names):
+                names = get_name_index(audio_dir, refresh=True)
+                path = names["index"].get(name)
+
+        if path and os.path.isfile(path):
+            resolved.append(path)
+
+    return resolved
+
+
+def resolve_playlist_entry(entry, playlist_dir, audio_dir):
+    resolved = resolve_playlist_entries([entry], playlist_dir, audio_dir)
+    return resolved[0] if resolved else None
 
 
 def format_bytes(size):
@@ -385,6 +454,7 @@ def start_download():
         {
             "download_id": download_id,
             "message": "Download started",
+            "queue_position": download_manager.jobs.position(download_id),
             "audio_dir": audio_dir,
             "lyrics_dir": lyrics_dir,
             "playlist_dir": playlist_dir,
@@ -447,6 +517,7 @@ def retry_failed_bulk():
             "status": "started",
             "download_id": download_id,
             "count": len(entries),
+            "queue_position": download_manager.jobs.position(download_id),
         }
     )
 
@@ -491,7 +562,13 @@ def retry_failed():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    return jsonify({"status": "started", "download_id": download_id})
+    return jsonify(
+        {
+            "status": "started",
+            "download_id": download_id,
+            "queue_position": download_manager.jobs.position(download_id),
+        }
+    )
 
 
 @app.route("/migrate/start", methods=["POST"])
@@ -502,6 +579,7 @@ def start_migration():
     playlist_dir = data.get("playlist_dir", "Downloads/playlists")
     match_perc = data.get("match_perc", "85")
     fallback = data.get("fallback", "manual")
+    offline = data.get("offline", False)
     save_logs = data.get("save_logs", app.config["SAVE_LOGS"])
 
     audio_dir = expand_path(audio_dir)
@@ -530,28 +608,73 @@ def start_migration():
         migrate_dir,
         save_logs=save_logs,
         log_queue=log_queue,
+        offline=offline,
     )
 
-    return jsonify({"migration_id": migration_id})
+    return jsonify(
+        {
+            "migration_id": migration_id,
+            "queue_position": download_manager.jobs.position(migration_id),
+        }
+    )
 
 
 @app.route("/migrate/choice", methods=["POST"])
 def migrate_choice():
+    """Answer one, several or all queued migration choices"""
     data = request.get_json()
-    migration_id = data["migration_id"]
-    video_id = data.get("video_id")  # None = skip
-    action = data["action"]
+    store = download_manager.get_pending_choices(str(get_migration_dir()))
+
+    if data.get("all"):
+        # Bulk action over the whole queue (optionally one migration only)
+        choices = [
+            {"choice_id": choice_id, "action": data.get("action", "skip")}
+            for choice_id in store.ids(data.get("migration_id"))
+        ]
+    elif "choices" in data:
+        choices = data["choices"]
+    elif data.get("choice_id"):
+        choices = [data]
+    else:
+        return jsonify({"error": "No pending choice"}), 400
 
-    mgr = download_manager
+    results = [
+        download_manager.resolve_migration_choice(
+            choice["choice_id"], choice.get("action", "skip"), choice.get("video_id")
+        )
+        for choice in choices
+    ]
 
-    if migration_id not in mgr.migration_choices:
-        return jsonify({"error": "No pending choice"}), 400
+    if len(results) == 1 and not data.get("all") and "choices" not in data:
+        if results[0]["status"] == "missing":
+            return jsonify({"error": "No pending choice"}), 400
+        return jsonify({**results[0], "pending": store.count()})
 
-    mgr.migration_choices[migration_id]["action"] = action
-    mgr.migration_choices[migration_id]["video_id"] = video_id
-    mgr.migration_choices[migration_id]["event"].set()
+    return jsonify({"results": results, "pending": store.count()})
 
-    return jsonify({"status": "ok"})
+
+@app.route("/migrate/pending", methods=["GET"])
+def migrate_pending():
+    """Page through migration files waiting for a manual choice"""
+    try:
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", 30))
+        migration_id = request.args.get("migration_id")
+
+        store = download_manager.get_pending_choices(str(get_migration_dir()))
+        items, total = store.list(offset, limit, migration_id)
+
+        return jsonify(
+            {
+                "items": items,
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+                "hasMore": offset + limit < total,
+            }
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 @app.route("/logs/<download_id>")
@@ -681,6 +804,46 @@ def list_playlists():
     return jsonify(playlists)
 
 
+PLAYLIST_TOTALS_INFLIGHT = set()
+PLAYLIST_TOTALS_LOCK = threading.Lock()
+PLAYLIST_TOTALS_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="playlist-totals")
+
+
+def compute_playlist_totals(playlist_key, cached_data):
+    """Fill size/duration totals of a cached playlist in the background"""
+    with PLAYLIST_TOTALS_LOCK:
+        if playlist_key in PLAYLIST_TOTALS_INFLIGHT:
+            return
+        PLAYLIST_TOTALS_INFLIGHT.add(playlist_key)
+
+    def worker():
+        try:
+            total_size = 0
+            total_duration = 0
+            for path in cached_data["resolved_paths"]:
+                try:
+                    size, duration = get_audio_stats(path)
+                except OSError:
+                    continue
+                total_size += size
+                total_duration += duration
+
+            # Published as a new entry, and only if the playlist was not
+            # resolved again meanwhile
+            LIBRARY_CACHE.replace(
+                playlist_key,
+                cached_data,
+                {**cached_data, "total_size": total_size, "total_duration": total_duration},
+            )
+        except Exception as e:
+            print(f"Error computing playlist totals: {e}")
+        finally:
+            with PLAYLIST_TOTALS_LOCK:
+                PLAYLIST_TOTALS_INFLIGHT.discard(playlist_key)
+
+    PLAYLIST_TOTALS_POOL.submit(worker)
+
+
 @app.route("/playlist/<name>", methods=["GET"])
 def load_playlist(name):
     try:
@@ -708,6 +871,7 @@ def load_playlist(name):
         # Clear cache if reset requested
         if reset:
             LIBRARY_CACHE.invalidate(playlist_key)
+            NAME_INDEX_CACHE.invalidate(NAME_INDEX_CACHE.get_cache_key(audio_dir, "names"))
 
         # Check cache
         cached_data = LIBRARY_CACHE.get(playlist_key)
@@ -715,37 +879,28 @@ def load_playlist(name):
             # Cache is valid
             resolved_paths = cached_data["resolved_paths"]
             used_cache = True
-            total_size = cached_data["total_size"]
-            total_duration = cached_data["total_duration"]
         else:
             # Need to resolve playlist
             playlist_base_dir = os.path.dirname(playlist_path)
-            resolved_paths = []
-            total_size = 0
-            total_duration = 0
 
             with open(playlist_path, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    resolved = resolve_playlist_entry(
-                        line, playlist_base_dir, audio_dir
-                    )
-                    if resolved and os.path.exists(resolved):
-                        resolved_paths.append(resolved)
-                        size, duration = get_audio_stats(resolved)
-                        total_size += size
-                        total_duration += duration
+                resolved_paths = resolve_playlist_entries(
+                    f, playlist_base_dir, audio_dir
+                )
 
-            # Cache the resolved playlist
-            LIBRARY_CACHE.set(
-                playlist_key,
-                {
-                    "resolved_paths": resolved_paths,
-                    "total_size": total_size,
-                    "total_duration": total_duration,
-                    "playlist_mtime": playlist_mtime,
-                    "cache_time": time.time(),
-                },
-            )
+            # Cache the resolved playlist; totals are filled in later
+            cached_data = {
+                "resolved_paths": resolved_paths,
+                "total_size": None,
+                "total_duration": None,
+                "playlist_mtime": playlist_mtime,
+                "cache_time": time.time(),
+            }
+            LIBRARY_CACHE.set(playlist_key, cached_data)
+
+        totals_pending = cached_data["total_size"] is None
+        if totals_pending:
+            compute_playlist_totals(playlist_key, cached_data)
 
         total = len(resolved_paths)
         slice_paths = resolved_paths[offset : offset + limit]
@@ -787,8 +942,11 @@ def load_playlist(name):
                 "limit": limit,
                 "total": total,
                 "hasMore": offset + limit < total,
-                "total_size": format_bytes(total_size),
-                "total_duration": format_duration_human(total_duration),
+                "total_size": format_bytes(cached_data["total_size"]),
+                "total_duration": None
+                if totals_pending
+                else format_duration_human(cached_data["total_duration"]),
+                "totals_pending": totals_pending,
                 "cached": used_cache,
                 "cache_age": cache_age,
             }
@@ -798,11 +956,36 @@ def load_playlist(name):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/playlist/<name>/totals", methods=["GET"])
+def playlist_totals(name):
+    """Size/duration totals of a playlist loaded through /playlist/<name>"""
+    audio_dir = expand_path(request.args.get("audioDir", "Downloads"))
+    playlist_dir = expand_path(request.args.get("playlistDir", "Downloads/playlists"))
+
+    playlist_path = os.path.join(playlist_dir, name)
+    cached_data = LIBRARY_CACHE.get(f"playlist:{playlist_path}:{audio_dir}")
+    if not cached_data:
+        return jsonify({"error": "Playlist not loaded"}), 404
+
+    if cached_data["total_size"] is None:
+        compute_playlist_totals(f"playlist:{playlist_path}:{audio_dir}", cached_data)
+        return jsonify({"pending": True})
+
+    return jsonify(
+        {
+            "pending": False,
+            "total_size": format_bytes(cached_data["total_size"]),
+            "total_duration": format_duration_human(cached_data["total_duration"]),
+        }
+    )
+
+
 @app.route("/library", methods=["GET"])
 def library():
     try:
         audio_dir = request.args.get("dir")
         lyrics_dir = request.args.get("lyricsDir", "Downloads/lyrics")
+        playlist_dir = request.args.get("playlistDir")
         offset = int(request.args.get("offset", 0))
         limit = int(request.args.get("limit", 30))
         reset = request.args.get("reset", "false").lower() == "true"
@@ -877,6 +1060,11 @@ def library():
         all_files = cached_data["files"]
         slice_files = all_files[offset : offset + limit]
 
+        # Playlist membership comes from the shared reverse index
+        playlist_index = download_manager.playlist_index
+        if playlist_dir:
+            playlist_index.scan(expand_path(playlist_dir))
+
         items = []
         for path in slice_files:
             # Check metadata cache first
@@ -899,6 +1087,11 @@ def library():
                     "path": path,
                     "quality": "—",
                     "type": "local",
+                    "playlists": [
+                        os.path.basename(p) for p in playlist_index.playlists_for(path)
+                    ]
+                    if playlist_dir
+                    else [],
                 }
             )
 
@@ -930,11 +1123,16 @@ def invalidate_cache():
     try:
         data = request.json
         cache_key = data.get("key")
-        if cache_key:
+        if cache_key == "search":
+            download_manager.search_cache.clear()
+            return jsonify({"message": "Search cache cleared"})
+        elif cache_key:
             LIBRARY_CACHE.invalidate(cache_key)
+            NAME_INDEX_CACHE.invalidate(cache_key)
             return jsonify({"message": f"Cache {cache_key} invalidated"})
         else:
             LIBRARY_CACHE.clear()
+            NAME_INDEX_CACHE.clear()
             return jsonify({"message": "All cache cleared"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -951,11 +1149,41 @@ def cache_status():
                 "cached_keys": list(LIBRARY_CACHE.cache.keys()),
                 "max_size": LIBRARY_CACHE.max_size,
             }
+        cache_info["image_cache"] = IMAGE_PROXY.stats()
+        cache_info["search_cache"] = download_manager.search_cache.stats()
+        cache_info["retry"] = download_manager.retry_engine.stats()
         return jsonify(cache_info)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/bandwidth", methods=["GET"])
+def get_bandwidth():
+    """Download bandwidth caps and the downloads currently sharing them"""
+    return jsonify(download_manager.bandwidth.status())
+
+
+@app.route("/bandwidth", methods=["POST"])
+def set_bandwidth():
+    """Change the global and/or per-job caps (bytes per second, 0 = unlimited)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(
+            download_manager.bandwidth.configure(
+                global_limit=data.get("global_limit"),
+                job_limits=data.get("job_limits"),
+            )
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid limit: {str(e)}"}), 400
+
+
+@app.route("/upstream/status", methods=["GET"])
+def upstream_status():
+    """Request budgets shared by every call to YouTube, YTMusic and image hosts"""
+    return jsonify(download_manager.upstream.stats())
+
+
 # Add cache invalidation when files are downloaded
 def invalidate_cache_on_download(audio_dir):
     """Invalidate cache when new files are downloaded"""
@@ -1088,24 +1316,23 @@ def update_metadata():
 def proxy_image():
     """Proxy image requests to avoid CORS issues"""
     try:
-        import requests
-
         url = request.args.get("url")
         if not url:
             return "", 400
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-
-        response = requests.get(url, headers=headers, stream=True, timeout=10)
-        response.raise_for_status()
+        cached = IMAGE_PROXY.get(url)
+        if not cached:
+            return "", 404
 
-        # Return the image with appropriate headers
+        # Stream from the on-disk cache copy
+        entry, handle = cached
         return Response(
-            response.iter_content(chunk_size=8192),
-            content_type=response.headers.get("content-type", "image/jpeg"),
-            headers={"Cache-Control": "public, max-age=86400"},
+            IMAGE_PROXY.iter_file(handle, entry),
+            content_type=entry["content_type"],
+            headers={
+                "Cache-Control": f"public, max-age={IMAGE_PROXY.max_age(entry)}",
+                "Content-Length": str(entry["size"]),
+            },
         )
     except Exception as e:
         print(f"Error proxying image: {e}")
@@ -1171,13 +1398,95 @@ def fix_playlist():
                 "status": "started",
                 "download_id": operation_id,
                 "message": "Playlist fix operation started",
+                "queue_position": download_manager.jobs.position(operation_id),
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.before_request
+def start_background_services():
+    """
+    Start the playlist sync loop and the log buffer reaper, and re-queue
+    operations left unfinished by the previous run, in the process that
+    serves requests
+    """
+    download_manager.sync_scheduler.start(
+        history_dir=str(get_history_dir()), fail_dir=str(get_fail_dir())
+    )
+    download_manager.log_reaper.start()
+    recovered = download_manager.recover_jobs()
+    if recovered:
+        print(f"Recovered {len(recovered)} unfinished job(s): {', '.join(recovered)}")
+
+
+@app.route("/sync/subscriptions", methods=["GET"])
+def list_sync_subscriptions():
+    try:
+        return jsonify(
+            {
+                "subscriptions": download_manager.sync_scheduler.list(),
+                "status": download_manager.sync_scheduler.status(),
             }
         )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sync/subscriptions", methods=["POST"])
+def add_sync_subscription():
+    try:
+        data = request.json
+        url = data.get("url")
+        if not url:
+            return jsonify({"error": "Missing playlist URL"}), 400
+
+        subscription = download_manager.sync_scheduler.subscribe(
+            url=url,
+            interval_minutes=data.get("interval_minutes", 360),
+            audio_dir=expand_path(data.get("audio_dir", "Downloads")),
+            lyrics_dir=expand_path(data.get("lyrics_dir", "Downloads/lyrics")),
+            playlist_dir=expand_path(data.get("playlist_dir", "Downloads/playlists")),
+            playlist_options=data.get("playlist_options", {}),
+            mpd_options=data.get("mpd_options", {}),
+        )
+        return jsonify({"subscription": subscription})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
+@app.route("/sync/subscriptions/<subscription_id>", methods=["POST"])
+def update_sync_subscription(subscription_id):
+    try:
+        data = request.json or {}
+        fields = {k: data[k] for k in ("interval_minutes", "enabled") if k in data}
+        subscription = download_manager.sync_scheduler.update(subscription_id, **fields)
+        if not subscription:
+            return jsonify({"error": "Subscription not found"}), 404
+        return jsonify({"subscription": subscription})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/sync/subscriptions/<subscription_id>", methods=["DELETE"])
+def delete_sync_subscription(subscription_id):
+    if not download_manager.sync_scheduler.unsubscribe(subscription_id):
+        return jsonify({"error": "Subscription not found"}), 404
+    return jsonify({"success": True})
+
+
+@app.route("/sync/run", methods=["POST"])
+def run_sync():
+    """Sync one subscription (or all of them) now"""
+    data = request.get_json(silent=True) or {}
+    queued = download_manager.sync_scheduler.sync_now(data.get("id"))
+    if data.get("id") and not queued:
+        return jsonify({"error": "Subscription not found"}), 404
+    return jsonify({"queued": queued})
+
+
 @app.route("/logs/settings", methods=["GET", "POST"])
 def logs_settings():
     """Get or set log saving settings"""
@@ -1275,6 +1584,7 @@ def start_move_copy():
     update_playlists = data.get("update_playlists", True)
     mode = data.get("mode", "move")   # "move" or "copy"
     save_logs = data.get("save_logs", app.config["SAVE_LOGS"])
+    dry_run = data.get("dry_run", False)
 
     # Expand paths
     source_audio = expand_path(source_audio)
@@ -1284,6 +1594,26 @@ def start_move_copy():
     dest_lyrics = expand_path(dest_lyrics)
     dest_playlists = expand_path(dest_playlists)
 
+    # Planning only: report what would happen without touching anything
+    if dry_run:
+        try:
+            plan = download_manager.plan_move_copy(
+                source_audio=source_audio,
+                source_lyrics=source_lyrics,
+                source_playlists=source_playlists,
+                dest_audio=dest_audio,
+                dest_lyrics=dest_lyrics,
+                dest_playlists=dest_playlists,
+                process_audio=process_audio,
+                process_lyrics=process_lyrics,
+                process_playlists=process_playlists,
+                update_playlists=update_playlists,
+                mode=mode,
+            )
+            return jsonify({"plan": plan})
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     # Ensure destination directories exist
     for d in [dest_audio, dest_lyrics, dest_playlists]:
         os.makedirs(d, exist_ok=True)
@@ -1312,7 +1642,71 @@ def start_move_copy():
         log_queue=log_queue,
     )
 
-    return jsonify({"operation_id": operation_id})
+    return jsonify(
+        {
+            "operation_id": operation_id,
+            "queue_position": download_manager.jobs.position(operation_id),
+        }
+    )
+
+
+@app.route("/jobs", methods=["GET"])
+def list_jobs():
+    """Queued, running and recently finished operations"""
+    return jsonify(
+        {
+            "jobs": download_manager.jobs.list(),
+            "status": download_manager.jobs.status(),
+            "logs": download_manager.log_reaper.stats(),
+            "transcode": download_manager.transcoder.stats(),
+        }
+    )
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = download_manager.jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job": job})
+
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Drop a queued job, or stop a running one at its next checkpoint"""
+    state = download_manager.jobs.cancel(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    if state not in ("cancelled", "cancelling"):
+        return jsonify({"error": f"Job is already {state}"}), 409
+    return jsonify({"success": True, "state": state})
+
+
+@app.route("/jobs/<job_id>/pause", methods=["POST"])
+def pause_job(job_id):
+    state = download_manager.jobs.pause(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    if state != "paused":
+        return jsonify({"error": f"Job is {state}, only running jobs can be paused"}), 409
+    return jsonify({"success": True, "state": state})
+
+
+@app.route("/jobs/<job_id>/resume", methods=["POST"])
+def resume_job(job_id):
+    """Continue a paused job, or run a cancelled/failed one again"""
+    state = download_manager.resume_job(job_id)
+    if state is None:
+        return jsonify({"error": "Job not found"}), 404
+    if state not in ("running", "queued"):
+        return jsonify({"error": f"Job is {state} and cannot be resumed"}), 409
+    return jsonify(
+        {
+            "success": True,
+            "state": state,
+            "queue_position": download_manager.jobs.position(job_id),
+        }
+    )
 
 if __name__ == "__main__":
     app.run(debug=True)
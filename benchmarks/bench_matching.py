@@ -0,0 +1,124 @@
+"""
+Compare the migration matcher against the previous SequenceMatcher scorer.
+
+Usage: python benchmarks/bench_matching.py [--repeat N]
+
+Reports top-1 accuracy, false accepts (a wrong result clearing the
+threshold) and time per local file on benchmarks/matching_corpus.json.
+Matching caches are cleared before each timed pass, so times are the
+cost of scoring a file the matcher has not seen yet.
+"""
+
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from pathlib import Path
+from difflib import SequenceMatcher
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS = Path(__file__).resolve().parent / "matching_corpus.json"
+
+# Load downloader/matching.py directly so the benchmark does not need
+# yt-dlp/ytmusicapi (imported by the downloader package)
+spec = importlib.util.spec_from_file_location(
+    "matching", ROOT / "downloader" / "matching.py"
+)
+matching = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(matching)
+
+
+def legacy_filter_song_matches(results, target_title, target_artist):
+    """The scorer used by migration before downloader/matching.py"""
+    target_artist_parts = [p.strip().lower() for p in target_artist.split(",")]
+
+    scored = []
+    for r in results:
+        result_artists = [a["name"].lower() for a in r.get("artists", [])]
+        matching_parts = sum(
+            1
+            for part in target_artist_parts
+            if any(part in artist or artist in part for artist in result_artists)
+        )
+        if matching_parts == 0:
+            continue
+
+        score = SequenceMatcher(None, target_title, r.get("title", "")).ratio()
+        ratio = matching_parts / len(target_artist_parts)
+        scored.append((score * (0.7 + 0.3 * ratio), r))
+
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+def clear_caches():
+    """Drop the memoized title/artist features of downloader/matching.py"""
+    for cached in (matching.normalize_text, matching.clean_title, matching.split_artists):
+        cached.cache_clear()
+
+
+def evaluate(name, scorer, cases, threshold, repeat):
+    correct = false_accepts = missed = 0
+    failures = []
+
+    for case in cases:
+        scored = scorer(case["results"], case["title"], case["artist"])
+        top = scored[0] if scored else None
+        accepted = top if top and top[0] >= threshold else None
+        picked = accepted[1]["videoId"] if accepted else None
+
+        if picked == case["expected"]:
+            correct += 1
+            continue
+        if picked is not None:
+            false_accepts += 1
+        else:
+            missed += 1
+        failures.append((case["note"], case["expected"], picked, top[0] if top else None))
+
+    elapsed = 0.0
+    for _ in range(repeat):
+        # Every pass starts cold; a migration scores each local file once
+        clear_caches()
+        start = time.perf_counter()
+        for case in cases:
+            scorer(case["results"], case["title"], case["artist"])
+        elapsed += time.perf_counter() - start
+    per_file_us = elapsed / (repeat * len(cases)) * 1e6
+
+    print(f"{name}")
+    print(f"  top-1 accuracy : {correct}/{len(cases)} ({correct / len(cases):.0%})")
+    print(f"  false accepts  : {false_accepts}")
+    print(f"  missed         : {missed}")
+    print(f"  time per file  : {per_file_us:.1f} µs")
+    for note, expected, picked, score in failures:
+        score = f"{score:.2f}" if score is not None else "-"
+        print(f"    x {note}: expected {expected}, got {picked} (top score {score})")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(CORPUS, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    cases = corpus["cases"]
+    threshold = corpus.get("threshold", 0.85)
+
+    print(f"{len(cases)} cases, threshold {threshold}\n")
+    evaluate("legacy (SequenceMatcher)", legacy_filter_song_matches, cases, threshold, args.repeat)
+    evaluate(
+        "matching.score_candidates",
+        lambda results, title, artist: matching.score_candidates(title, artist, results),
+        cases,
+        threshold,
+        args.repeat,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
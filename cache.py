@@ -43,6 +43,14 @@ class LibraryCache:
                     self.cache.popitem(last=False)  # Remove least recently used
                 self.cache[key] = value
 
+    def replace(self, key, expected, value):
+        """Swap in value only if key still holds expected; returns whether it did"""
+        with self.lock:
+            if self.cache.get(key) is not expected:
+                return False
+            self.cache[key] = value
+            return True
+
     def invalidate(self, key):
         """Remove item from cache"""
         with self.lock:
@@ -0,0 +1,163 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+
+class BandwidthController:
+    """
+    Splits a global download bandwidth cap fairly between running jobs.
+
+    Each yt-dlp download asks for a slot; its limit is the job's max-min fair
+    share of the global cap among jobs with downloads in flight (a job capped
+    below an equal share leaves the rest to the others), divided between
+    that job's parallel downloads. Limits are in bytes per second, 0 meaning
+    unlimited. yt-dlp fixes its rate when it starts, so a change applies to
+    the downloads started after it.
+
+    A granted limit stays reserved until its download ends, and a new
+    download never gets more than the cap left over by the running ones:
+    the limits in flight never add up to more than the global cap or a
+    job's cap. A download waits while less than half its share is free.
+    """
+
+    def __init__(self, path, global_limit=0):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)
+        self.global_limit = global_limit
+        self.job_limits = {}  # job id -> bytes per second
+        self.active = {}  # job id -> downloads in flight
+        self.reserved = {}  # job id -> sum of the limits in flight
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+            self.global_limit = int(settings.get("global_limit") or 0)
+            self.job_limits = {
+                job_id: int(limit)
+                for job_id, limit in settings.get("job_limits", {}).items()
+                if limit
+            }
+        except Exception as e:
+            print(f"Error loading bandwidth settings: {e}")
+
+    def _save(self):
+        """Write atomically (lock must be held)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"global_limit": self.global_limit, "job_limits": self.job_limits},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+    # ---------- settings ----------
+
+    def configure(self, global_limit=None, job_limits=None):
+        """Change the global cap and/or per-job caps (0 or None removes a job cap)"""
+        with self.lock:
+            if global_limit is not None:
+                self.global_limit = max(0, int(global_limit))
+            for job_id, limit in (job_limits or {}).items():
+                if limit:
+                    self.job_limits[job_id] = max(0, int(limit))
+                else:
+                    self.job_limits.pop(job_id, None)
+            self._save()
+            self.released.notify_all()
+        return self.status()
+
+    def forget(self, job_id):
+        """Drop the cap of a job that will not run again"""
+        with self.lock:
+            if self.job_limits.pop(job_id, None) is not None:
+                self._save()
+
+    # ---------- downloads ----------
+
+    def _limit_for(self, job_id):
+        """
+        Per-download limit for one more download of job_id, or None if it
+        has to wait for bandwidth to be released (lock must be held)
+        """
+        share = self._shares(set(self.active) | {job_id})[job_id]
+        if not share:
+            return 0
+        share = max(1, share // (self.active.get(job_id, 0) + 1))
+
+        free = []
+        if self.global_limit:
+            free.append(self.global_limit - sum(self.reserved.values()))
+        if self.job_limits.get(job_id):
+            free.append(self.job_limits[job_id] - self.reserved.get(job_id, 0))
+        available = min(free)
+        if available < max(1, share // 2):
+            return None
+        return min(share, available)
+
+    def _shares(self, jobs):
+        """Max-min fair split of the global cap between jobs (lock must be held)"""
+        if not self.global_limit:
+            return {job_id: self.job_limits.get(job_id, 0) for job_id in jobs}
+
+        shares = {}
+        remaining = self.global_limit
+        pending = sorted(jobs, key=lambda j: self.job_limits.get(j) or float("inf"))
+        while pending:
+            equal = remaining // len(pending)
+            job_id = pending[0]
+            cap = self.job_limits.get(job_id) or 0
+            if cap and cap < equal:
+                # Capped below its share: the rest goes to the other jobs
+                shares[job_id] = cap
+                remaining -= cap
+                pending.pop(0)
+            else:
+                for other in pending:
+                    shares[other] = equal
+                break
+        return shares
+
+    @contextmanager
+    def slot(self, job_id, checkpoint=None):
+        """
+        Hold a download slot for job_id; yields its limit in bytes per second.
+        checkpoint is called while waiting for bandwidth and may raise.
+        """
+        while True:
+            with self.lock:
+                limit = self._limit_for(job_id)
+                if limit is not None:
+                    self.active[job_id] = self.active.get(job_id, 0) + 1
+                    self.reserved[job_id] = self.reserved.get(job_id, 0) + limit
+                    break
+                self.released.wait(timeout=0.5)
+            if checkpoint:
+                checkpoint()
+        try:
+            yield limit
+        finally:
+            with self.lock:
+                self.active[job_id] -= 1
+                self.reserved[job_id] -= limit
+                if not self.active[job_id]:
+                    del self.active[job_id]
+                    del self.reserved[job_id]
+                self.released.notify_all()
+
+    def status(self):
+        with self.lock:
+            return {
+                "global_limit": self.global_limit,
+                "job_limits": dict(self.job_limits),
+                "active": dict(self.active),
+                "reserved": dict(self.reserved),
+                "shares": self._shares(set(self.active)),
+            }
@@ -12,30 +12,66 @@ from pathlib import Path
 from queue import Queue, Empty
 from .metadata import MetadataManager
 from .lyrics import LyricsManager
-from .playlist import PlaylistManager
+from .playlist import (
+    M3UPlaylist,
+    PlaylistManager,
+    PlaylistRenameBatch,
+    write_lines_atomic,
+)
+from .playlist_index import PlaylistIndex
+from .transfer import TransferEngine, journal_key, storage_workers
+from .sync import PlaylistSyncScheduler, SharedDownloads
+from .jobs import JobCancelled, JobScheduler, new_session_kwargs
+from .job_store import JobStore
+from .log_buffer import EntryLog, LogBuffer, LogReaper
+from .retry import FormatCache, RetryEngine, video_key
 from .thumbnail import ThumbnailManager
 from .mpd_manager import MPDManager
 from history import HistoryLogger
-from migration import MigrationLogger
+from migration import MigrationLogger, PendingChoiceStore
 from fail import FailLogger
 from logs import LogManager
 from ytmusicapi import YTMusic
 from mutagen.id3 import ID3, APIC
 from mutagen import File as MutagenFile
-from difflib import SequenceMatcher
 from progress_tracker import ProgressTracker
 from .utils import get_extension, get_quality_setting
-from collections import defaultdict
+from .matching import score_candidates
+from .ratelimit import UPSTREAM, THROTTLE_PATTERN
+from .bandwidth import BandwidthController
+from .transcode import TranscodePool, ffmpeg_commands
+from .search_cache import SearchCache
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, parse_qs
 
 AUDIO_EXTENSIONS = (".mp3", ".flac", ".wav", ".ogg", ".m4a")
+# Files yt-dlp leaves while a fetch is unfinished
+PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp")
+# Log file name of each job type, as the routes start them
+JOB_LOG_TYPES = {
+    "download": "download",
+    "retry": "retrt-failed",
+    "bulk_retry": "retry-failed-in-bulk",
+    "fix_playlist": "playlist",
+    "migration": "migration",
+    "move_copy": "move_copy",
+}
 
 class DownloadManager:
     def __init__(self, output_dir="Downloads"):
         self.log_queues = {}
         self.active_downloads = {}
+        # Log buffers of finished operations are freed after a grace period
+        self.log_reaper = LogReaper(self.log_queues, self.active_downloads)
         self.lock = threading.Lock()
+        # Every operation runs on this pool instead of its own thread, and is
+        # journaled so unfinished ones are started again after a restart
+        self.jobs = JobScheduler(max_workers=3)
+        self.job_store = JobStore(Path.home() / ".local/share/auroradownloader/jobs.db")
+        self.jobs.on_state = self._job_state
+        self.jobs_recovered = False
         self.history_logger = None
         self.fail_logger = None
         self.ytmusic = YTMusic()
@@ -48,13 +84,64 @@ class DownloadManager:
         # Initialize helper classes
         self.metadata_manager = MetadataManager(self.custom_temp_dir)
         self.lyrics_manager = LyricsManager()
-        self.playlist_manager = PlaylistManager()
+        self.playlist_index = PlaylistIndex()
+        self.playlist_manager = PlaylistManager(self.playlist_index)
         self.thumbnail_manager = ThumbnailManager()
         self.mpd_manager = MPDManager()
 
         self.log_manager = LogManager()
 
-        self.migration_choices = {}
+        # Ambiguous migration files wait here for the user (see migration.py)
+        self.pending_choices = None
+        self.migration_apply_lock = threading.Lock()
+
+        # Migration matching: concurrent searches under a shared request rate
+        self.migration_workers = 4
+        self.migration_playlist_checkpoint = 200
+        # Missing tracks downloaded at once by Fix Playlist
+        self.fix_playlist_workers = 3
+        # Bulk retries run this many entries at once (still under the shared
+        # download limit) and drop succeeded entries from the fail store in batches
+        self.bulk_retry_workers = 4
+        self.fail_removal_batch = 50
+        # Track downloads of every Fix Playlist run and playlist sync share
+        # one budget, and a track wanted by several playlists is fetched once
+        self.shared_downloads = SharedDownloads(max_concurrent=3, per_minute=30)
+        self.sync_scheduler = PlaylistSyncScheduler(
+            self, str(Path.home() / ".local/share/auroradownloader/sync")
+        )
+        self.transfer_journal_dir = str(
+            Path.home() / ".local/share/auroradownloader/transfers"
+        )
+        # Every upstream request (yt-dlp, YTMusic, images) draws from the
+        # shared per-service budgets, which slow down on HTTP 429
+        self.upstream = UPSTREAM
+        # Thumbnails, lyrics and the next playlist entry's metadata are
+        # fetched here while yt-dlp downloads the audio
+        self.prefetch_pool = ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="prefetch"
+        )
+        # Downloads are fetched raw into the staging dir by yt-dlp and then
+        # converted by ffmpeg on the transcode pool (one process per core),
+        # so fetching the next track does not wait for the CPU
+        self.staging_dir = str(Path.home() / ".local/share/auroradownloader/staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.transcoder = TranscodePool()
+        # Playlist entries in flight at once: one transcoding, one fetching
+        self.playlist_pipeline_depth = 2
+        # Global and per-job download bandwidth caps, adjustable at runtime
+        self.bandwidth = BandwidthController(
+            Path.home() / ".local/share/auroradownloader/bandwidth.json"
+        )
+        self._thread_local = threading.local()
+        # Failed downloads are retried with backoff; working formats and
+        # unavailable videos are remembered across retries
+        self.retry_engine = RetryEngine(
+            FormatCache(Path.home() / ".local/share/auroradownloader/format_cache.json")
+        )
+        self.search_cache = SearchCache(
+            Path.home() / '.local/share/auroradownloader/cache/ytmusic_search'
+        )
 
     def _forward_logs(self, source_queue, sse_queue, file_queue):
         """Forward logs to both SSE and file"""
@@ -87,7 +174,8 @@ class DownloadManager:
         log_queue=None,
     ):
         """Start a playlist fix operation in a separate thread"""
-        sse_log_queue = Queue()
+        self._journal_job(operation_id, "fix_playlist", locals())
+        sse_log_queue = LogBuffer()
         self.log_queues[operation_id] = sse_log_queue
         self.active_downloads[operation_id] = True
 
@@ -102,8 +190,10 @@ class DownloadManager:
         else:
             thread_log_queue = sse_log_queue
 
-        thread = threading.Thread(
-            target=self._fix_playlist_thread,
+        self.jobs.submit(
+            operation_id,
+            "fix_playlist",
+            self._fix_playlist_thread,
             args=(
                 url,
                 operation_id,
@@ -119,9 +209,139 @@ class DownloadManager:
                 fail_dir,
                 save_logs,
             ),
-            daemon=True,
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                operation_id, log_queue, save_logs
+            ),
         )
-        thread.start()
+
+    def _job_cancelled(self, job_id, log_queue, save_logs):
+        """Close the log stream of a job cancelled before it started"""
+        log_queue.put("[CANCELLED] Cancelled before it started")
+        if save_logs:
+            self.log_manager.stop_logging(job_id)
+        self.active_downloads.pop(job_id, None)
+        log_queue.put("[END]")
+
+    def _job_state(self, job_id, state):
+        """Scheduler state changes: journal them, drop caps of finished jobs"""
+        self.job_store.set_state(job_id, state)
+        if state == "finished":
+            self.bandwidth.forget(job_id)
+
+    def _journal_job(self, job_id, job_type, arguments):
+        """Save a start_* call's arguments (its locals()) in the job journal"""
+        params = {k: v for k, v in arguments.items() if k not in ("self", "log_queue")}
+        try:
+            self.job_store.record(job_id, job_type, params)
+        except Exception as e:
+            print(f"Error recording job {job_id}: {e}")
+
+    def _job_item(self, log_queue, item, state, detail=None):
+        """Record the state of one item (track, entry, file) of the current job"""
+        job_id = self.jobs.job_id_for(log_queue)
+        if not job_id:
+            return
+        try:
+            self.job_store.set_item(job_id, item, state, detail)
+        except Exception as e:
+            print(f"Error recording job item: {e}")
+
+    def recover_jobs(self):
+        """
+        Queue again the operations that were unfinished when the server
+        stopped; returns their ids. Runs once per process.
+        """
+        with self.lock:
+            if self.jobs_recovered:
+                return []
+            self.jobs_recovered = True
+
+        starters = {
+            "download": self.start_download,
+            "retry": self.retry_failed_entry,
+            "bulk_retry": self.retry_failed_entries,
+            "fix_playlist": self.start_fix_playlist,
+            "migration": self.start_migration,
+            "move_copy": self.start_move_copy,
+        }
+        recovered = []
+        try:
+            self.job_store.cleanup()
+            unfinished = self.job_store.unfinished()
+        except Exception as e:
+            print(f"Error reading job journal: {e}")
+            return recovered
+
+        for job_id, job_type, params in unfinished:
+            if job_type not in starters or job_id in self.active_downloads:
+                continue
+            try:
+                if job_type == "download":
+                    # Continue playlists from their saved progress
+                    params["resume"] = True
+                elif job_type == "bulk_retry":
+                    done = {
+                        item
+                        for item, state in self.job_store.item_states(job_id).items()
+                        if state == "done"
+                    }
+                    params["failed_entries"] = [
+                        e for e in params["failed_entries"] if e.get("url") not in done
+                    ]
+                if params.get("save_logs"):
+                    # The log file of the previous run was closed with it
+                    params["log_queue"] = self.log_manager.start_logging(
+                        job_id, JOB_LOG_TYPES[job_type]
+                    )
+                starters[job_type](**params)
+                recovered.append(job_id)
+            except Exception as e:
+                print(f"Error recovering job {job_id}: {e}")
+                self.job_store.set_state(job_id, "failed")
+
+        return recovered
+
+    def resume_job(self, job_id):
+        """
+        Continue a paused job, or queue a cancelled/failed one again under the
+        same id (it resumes from its own progress: skipped existing files,
+        playlist progress, transfer journal). Returns the job's state.
+        """
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+        if job["state"] == "paused":
+            return self.jobs.resume(job_id)
+        if job["state"] not in ("cancelled", "failed"):
+            return job["state"]
+
+        log_queue = LogBuffer()
+        self.log_queues[job_id] = log_queue
+        self.active_downloads[job_id] = True
+
+        # Jobs that saved their logs keep doing so in a new log file
+        try:
+            params = self.job_store.params(job_id) or {}
+        except Exception as e:
+            print(f"Error reading job {job_id}: {e}")
+            params = {}
+        file_queue = None
+        if params.get("save_logs"):
+            file_queue = self.log_manager.start_logging(
+                job_id, JOB_LOG_TYPES.get(job["type"], job["type"])
+            )
+        if file_queue:
+            combined_queue = Queue()
+            threading.Thread(
+                target=self._forward_logs,
+                args=(combined_queue, log_queue, file_queue),
+                daemon=True,
+            ).start()
+            log_queue = combined_queue
+
+        self.jobs.requeue(job_id, log_queue)
+        return self.jobs.get(job_id)["state"]
 
     def _fix_playlist_thread(
         self,
@@ -138,7 +358,13 @@ class DownloadManager:
         history_dir,
         fail_dir,
         save_logs,
+        known_tracks=None,
     ):
+        """
+        Sync one playlist. known_tracks ({video_id: {"path": ...}}) adds files
+        outside audio_dir that may be referenced instead of downloaded.
+        Returns the results dict, or None if the playlist could not be read.
+        """
         if history_dir:
             self.history_logger = HistoryLogger(history_dir)
 
@@ -154,8 +380,13 @@ class DownloadManager:
             playlist_metadata_cmd = ["yt-dlp", url, "--dump-json", "--flat-playlist"]
 
             log_queue.put("[FIX PLAYLIST] Fetching playlist metadata...")
-            result = subprocess.run(
-                playlist_metadata_cmd, capture_output=True, text=True, check=True
+            result = UPSTREAM.call(
+                "youtube",
+                subprocess.run,
+                playlist_metadata_cmd,
+                capture_output=True,
+                text=True,
+                check=True,
             )
 
             playlist_entries = [
@@ -181,106 +412,77 @@ class DownloadManager:
             local_files_by_id = self.playlist_manager._index_files_by_video_id(
                 local_files
             )
+            for video_id, info in (known_tracks or {}).items():
+                local_files_by_id.setdefault(video_id, info)
+
+            # Diff remote playlist against local files and the M3U
+            playlist = M3UPlaylist(
+                os.path.join(playlist_dir, f"{sanitized_title}.m3u"),
+                self.playlist_index,
+            )
+            diff = self.playlist_manager.diff_playlist(
+                playlist_entries, local_files_by_id, playlist
+            )
+            log_queue.put(
+                f"[FIX PLAYLIST] {len(diff['existing'])} existing, "
+                f"{len(diff['missing'])} missing, {len(diff['removed'])} to remove"
+                + (", out of order" if diff["reordered"] else "")
+            )
 
             # Track operations
             results = {
                 "playlist_title": playlist_title,
                 "total_tracks": len(playlist_entries),
-                "existing_tracks": 0,
+                "existing_tracks": len(diff["existing"]),
                 "downloaded_tracks": 0,
                 "updated_tracks": 0,
-                "removed_tracks": 0,
+                "removed_tracks": len(diff["removed"]),
                 "missing_tracks": 0,
                 "log_entries": [],
             }
 
-            # Process each playlist entry
-            playlist_files = []
+            available = {video_id: path for _, video_id, path in diff["existing"]}
 
-            for i, entry in enumerate(playlist_entries, 1):
-                video_id = entry.get("id")
-                title = entry.get("title", "Unknown")
-
-                log_queue.put(
-                    f"[FIX PLAYLIST] Processing {i}/{len(playlist_entries)}: {title}"
+            if diff["missing"] and options.get("download_missing", True):
+                downloaded = self._download_missing_tracks(
+                    diff["missing"], playlist_title, audio_dir, lyrics_dir, log_queue
                 )
+                available.update(downloaded)
+                results["downloaded_tracks"] = len(downloaded)
+                results["missing_tracks"] = len(diff["missing"]) - len(downloaded)
+            else:
+                results["missing_tracks"] = len(diff["missing"])
+                for _, entry in diff["missing"]:
+                    results["log_entries"].append(f"Missing: {entry.get('title', 'Unknown')}")
 
-                if video_id in local_files_by_id:
-                    # File exists
-                    results["existing_tracks"] += 1
-                    local_file = local_files_by_id[video_id]
-                    playlist_files.append(local_file["path"])
-
-                    log_entry = f"Exists: {title}"
-
-                else:
-                    # File missing, download if requested
-                    if options.get("download_missing", True):
-                        video_url = f"https://www.youtube.com/watch?v={video_id}"
-                        log_queue.put(
-                            f"[FIX PLAYLIST] Downloading missing track: {title}"
-                        )
-
-                        try:
-                            output_file = self._download_video(
-                                video_url,
-                                log_queue,
-                                "best",  # Use default quality
-                                "mp3",  # Use default codec
-                                audio_dir,
-                                lyrics_dir,
-                                True,  # is_playlist
-                                False,  # overwrite
-                                playlist_title,
-                            )
-
-                            if output_file:
-                                playlist_files.append(output_file)
-                                results["downloaded_tracks"] += 1
-                                log_entry = f"Downloaded: {title}"
-                            else:
-                                results["missing_tracks"] += 1
-                                log_entry = f"Download failed: {title}"
-                                self._log_fail(
-                                    True,
-                                    playlist_title,
-                                    i,
-                                    video_url,
-                                    "best",  # Use default quality
-                                    "mp3",  # Use default codec
-                                    "Failed (didn't download for some reason)",
-                                )
-
-                        except Exception as e:
-                            results["missing_tracks"] += 1
-                            log_entry = f"Download error: {title} - {str(e)}"
-                            self._log_fail(
-                                True,
-                                playlist_title,
-                                i,
-                                video_url,
-                                "best",  # Use default quality
-                                "mp3",  # Use default codec
-                                f"Failed: {str(e)}",
-                            )
-                    else:
-                        results["missing_tracks"] += 1
-                        log_entry = f"Missing: {title}"
-
-                results["log_entries"].append(log_entry)
+            # Patch the playlist file in remote order
+            tracks = []
+            for entry in playlist_entries:
+                video_id = entry.get("id")
+                if video_id in available:
+                    # Remote duplicates are listed once
+                    tracks.append((video_id, available.pop(video_id)))
 
-            # Update playlist file
-            if playlist_files:
-                self.playlist_manager.create_m3u_playlist(
+            if tracks or playlist.exists:
+                changes = self.playlist_manager.sync_playlist(
+                    playlist,
                     sanitized_title,
-                    playlist_files,
-                    playlist_dir,
+                    tracks,
+                    diff,
                     playlist_options,
                     log_queue,
                 )
-                log_queue.put(
-                    f"[FIX PLAYLIST] Playlist file updated: {sanitized_title}.m3u"
-                )
+                results["updated_tracks"] = changes["added"]
+                if changes["written"]:
+                    log_queue.put(
+                        f"[FIX PLAYLIST] Playlist file updated: {sanitized_title}.m3u "
+                        f"({changes['added']} added, {changes['removed']} removed"
+                        + (", reordered)" if changes["reordered"] else ")")
+                    )
+                else:
+                    log_queue.put(
+                        f"[FIX PLAYLIST] Playlist file already up to date: {sanitized_title}.m3u"
+                    )
 
             # Send summary
             log_queue.put(f"[FIX PLAYLIST SUMMARY]")
@@ -294,6 +496,11 @@ class DownloadManager:
 
             log_queue.put("[FIX PLAYLIST COMPLETE]")
 
+            results["files"] = dict(tracks)
+            return results
+
+        except JobCancelled:
+            log_queue.put("[CANCELLED] Playlist fix cancelled")
         except Exception as e:
             log_queue.put(f"[ERROR] Playlist fix failed: {str(e)}")
         finally:
@@ -306,6 +513,84 @@ class DownloadManager:
             self.active_downloads.pop(operation_id, None)
             log_queue.put("[END]")
 
+    def _download_missing_tracks(
+        self, missing, playlist_title, audio_dir, lyrics_dir, log_queue
+    ):
+        """
+        Download [(position, remote entry)] in parallel.
+        Returns {video_id: output file} for the tracks that succeeded.
+        """
+        downloaded = {}
+        cancelled = False
+        total = len(missing)
+        log_queue.put(f"[FIX PLAYLIST] Downloading {total} missing tracks")
+
+        def download(video_id, video_url):
+            self.jobs.checkpoint(log_queue)
+            return self.shared_downloads.fetch(
+                (video_id, "mp3", "best", audio_dir),
+                lambda: self._download_video(
+                    video_url,
+                    log_queue,
+                    "best",  # Use default quality
+                    "mp3",  # Use default codec
+                    audio_dir,
+                    lyrics_dir,
+                    True,  # is_playlist
+                    False,  # overwrite
+                    playlist_title,
+                ),
+                checkpoint=lambda: self.jobs.checkpoint(log_queue),
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.fix_playlist_workers, total),
+            thread_name_prefix="fix-playlist",
+        ) as pool:
+            futures = {}
+            for position, entry in missing:
+                video_url = f"https://www.youtube.com/watch?v={entry.get('id')}"
+                futures[pool.submit(download, entry.get("id"), video_url)] = (
+                    position,
+                    entry,
+                    video_url,
+                )
+
+            for done, future in enumerate(as_completed(futures), 1):
+                position, entry, video_url = futures[future]
+                title = entry.get("title", "Unknown")
+                try:
+                    output_file = future.result()
+                    status = "Failed (didn't download for some reason)"
+                except JobCancelled:
+                    cancelled = True
+                    continue
+                except Exception as e:
+                    output_file = None
+                    status = f"Failed: {str(e)}"
+
+                if output_file:
+                    downloaded[entry.get("id")] = output_file
+                    self._job_item(log_queue, entry.get("id"), "done", output_file)
+                    log_queue.put(f"[FIX PLAYLIST] Downloaded: {title}")
+                else:
+                    self._job_item(log_queue, entry.get("id"), "failed", status)
+                    log_queue.put(f"[FIX PLAYLIST] Download failed: {title}")
+                    self._log_fail(
+                        True,
+                        playlist_title,
+                        position,
+                        video_url,
+                        "best",  # Use default quality
+                        "mp3",  # Use default codec
+                        status,
+                    )
+                log_queue.put(f"[PROGRESS] {done}/{total}")
+
+        if cancelled:
+            raise JobCancelled()
+        return downloaded
+
     def _select_failed_entries(self, fail_dir, mode, playlist=None, count=0):
         if fail_dir:
             self.fail_logger = FailLogger(fail_dir)
@@ -323,44 +608,6 @@ class DownloadManager:
 
         return entries
 
-    def _get_best_audio_format_id(self, url, log_queue):
-        cmd = ["yt-dlp", "--list-formats", url]
-
-        log_queue.put("[FORMAT] Listing available formats")
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            universal_newlines=True,
-        )
-
-        audio_formats = []
-
-        for line in process.stdout:
-            line = line.strip()
-            if not line or line.startswith("ID"):
-                continue
-
-            # Typical line:
-            # 251 webm audio only tiny 160k , opus @160k
-            parts = line.split()
-            if "audio" in line and "only" in line:
-                format_id = parts[0]
-                audio_formats.append(format_id)
-
-        process.wait()
-
-        if not audio_formats:
-            log_queue.put("[FORMAT] No audio-only formats found")
-            return None
-
-        # yt-dlp lists worst → best, so take the last
-        chosen = audio_formats[-1]
-        log_queue.put(f"[FORMAT] Selected audio format id: {chosen}")
-        return chosen
-
     def retry_failed_entries(
         self,
         failed_entries,
@@ -373,7 +620,8 @@ class DownloadManager:
         save_logs=False,
         log_queue=None,
     ):
-        sse_log_queue = Queue()
+        self._journal_job(download_id, "bulk_retry", locals())
+        sse_log_queue = LogBuffer()
         self.log_queues[download_id] = sse_log_queue
         self.active_downloads[download_id] = True
 
@@ -388,8 +636,10 @@ class DownloadManager:
         else:
             thread_log_queue = sse_log_queue
 
-        thread = threading.Thread(
-            target=self._retry_failed_bulk_thread,
+        self.jobs.submit(
+            download_id,
+            "bulk_retry",
+            self._retry_failed_bulk_thread,
             args=(
                 failed_entries,
                 download_id,
@@ -401,9 +651,11 @@ class DownloadManager:
                 overwrite,
                 save_logs,
             ),
-            daemon=True,
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                download_id, log_queue, save_logs
+            ),
         )
-        thread.start()
 
     def _retry_failed_bulk_thread(
         self,
@@ -423,91 +675,131 @@ class DownloadManager:
         total = len(entries)
         success = 0
         failed = 0
+        cancelled = False
+        # Successful entries leave the fail store in batches, and playlist
+        # inserts are collected per playlist and written once at the end
+        removals = []
+        inserts = {}  # playlist title -> [(index, output file)]
+
+        def flush_removals():
+            if removals and self.fail_logger:
+                self.fail_logger.remove_entries(removals)
+            removals.clear()
+
+        def retry(entry):
+            self.jobs.checkpoint(log_queue)
+            # Shares the global download limit; duplicate URLs are fetched once
+            return self.shared_downloads.fetch(
+                (
+                    video_key(entry["url"]),
+                    entry.get("format", "mp3"),
+                    entry.get("quality", "best"),
+                    audio_dir,
+                ),
+                lambda: self._retry_download(
+                    entry, log_queue, audio_dir, lyrics_dir, overwrite
+                ),
+                checkpoint=lambda: self.jobs.checkpoint(log_queue),
+            )
 
         try:
             log_queue.put(f"[BULK RETRY] Retrying {total} failed downloads")
 
-            for i, entry in enumerate(entries, 1):
-                url = entry["url"]
-                quality = entry.get("quality", "best")
-                codec = entry.get("format", "mp3")
-                playlist_title = entry.get("playlist")
-                index = entry.get("index")
-                is_playlist = entry.get("type") == "playlist"
-
-                log_queue.put(f"[{i}/{total}] Retrying")
-                log_queue.put(f"[URL] {url}")
-
-                try:
-                    output_file = self._download_video(
-                        url,
-                        log_queue,
-                        quality,
-                        codec,
-                        audio_dir,
-                        lyrics_dir,
-                        is_playlist,
-                        overwrite,
-                        playlist_title,
-                    )
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(self.bulk_retry_workers, total)),
+                thread_name_prefix="bulk-retry",
+            ) as pool:
+                futures = {pool.submit(retry, entry): entry for entry in entries}
 
-                    if not output_file:
-                        log_queue.put("[RETRY] Checking for different formats....")
+                for done, future in enumerate(as_completed(futures), 1):
+                    entry = futures[future]
+                    url = entry["url"]
+                    playlist_title = entry.get("playlist")
+                    index = entry.get("index")
+                    is_playlist = entry.get("type") == "playlist"
 
-                        format_id = self._get_best_audio_format_id(url, log_queue)
+                    try:
+                        output_file, error = future.result()
 
-                        if not format_id:
+                        if not output_file:
                             failed += 1
-                            log_queue.put("[RESULT] Retry failed (no formats)")
+                            self._job_item(log_queue, url, "failed", error)
+                            log_queue.put(
+                                f"[RESULT] Retry failed ({error or 'unknown error'}): {url}"
+                            )
                             continue
 
-                        log_queue.put(
-                            f"[RETRY] Retrying with discovered format {format_id}"
-                        )
-                        output_file = self._download_video(
-                            url,
-                            log_queue,
-                            quality,
-                            codec,
-                            audio_dir,
-                            lyrics_dir,
-                            is_playlist,
-                            overwrite,
-                            playlist_title,
-                            format_id=format_id,
-                        )
+                        removals.append(entry)
+                        if len(removals) >= self.fail_removal_batch:
+                            flush_removals()
 
-                        if not output_file:
-                            failed += 1
-                            log_queue.put("[RESULT] Retry failed (format retry)")
-                            continue
+                        # Fix playlist order
+                        if is_playlist and playlist_title and index is not None:
+                            inserts.setdefault(playlist_title, []).append(
+                                (index, output_file)
+                            )
+
+                        success += 1
+                        self._job_item(log_queue, url, "done", output_file)
+                        log_queue.put(f"[RESULT] Retry succeeded: {url}")
+
+                    except CancelledError:
+                        # Never started: the job was cancelled first
+                        continue
+                    except JobCancelled:
+                        if not cancelled:
+                            cancelled = True
+                            # Drop entries not started yet (by hand: Python 3.8)
+                            for pending in futures:
+                                pending.cancel()
+                        continue
+                    except Exception as e:
+                        failed += 1
+                        self._job_item(log_queue, url, "failed", str(e))
+                        log_queue.put(f"[ERROR] Retry failed: {str(e)}")
+                    finally:
+                        if not cancelled:
+                            log_queue.put(f"[PROGRESS] {done}/{total}")
+
+            if cancelled:
+                raise JobCancelled()
+
+            log_queue.put("[BULK RETRY COMPLETE]")
+            log_queue.put(f"[SUCCESS] Succussfull retries: {success}")
+            log_queue.put(f"[FAILED] Failed retries: {failed}")
+
+        except JobCancelled:
+            log_queue.put(
+                f"[CANCELLED] Bulk retry cancelled ({success} succeeded, {failed} failed)"
+            )
 
-                    # Remove from failed log
-                    if self.fail_logger:
-                        self.fail_logger.remove_entry(entry)
+        finally:
+            try:
+                flush_removals()
+            except Exception as e:
+                log_queue.put(f"[ERROR] Failed to update the failed log: {str(e)}")
 
-                    # Fix playlist order
-                    if is_playlist and playlist_title and index is not None:
+            for playlist_title, tracks in inserts.items():
+                playlist = M3UPlaylist(
+                    os.path.join(playlist_dir, f"{playlist_title}.m3u"),
+                    self.playlist_index,
+                )
+                try:
+                    # Ascending order puts every track at its original position
+                    for index, output_file in sorted(tracks, key=lambda t: t[0]):
                         self._insert_into_playlist(
                             playlist_title,
                             output_file,
                             index,
                             playlist_dir,
                             log_queue,
+                            playlist=playlist,
                         )
-
-                    success += 1
-                    log_queue.put("[RESULT] Retry succeeded")
-
+                    if playlist.flush():
+                        log_queue.put(f"[PLAYLIST] Saved {playlist_title}")
                 except Exception as e:
-                    failed += 1
-                    log_queue.put(f"[ERROR] Retry failed: {str(e)}")
-
-            log_queue.put("[BULK RETRY COMPLETE]")
-            log_queue.put(f"[SUCCESS] Succussfull retries: {success}")
-            log_queue.put(f"[FAILED] Failed retries: {failed}")
+                    log_queue.put(f"[ERROR] Failed to write playlist {playlist_title}: {str(e)}")
 
-        finally:
             if save_logs:
                 self.log_manager.stop_logging(download_id)
 
@@ -529,7 +821,8 @@ class DownloadManager:
         """
         Retry a single failed download entry
         """
-        sse_log_queue = Queue()
+        self._journal_job(download_id, "retry", locals())
+        sse_log_queue = LogBuffer()
         self.log_queues[download_id] = sse_log_queue
         self.active_downloads[download_id] = True
 
@@ -544,8 +837,10 @@ class DownloadManager:
         else:
             thread_log_queue = sse_log_queue
 
-        thread = threading.Thread(
-            target=self._retry_failed_thread,
+        self.jobs.submit(
+            download_id,
+            "retry",
+            self._retry_failed_thread,
             args=(
                 failed_entry,
                 download_id,
@@ -557,9 +852,11 @@ class DownloadManager:
                 overwrite,
                 save_logs,
             ),
-            daemon=True,
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                download_id, log_queue, save_logs
+            ),
         )
-        thread.start()
 
     def _retry_failed_thread(
         self,
@@ -577,8 +874,6 @@ class DownloadManager:
             self.fail_logger = FailLogger(fail_dir)
         try:
             url = entry["url"]
-            quality = entry.get("quality", "best")
-            codec = entry.get("format", "mp3")
             playlist_title = entry.get("playlist")
             index = entry.get("index")
             is_playlist = entry.get("type") == "playlist"
@@ -586,43 +881,12 @@ class DownloadManager:
             log_queue.put("[RETRY] Retrying failed download...")
             log_queue.put(f"[URL] {url}")
 
-            output_file = self._download_video(
-                url,
-                log_queue,
-                quality,
-                codec,
-                audio_dir,
-                lyrics_dir,
-                is_playlist,
-                overwrite,
-                playlist_title,
+            output_file, error = self._retry_download(
+                entry, log_queue, audio_dir, lyrics_dir, overwrite
             )
-
             if not output_file:
-                log_queue.put("[RETRY] Checking for different formats....")
-
-                format_id = self._get_best_audio_format_id(url, log_queue)
-
-                if not format_id:
-                    log_queue.put("[RESULT] Retry failed (no formats)")
-                    return
-
-                log_queue.put(f"[RETRY] Retrying with discovered format {format_id}")
-                output_file = self._download_video(
-                    url,
-                    log_queue,
-                    quality,
-                    codec,
-                    audio_dir,
-                    lyrics_dir,
-                    is_playlist,
-                    overwrite,
-                    playlist_title,
-                    format_id=format_id,
-                )
-                if not output_file:
-                    log_queue.put("[RESULT] Retry failed (format retry)")
-                    return
+                log_queue.put(f"[RESULT] Retry failed ({error or 'unknown error'})")
+                return
 
             log_queue.put("[RETRY] Download succeeded")
 
@@ -641,6 +905,8 @@ class DownloadManager:
                     log_queue,
                 )
 
+        except JobCancelled:
+            log_queue.put("[CANCELLED] Retry cancelled")
         except Exception as e:
             log_queue.put(f"[ERROR] Retry failed: {str(e)}")
 
@@ -650,37 +916,32 @@ class DownloadManager:
             self.active_downloads.pop(download_id, None)
             log_queue.put("[END]")
 
-    def _detect_playlist_path_style(self, lines):
+    def _retry_download(self, entry, log_queue, audio_dir, lyrics_dir, overwrite):
         """
-        Determine how paths are stored in the playlist.
-        Returns: "absolute", "relative", or "filename"
+        Download a failed entry through the retry engine.
+        Returns (output file or None, error kind or None).
         """
-        for line in lines:
-            if not line or line.startswith("#"):
-                continue
-
-            if os.path.isabs(line):
-                return "absolute"
-
-            if "/" in line or "\\" in line:
-                return "relative"
-
-            return "filename"
-
-        return "filename"
-
-    def _normalize_track_path(self, track_path, style, playlist_dir):
-        if style == "absolute":
-            return os.path.abspath(track_path)
-
-        if style == "relative":
-            return os.path.relpath(
-                track_path,
-                start=playlist_dir,
+        def attempt(format_id, report):
+            return self._download_video(
+                entry["url"],
+                log_queue,
+                entry.get("quality", "best"),
+                entry.get("format", "mp3"),
+                audio_dir,
+                lyrics_dir,
+                entry.get("type") == "playlist",
+                overwrite,
+                entry.get("playlist"),
+                format_id=format_id,
+                report=report,
             )
 
-        # filename-only
-        return os.path.basename(track_path)
+        return self.retry_engine.run(
+            entry["url"],
+            attempt,
+            log_queue,
+            checkpoint=lambda: self.jobs.checkpoint(log_queue),
+        )
 
     def _insert_into_playlist(
         self,
@@ -689,51 +950,35 @@ class DownloadManager:
         index,
         playlist_dir,
         log_queue,
+        playlist=None,
     ):
+        """
+        Insert a track at its 1-based position. With a loaded M3UPlaylist the
+        insert stays in memory until the caller flushes it; otherwise the
+        playlist is written right away.
+        """
         playlist_file = os.path.join(playlist_dir, f"{playlist_title}.m3u")
+        model = playlist or M3UPlaylist(playlist_file, self.playlist_index)
 
-        if not os.path.exists(playlist_file):
+        if not model.exists and not model.lines:
             log_queue.put("[PLAYLIST] Playlist file not found, creating new one")
-            with open(playlist_file, "w", encoding="utf-8") as f:
-                f.write("#EXTM3U\n")
-                f.write(track_path + "\n")
+            model.append("#EXTM3U")
+            model.append(track_path)
+            if playlist is None:
+                model.flush()
             return
 
-        with open(playlist_file, "r", encoding="utf-8") as f:
-            lines = [l.rstrip("\n") for l in f]
-
-        # Separate track line positions
-        track_line_indices = [
-            i for i, line in enumerate(lines) if line and not line.startswith("#")
-        ]
-
-        style = self._detect_playlist_path_style(lines)
-
-        # Normalize track path to match playlist
-        normalized_track = self._normalize_track_path(track_path, style, playlist_dir)
-
-        # Recompute after dedupe
-        track_line_indices = [
-            i for i, line in enumerate(lines) if line and not line.startswith("#")
-        ]
-
-        # Convert 1-based index → 0-based
-        target_track_pos = max(0, index - 1)
-
-        # Clamp to available track count
-        if target_track_pos >= len(track_line_indices):
-            # Append after last track
-            insert_at = len(lines)
-        else:
-            insert_at = track_line_indices[target_track_pos]
-
-        lines.insert(insert_at, normalized_track)
+        if model.contains(track_path):
+            log_queue.put(f"[PLAYLIST] Track already in {playlist_title}, not inserting")
+            return
 
-        with open(playlist_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
+        # Write the track the way the playlist already stores paths
+        position = model.insert(index, model.format_entry(track_path))
+        if playlist is None:
+            model.flush()
 
         log_queue.put(
-            f"[PLAYLIST] Inserted track at track position {target_track_pos + 1} in {playlist_title}"
+            f"[PLAYLIST] Inserted track at track position {position} in {playlist_title}"
         )
 
     def start_download(
@@ -758,6 +1003,7 @@ class DownloadManager:
         """Start a download process in a separate thread"""
         if download_id in self.active_downloads:
             return
+        self._journal_job(download_id, "download", locals())
 
         # Create directories if needed
         Path(audio_dir).mkdir(parents=True, exist_ok=True)
@@ -773,7 +1019,7 @@ class DownloadManager:
             self.fail_logger = FailLogger(fail_dir)
 
         # Create a new queue for this download
-        sse_log_queue = Queue()
+        sse_log_queue = LogBuffer()
         self.log_queues[download_id] = sse_log_queue
         self.active_downloads[download_id] = True
 
@@ -791,8 +1037,10 @@ class DownloadManager:
             thread_log_queue = sse_log_queue
 
         # Start the download in a new thread
-        thread = threading.Thread(
-            target=self._download_thread,
+        self.jobs.submit(
+            download_id,
+            "download",
+            self._download_thread,
             args=(
                 url,
                 download_id,
@@ -807,9 +1055,13 @@ class DownloadManager:
                 overwrite,
                 resume,
             ),
-            daemon=True,
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                download_id, log_queue, save_logs
+            ),
+            # Continue a playlist from its saved progress
+            resume_args=lambda args: args[:-1] + (True,),
         )
-        thread.start()
 
     def _download_thread(
         self,
@@ -854,8 +1106,13 @@ class DownloadManager:
                 ]
 
                 log_queue.put("[PLAYLIST] Retrieving playlist metadata...")
-                result = subprocess.run(
-                    playlist_metadata_cmd, capture_output=True, text=True, check=True
+                result = UPSTREAM.call(
+                    "youtube",
+                    subprocess.run,
+                    playlist_metadata_cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True,
                 )
 
                 playlist_entries = [
@@ -916,49 +1173,94 @@ class DownloadManager:
                             "[PROGRESS] No progress found, starting from beginning"
                         )
 
-                # Download each video in the playlist
-                for i, entry in enumerate(playlist_entries):
-                    if i < start_index:
-                        continue
+                # Entries run in a short pipeline so one fetches while the
+                # previous one transcodes; results are handled in order, and
+                # each entry's log lines are held until the entries before it
+                # are done. A cancel still writes the playlist of finished
+                # tracks so a resume can pick up from it.
+                cancelled = None
+                prefetched = None
+                todo = list(enumerate(playlist_entries))[start_index:]
+                in_flight = deque()
+                with ThreadPoolExecutor(
+                    max_workers=self.playlist_pipeline_depth,
+                    thread_name_prefix="playlist",
+                ) as pipeline:
+                    while todo or in_flight:
+                        while (
+                            todo
+                            and not cancelled
+                            and len(in_flight) < self.playlist_pipeline_depth
+                        ):
+                            try:
+                                self.jobs.checkpoint(log_queue)
+                            except JobCancelled as e:
+                                cancelled = e
+                                break
+                            i, entry = todo.pop(0)
+                            video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+
+                            # The next entry's metadata loads meanwhile
+                            current, prefetched = prefetched, None
+                            if todo:
+                                prefetched = self._prefetch_metadata(
+                                    f"https://www.youtube.com/watch?v={todo[0][1]['id']}"
+                                )
 
-                    video_url = f"https://www.youtube.com/watch?v={entry['id']}"
-                    log_queue.put(
-                        f"[PLAYLIST] Downloading video {i + 1}/{len(playlist_entries)}: {entry.get('title', 'Untitled')}"
-                    )
+                            entry_log = EntryLog(log_queue)
+                            entry_log.put(
+                                f"[PLAYLIST] Downloading video {i + 1}/{len(playlist_entries)}: {entry.get('title', 'Untitled')}"
+                            )
+                            future = pipeline.submit(
+                                self._download_video,
+                                video_url,
+                                entry_log,
+                                quality,
+                                codec,
+                                audio_dir,
+                                lyrics_dir,
+                                is_playlist,
+                                overwrite,
+                                playlist_title,
+                                prefetched=current,
+                            )
+                            in_flight.append((i, entry, video_url, entry_log, future))
 
-                    # Download the video
-                    video_file = self._download_video(
-                        video_url,
-                        log_queue,
-                        quality,
-                        codec,
-                        audio_dir,
-                        lyrics_dir,
-                        is_playlist,
-                        overwrite,
-                        playlist_title,
-                    )
+                        if not in_flight:
+                            break
+                        i, entry, video_url, entry_log, future = in_flight.popleft()
+                        entry_log.go_live()
+                        try:
+                            video_file = future.result()
+                        except JobCancelled as e:
+                            cancelled = cancelled or e
+                            continue
 
-                    if video_file:
-                        playlist_files.append(video_file)
-                        self.progress_tracker.save_progress(
-                            url, playlist_title, i, len(playlist_entries)
-                        )
+                        if video_file:
+                            playlist_files.append(video_file)
+                            if not cancelled:
+                                # Earlier entries are all done, so resuming
+                                # after this index loses nothing
+                                self.progress_tracker.save_progress(
+                                    url, playlist_title, i, len(playlist_entries)
+                                )
+                            self._job_item(log_queue, entry["id"], "done", video_file)
 
-                        log_queue.put(
-                            f"[PLAYLIST] Completed video {i + 1}/{len(playlist_entries)}"
-                        )
-                    else:
-                        self._log_fail(
-                            is_playlist,
-                            playlist_title,
-                            i + 1,
-                            video_url,
-                            quality,
-                            codec,
-                            "Failed (didn't download for some reason)",
-                        )
-                        log_queue.put(f"[WARNING] Failed to download video {i + 1}")
+                            log_queue.put(
+                                f"[PLAYLIST] Completed video {i + 1}/{len(playlist_entries)}"
+                            )
+                        else:
+                            self._log_fail(
+                                is_playlist,
+                                playlist_title,
+                                i + 1,
+                                video_url,
+                                quality,
+                                codec,
+                                "Failed (didn't download for some reason)",
+                            )
+                            log_queue.put(f"[WARNING] Failed to download video {i + 1}")
+                            self._job_item(log_queue, entry["id"], "failed")
 
                 # Create M3U playlist file
                 if playlist_files:
@@ -973,6 +1275,9 @@ class DownloadManager:
                 else:
                     log_queue.put("[WARNING] No files downloaded for playlist")
 
+                if cancelled:
+                    raise cancelled
+
                 # End playlist processing
                 self.active_downloads.pop(download_id, None)
                 log_queue.put("[END]")
@@ -989,6 +1294,9 @@ class DownloadManager:
                 is_playlist,
                 overwrite,
             )
+        except JobCancelled:
+            log_queue.put("[CANCELLED] Download cancelled")
+            output_file = None
         except Exception as e:
             log_queue.put(f"[ERROR] Download failed: {str(e)}")
             output_file = None
@@ -1021,21 +1329,38 @@ class DownloadManager:
         overwrite=False,
         playlist_title=None,
         format_id=None,
+        report=None,
+        prefetched=None,
     ):
-        """Download and process a single video using helper classes"""
+        """
+        Download and process a single video using helper classes. report, if
+        given, receives the yt-dlp "error" of a failed attempt and the video's
+        "audio_formats" (best first) for the retry engine. prefetched is a
+        _prefetch_metadata() result for url.
+
+        Thumbnail and lyrics are fetched on the prefetch pool while yt-dlp
+        downloads the audio.
+        """
+        report = {} if report is None else report
         thumbnail_path = None
+        thumbnail_future = None
         output_file = None
         lrc_file = None
+        staging_dir = None
 
         try:
             # Get video metadata
-            metadata = self.metadata_manager.get_video_metadata(url, log_queue)
+            if prefetched and prefetched["url"] == url:
+                metadata = self._prefetched_metadata(prefetched, log_queue)
+            else:
+                metadata = self.metadata_manager.get_video_metadata(url, log_queue)
             title = metadata["title"]
             sanitized_title = metadata["sanitized_title"] + "_" + metadata["video_id"]
             uploader = metadata["uploader"]
             year = metadata["year"]
             video_id = metadata["video_id"]
             thumbnail_url = metadata["thumbnail_url"]
+            report["audio_formats"] = metadata.get("audio_formats", [])
 
             # Determine output filename
             extension = get_extension(codec)
@@ -1058,16 +1383,15 @@ class DownloadManager:
                 )
                 return output_path
 
-            # Download thumbnail
-            thumbnail_path = (
-                self.thumbnail_manager.download_thumbnail(thumbnail_url, log_queue)
-                if thumbnail_url
-                else None
-            )
-
-            # Get lyrics
-            lyrics = self.lyrics_manager.get_lyrics(
-                title, uploader, video_id, log_queue
+            # Thumbnail and lyrics load alongside the audio download
+            if thumbnail_url:
+                thumbnail_future = self.prefetch_pool.submit(
+                    self.thumbnail_manager.download_thumbnail, thumbnail_url, log_queue
+                )
+            else:
+                log_queue.put("[WARNING] No thumbnail available for this video")
+            lyrics_future = self.prefetch_pool.submit(
+                self.lyrics_manager.get_lyrics, title, uploader, video_id, log_queue
             )
 
             # Prepare download command
@@ -1075,25 +1399,41 @@ class DownloadManager:
             log_queue.put(f"[QUALITY] Selected: {quality} ({quality_setting})")
             log_queue.put(f"[SETTINGS] Selected codec: {codec.upper()}")
 
+            # Each attempt stages into its own directory, so jobs (or pipelined
+            # entries) fetching the same video never touch each other's files
+            job_id = self.jobs.job_id_for(log_queue) or "default"
+            staging_dir = tempfile.mkdtemp(
+                prefix=f"{str(job_id).replace(os.sep, '_')}-", dir=self.staging_dir
+            )
             cmd = self._build_download_command(
-                url,
-                quality_setting,
-                codec,
-                audio_dir,
-                year,
-                uploader,
-                title,
-                sanitized_title,
-                format_id=format_id,
+                url, sanitized_title, staging_dir, format_id=format_id
             )
             log_queue.put(f"[COMMAND] {' '.join(cmd)}")
 
-            # Execute download command
-            output_file = self._execute_download_command(
-                cmd, audio_dir, sanitized_title, extension, log_queue
+            # Fetch stage: raw audio into the staging dir
+            fetched = self._execute_download_command(
+                cmd, staging_dir, sanitized_title, None, log_queue, report=report
             )
 
+            # Transcode stage: waits for a free CPU slot
+            if fetched:
+                output_file = self._transcode_audio(
+                    fetched,
+                    output_path,
+                    codec,
+                    quality_setting,
+                    {"title": title, "artist": uploader, "date": year},
+                    log_queue,
+                )
+                if not output_file:
+                    report["error"] = "Transcode failed"
+
             if output_file:
+                if thumbnail_future:
+                    thumbnail_path = thumbnail_future.result()
+                    thumbnail_future = None
+                lyrics = lyrics_future.result()
+
                 # Embed thumbnail if available
                 if thumbnail_path:
                     self.thumbnail_manager.embed_thumbnail(
@@ -1139,7 +1479,11 @@ class DownloadManager:
 
             return output_file
 
+        except JobCancelled:
+            raise
         except Exception as e:
+            # yt-dlp's reason is on stderr, not in the exception message
+            report["error"] = f"{str(e)}\n{getattr(e, 'stderr', '') or ''}"
             self._log_fail(
                 is_playlist,
                 playlist_title,
@@ -1152,28 +1496,53 @@ class DownloadManager:
             log_queue.put(f"[ERROR] Download failed: {str(e)}")
             return None
         finally:
+            if staging_dir:
+                shutil.rmtree(staging_dir, ignore_errors=True)
             # Clean up thumbnail file
             if thumbnail_path and os.path.exists(thumbnail_path):
                 os.remove(thumbnail_path)
                 log_queue.put("[THUMBNAIL] Temporary thumbnail deleted")
+            if thumbnail_future:
+                # Not used (failed or cancelled download): delete it once fetched
+                thumbnail_future.add_done_callback(self._discard_thumbnail)
 
-    def _build_download_command(
-        self,
-        url,
-        quality_setting,
-        codec,
-        audio_dir,
-        year,
-        artist,
-        title,
-        sanitized_title,
-        format_id=None,
-    ):
-        """Construct the yt-dlp command with appropriate parameters"""
+    def _prefetch_metadata(self, url):
+        """Start fetching a video's metadata; its log lines wait until it is used"""
+        logs = Queue()
+        return {
+            "url": url,
+            "logs": logs,
+            "future": self.prefetch_pool.submit(
+                self.metadata_manager.get_video_metadata, url, logs
+            ),
+        }
+
+    def _prefetched_metadata(self, prefetched, log_queue):
+        """Wait for a _prefetch_metadata() result and replay its log lines"""
+        try:
+            return prefetched["future"].result()
+        finally:
+            while not prefetched["logs"].empty():
+                log_queue.put(prefetched["logs"].get())
+
+    @staticmethod
+    def _discard_thumbnail(future):
+        try:
+            path = future.result()
+        except Exception:
+            return
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _build_download_command(self, url, sanitized_title, staging_dir, format_id=None):
+        """
+        yt-dlp command for the fetch stage: the raw audio stream goes to
+        staging_dir, conversion is left to the transcode stage
+        """
         cmd = ["yt-dlp", url]
 
         if format_id:
-            # Explicit format retry (from --list-formats)
+            # Explicit format from the retry engine (metadata or format cache)
             cmd.extend(["-f", format_id])
         else:
             # Normal path: let yt-dlp choose best audio
@@ -1181,71 +1550,129 @@ class DownloadManager:
 
         cmd.extend(
             [
-                "--extract-audio",
-                "--audio-format",
-                codec,
-                "--audio-quality",
-                quality_setting,
-            ]
-        )
-        cmd.extend(
-            [
-                "--embed-metadata",
-                "--add-metadata",
-                "--metadata",
-                f"title:{title}",
-                "--metadata",
-                f"uploader:{artist}",
-                # '--output', f'{audio_dir}/%(title)s.%(ext)s',
                 "-o",
-                f"{audio_dir}/{sanitized_title}.%(ext)s",
+                f"{staging_dir}/{sanitized_title}.%(ext)s",
                 "--verbose",
                 "--no-simulate",
                 "--newline",
             ]
         )
-
-        # Add year if available
-        if year:
-            cmd.extend(["--parse-metadata", f"{year}:%(meta_year)s"])
-
-        # Special handling for certain codecs
-        if codec == "flac":
-            cmd.extend(["--audio-quality", "0"])  # FLAC is lossless
-            cmd.extend(["--postprocessor-args", "-c:a flac -compression_level 12"])
-        elif codec == "wav":
-            cmd.extend(["--postprocessor-args", "-c:a pcm_s16le"])
-        elif codec == "opus":
-            cmd.extend(["--postprocessor-args", "-b:a " + quality_setting])
-
         return cmd
 
-    def _execute_download_command(self, cmd, audio_dir, title, extension, log_queue):
-        """Run the download command and process output"""
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-        )
+    def _transcode_audio(self, source, output_path, codec, quality_setting, tags,
+                         log_queue):
+        """
+        Transcode stage: convert a fetched file into output_path once a CPU
+        slot is free. The staged source is removed either way; returns
+        output_path or None.
+        """
+        base, extension = os.path.splitext(os.path.basename(output_path))
+        # Next to the source, in the download's own staging directory
+        staged = os.path.join(os.path.dirname(source), f"{base}.transcode{extension}")
+        commands = ffmpeg_commands(source, staged, codec, quality_setting, tags)
+
+        try:
+            with self.transcoder.slot(lambda: self.jobs.checkpoint(log_queue)):
+                for attempt, cmd in enumerate(commands):
+                    copy = "copy" in cmd
+                    log_queue.put(
+                        f"[TRANSCODE] {'Copying' if copy else 'Converting'} to {codec.upper()}: {base}{extension}"
+                    )
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        **new_session_kwargs(),
+                    )
+                    self.jobs.track_process(log_queue, process)
+                    try:
+                        _, stderr = process.communicate()
+                    finally:
+                        self.jobs.untrack_process(log_queue, process)
+
+                    if self.jobs.cancelled(log_queue):
+                        raise JobCancelled()
+                    if process.returncode == 0:
+                        if copy:
+                            self.transcoder.copied()
+                        break
+                    lines = stderr.strip().splitlines()
+                    log_queue.put(
+                        f"[WARNING] ffmpeg failed: {lines[-1] if lines else process.returncode}"
+                    )
+                else:
+                    log_queue.put("[ERROR] Transcode failed")
+                    return None
 
-        # Stream output in real-time
-        for line in process.stdout:
-            cleaned_line = line.strip()
-            if cleaned_line:
-                # Simplify verbose messages
-                if "Deleting original file" in cleaned_line:
-                    cleaned_line = "[CLEANUP] Deleting temporary files"
-                elif "Embedding metadata" in cleaned_line:
-                    cleaned_line = "[METADATA] Embedding metadata"
-                elif "Embedding thumbnail" in cleaned_line:
-                    cleaned_line = "[METADATA] Embedding thumbnail"
+            shutil.move(staged, output_path)
+            log_queue.put(f"[SUCCESS] Audio downloaded: {base}{extension}")
+            return output_path
+        finally:
+            for path in (source, staged):
+                if os.path.exists(path):
+                    os.remove(path)
 
-                log_queue.put(cleaned_line)
+    def _execute_download_command(self, cmd, audio_dir, title, extension, log_queue,
+                                  report=None):
+        """
+        Run the download command and process output; yt-dlp errors go to
+        report. With extension None, any finished file of the track is returned.
+        """
+        errors = []
+        UPSTREAM.acquire("youtube")
+        # Running downloads share the global bandwidth cap fairly
+        job_id = self.jobs.job_id_for(log_queue) or "default"
+        with self.bandwidth.slot(
+            job_id, checkpoint=lambda: self.jobs.checkpoint(log_queue)
+        ) as limit:
+            if limit:
+                cmd = cmd + ["--limit-rate", str(limit)]
+                log_queue.put(f"[BANDWIDTH] Limited to {limit // 1024} KiB/s")
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                universal_newlines=True,
+                **new_session_kwargs(),
+            )
+            # Cancelling the job terminates yt-dlp and its ffmpeg child
+            self.jobs.track_process(log_queue, process)
 
-        process.wait()
+            try:
+                # Stream output in real-time
+                for line in process.stdout:
+                    cleaned_line = line.strip()
+                    if cleaned_line:
+                        # Simplify verbose messages
+                        if "Deleting original file" in cleaned_line:
+                            cleaned_line = "[CLEANUP] Deleting temporary files"
+                        elif "Embedding metadata" in cleaned_line:
+                            cleaned_line = "[METADATA] Embedding metadata"
+                        elif "Embedding thumbnail" in cleaned_line:
+                            cleaned_line = "[METADATA] Embedding thumbnail"
+                        elif cleaned_line.startswith("ERROR:"):
+                            errors.append(cleaned_line)
+
+                        log_queue.put(cleaned_line)
+
+                process.wait()
+            finally:
+                self.jobs.untrack_process(log_queue, process)
+
+        if self.jobs.cancelled(log_queue):
+            self._remove_partial_files(audio_dir, title, log_queue)
+            raise JobCancelled()
+
+        if report is not None:
+            report["error"] = "\n".join(errors)
+        UPSTREAM.report(
+            "youtube",
+            throttled=any(THROTTLE_PATTERN.search(e) for e in errors),
+            error=process.returncode != 0,
+        )
 
         if process.returncode != 0:
             log_queue.put(f"[ERROR] Download failed with code {process.returncode}")
@@ -1255,7 +1682,12 @@ class DownloadManager:
         output_files = [
             f
             for f in os.listdir(audio_dir)
-            if f.endswith(f".{extension}") and title in f
+            if title in f
+            and (
+                f.endswith(f".{extension}")
+                if extension
+                else f.startswith(f"{title}.") and not f.endswith(PARTIAL_SUFFIXES)
+            )
         ]
 
         if not output_files:
@@ -1263,9 +1695,23 @@ class DownloadManager:
             return None
 
         output_file = os.path.join(audio_dir, output_files[0])
-        log_queue.put(f"[SUCCESS] Audio downloaded: {output_files[0]}")
+        log_queue.put(f"[FETCH] Audio fetched: {output_files[0]}")
         return output_file
 
+    def _remove_partial_files(self, audio_dir, title, log_queue):
+        """Delete what an interrupted yt-dlp run left for one track"""
+        removed = 0
+        for filename in os.listdir(audio_dir):
+            # Names carry the video ID, so this only matches the one track
+            if filename.startswith(f"{title}."):
+                try:
+                    os.remove(os.path.join(audio_dir, filename))
+                    removed += 1
+                except OSError:
+                    pass
+        if removed:
+            log_queue.put(f"[CLEANUP] Removed {removed} partial files")
+
     def start_migration(
         self,
         migration_id,
@@ -1277,10 +1723,13 @@ class DownloadManager:
         migrate_dir,
         save_logs=False,
         log_queue=None,
+        offline=False,
     ):
+        self._journal_job(migration_id, "migration", locals())
         self.migration_logger = MigrationLogger(migrate_dir)
+        self.get_pending_choices(migrate_dir)
 
-        sse_log_queue = Queue()
+        sse_log_queue = LogBuffer()
         self.log_queues[migration_id] = sse_log_queue
         self.active_downloads[migration_id] = True
 
@@ -1295,8 +1744,10 @@ class DownloadManager:
         else:
             thread_log_queue = sse_log_queue
 
-        thread = threading.Thread(
-            target=self._migration_thread,
+        self.jobs.submit(
+            migration_id,
+            "migration",
+            self._migration_thread,
             args=(
                 migration_id,
                 audio_dir,
@@ -1306,10 +1757,14 @@ class DownloadManager:
                 fallback,
                 thread_log_queue,
                 save_logs,
+                offline,
+                migrate_dir,
+            ),
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                migration_id, log_queue, save_logs
             ),
-            daemon=True,
         )
-        thread.start()
 
     def _migration_thread(
         self,
@@ -1321,10 +1776,14 @@ class DownloadManager:
         fallback,
         log_queue,
         save_logs,
+        offline=False,
+        migrate_dir=None,
     ):
         log_queue.put(
             f"[MIGRATION] Starting library migration With {match_perc}% accuracy..."
         )
+        if offline:
+            log_queue.put("[MIGRATION] Offline mode: using cached search results only")
 
         try:
             match_threshold = float(match_perc) / 100.0
@@ -1339,245 +1798,362 @@ class DownloadManager:
                     entries.append(os.path.join(root, filename))
 
         entries.sort(key=lambda p: os.path.basename(p).lower())
-        try:
-            for i, path in enumerate(entries):
-                filename = os.path.basename(path)
-                log_queue.put(
-                    f"[MIGRATE] Migrating File {i + 1}/{len(entries)}: {filename}"
-                )
 
-                try:
-                    meta = self.get_audio_metadata(path)
-                    if not meta:
-                        raise Exception("MetaData was not fetched")
-                    title = meta["title"]
-                    artist = meta["artist"]
+        # A recovered or resumed migration skips the files it already
+        # handled, under their old name or the one they were renamed to
+        try:
+            handled = self.job_store.done_items(migration_id)
+        except Exception as e:
+            log_queue.put(f"[WARNING] Could not read migration progress: {str(e)}")
+            handled = {}
+        if handled:
+            handled = set(handled) | {new_path for new_path in handled.values() if new_path}
+            skipped = len(entries)
+            entries = [path for path in entries if path not in handled]
+            skipped -= len(entries)
+            if skipped:
+                log_queue.put(f"[MIGRATION] Skipping {skipped} files migrated by an earlier run")
+
+        # Playlist references are rewritten in batches, journaled in migrate_dir
+        journal_path = (
+            os.path.join(migrate_dir, "playlist_renames.jsonl") if migrate_dir else None
+        )
+        playlist_batch = PlaylistRenameBatch(
+            playlist_dir,
+            journal_path=journal_path,
+            checkpoint=self.migration_playlist_checkpoint,
+            index=self.playlist_index,
+        )
 
-                    log_queue.put(f"[SCAN] {title} — {artist}")
+        try:
+            if journal_path:
+                PlaylistRenameBatch.replay(journal_path, log_queue, self.playlist_index)
+
+            # Searches and scoring run in the pool; renames are applied here,
+            # one at a time, in the order results arrive
+            with ThreadPoolExecutor(
+                max_workers=self.migration_workers,
+                thread_name_prefix="migration-search",
+            ) as pool:
+                def match(path):
+                    # Paused/cancelled migrations stop searching too
+                    self.jobs.checkpoint(log_queue)
+                    return self._match_migration_file(path, match_threshold, offline)
+
+                futures = {pool.submit(match, path): path for path in entries}
+
+                for done, future in enumerate(as_completed(futures), 1):
+                    path = futures[future]
+                    filename = os.path.basename(path)
+                    log_queue.put(
+                        f"[MIGRATE] Migrating File {done}/{len(entries)}: {filename}"
+                    )
 
-                    query = f"{title} {artist}"
-                    search_filter = "songs"
+                    try:
+                        self.jobs.checkpoint(log_queue)
+                        result = future.result()
+                        for message in result["logs"]:
+                            log_queue.put(message)
+
+                        with self.migration_apply_lock:
+                            new_path = self._resolve_migration_match(
+                                migration_id,
+                                result,
+                                match_threshold,
+                                fallback,
+                                lyrics_dir,
+                                playlist_dir,
+                                log_queue,
+                                playlist_batch=playlist_batch,
+                            )
+                            if playlist_batch.due():
+                                playlist_batch.flush(log_queue)
+                        self._job_item(log_queue, path, "done", new_path)
+                    except JobCancelled:
+                        # Drop files not searched yet (by hand: Python 3.8)
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+                    except Exception as e:
+                        self._job_item(log_queue, path, "failed", str(e))
+                        log_queue.put(f"[ERROR] {filename}: {str(e)}")
 
-                    # --- First pass: VIDEOS ---
-                    cleaned = self._search_and_clean(
-                        query, title, artist, match_threshold, search_filter=search_filter
-                    )
+            pending = len(self.pending_choices.ids(migration_id))
+            if pending:
+                log_queue.put(
+                    f"[MIGRATION] {pending} files are waiting in the pending choices queue"
+                )
+        except JobCancelled:
+            log_queue.put("[CANCELLED] Migration cancelled")
+        except Exception as e:
+            log_queue.put(f"[ERROR] Migration thread error: {str(e)}")
 
-                    # --- Second pass: SONGS (only if low confidence) ---
-                    if not cleaned:
-                        log_queue.put(
-                            "[RETRY] Low confidence — retrying with Videos filter"
-                        )
-                        search_filter = "videos"
-
-                        cleaned = self._search_and_clean(
-                            query,
-                            title,
-                            artist,
-                            match_threshold,
-                            search_filter=search_filter,
-                            log_queue=log_queue,
-                        )
-                        log_queue.put(f"[RETRY] Low confidence — retrying result {cleaned}")
+        finally:
+            try:
+                with self.migration_apply_lock:
+                    playlist_batch.flush(log_queue)
+            except Exception as e:
+                log_queue.put(f"[ERROR] Playlist update failed: {str(e)}")
 
-                    if len(cleaned) == 1:
-                        log_queue.put(f"result {cleaned}")
-                        self._apply_migration(
-                            lyrics_dir,
-                            playlist_dir,
-                            path,
-                            cleaned[0]["videoId"],
-                            log_queue,
-                        )
-                    elif len(cleaned) > 1:
-                        if fallback == "manual":
-                            log_queue.put("[CHOICE_REQUIRED]")
+            log_queue.put("[MIGRATION] Completed")
+            if save_logs:
+                self.log_manager.stop_logging(migration_id)
 
-                            choice_event = threading.Event()
-                            self.migration_choices[migration_id] = {
-                                "event": choice_event,
-                                "action": None,
-                                "video_id": None,
-                            }
+            self.active_downloads.pop(migration_id, None)
+            log_queue.put("[END]")
 
-                            log_queue.put(
-                                json.dumps(
-                                    {
-                                        "type": "choice",
-                                        "file": path,
-                                        "title": title,
-                                        "artist": artist,
-                                        "candidates": cleaned[:10],
-                                        "allow_research": True,
-                                        "allow_manual": True,
-                                        "search_filter": search_filter,
-                                    }
-                                )
-                            )
+    def _match_migration_file(self, path, match_threshold, offline=False):
+        """Read tags and search YouTube Music for one file (runs in the pool)"""
+        logs = []
+
+        meta = self.get_audio_metadata(path)
+        if not meta:
+            raise Exception("MetaData was not fetched")
+        title = meta["title"]
+        artist = meta["artist"]
+
+        logs.append(f"[SCAN] {title} — {artist}")
+
+        query = f"{title} {artist}"
+        search_filter = "songs"
+
+        # --- First pass: SONGS ---
+        cleaned = self._search_and_clean(
+            query,
+            title,
+            artist,
+            match_threshold,
+            search_filter=search_filter,
+            offline=offline,
+        )
 
-                            choice_event.wait()
+        # --- Second pass: VIDEOS (only if low confidence) ---
+        if not cleaned:
+            logs.append("[RETRY] Low confidence — retrying with Videos filter")
+            search_filter = "videos"
 
-                            choice = self.migration_choices[migration_id]
-                            del self.migration_choices[migration_id]
+            cleaned = self._search_and_clean(
+                query,
+                title,
+                artist,
+                match_threshold,
+                search_filter=search_filter,
+                offline=offline,
+            )
+            logs.append(f"[RETRY] Low confidence — retrying result {cleaned}")
 
-                            if choice["action"] == "select":
-                                self._apply_migration(
-                                    lyrics_dir,
-                                    playlist_dir,
-                                    path,
-                                    choice["video_id"],
-                                    log_queue,
-                                )
-                                continue
+        return {
+            "path": path,
+            "title": title,
+            "artist": artist,
+            "query": query,
+            "search_filter": search_filter,
+            "cleaned": cleaned,
+            "logs": logs,
+        }
 
-                            if choice["action"] == "manual":
-                                log_queue.put("[MANUAL] User provided video ID")
+    def _resolve_migration_match(
+        self,
+        migration_id,
+        match,
+        match_threshold,
+        fallback,
+        lyrics_dir,
+        playlist_dir,
+        log_queue,
+        playlist_batch=None,
+    ):
+        """
+        Apply, skip or defer a scored file according to the fallback policy.
+        Returns the file's path after a rename, if it was applied.
+        """
+        path = match["path"]
+        title = match["title"]
+        artist = match["artist"]
+        cleaned = match["cleaned"]
+
+        if len(cleaned) == 1:
+            log_queue.put(f"result {cleaned}")
+            return self._apply_migration(
+                lyrics_dir,
+                playlist_dir,
+                path,
+                cleaned[0]["videoId"],
+                log_queue,
+                playlist_batch,
+            )
+        elif len(cleaned) > 1:
+            if fallback == "manual":
+                payload = {
+                    "type": "choice",
+                    "migration_id": migration_id,
+                    "file": path,
+                    "title": title,
+                    "artist": artist,
+                    "query": match["query"],
+                    "candidates": cleaned[:10],
+                    "allow_research": True,
+                    "allow_manual": True,
+                    "search_filter": match["search_filter"],
+                    "match_threshold": match_threshold,
+                    "lyrics_dir": lyrics_dir,
+                    "playlist_dir": playlist_dir,
+                }
+                payload["choice_id"] = self.pending_choices.add(payload)
+                payload["pending"] = self.pending_choices.count()
+
+                log_queue.put("[QUEUED] Multiple candidates — added to pending choices")
+                log_queue.put(json.dumps(payload))
+            elif fallback == "best":
+                return self._apply_migration(
+                    lyrics_dir,
+                    playlist_dir,
+                    path,
+                    cleaned[0]["videoId"],
+                    log_queue,
+                    playlist_batch,
+                )
+            else:
+                self._log_migration(
+                    path,
+                    title,
+                    artist,
+                    "ambiguous",
+                    "multiple_matches",
+                    candidates=cleaned[:10],
+                )
+                log_queue.put("[AMBIGUOUS] Multiple candidates found")
+        else:
+            self._log_migration(path, title, artist, "skipped", "low_confidence")
+            log_queue.put("[SKIPPED] Low Confidance")
 
-                                self._apply_migration(
-                                    lyrics_dir,
-                                    playlist_dir,
-                                    path,
-                                    choice["video_id"],
-                                    log_queue,
-                                )
-                                continue
+    def get_pending_choices(self, migrate_dir):
+        """Open (or reuse) the pending choice queue stored in migrate_dir"""
+        if self.pending_choices is None or self.pending_choices.migrate_dir != migrate_dir:
+            self.pending_choices = PendingChoiceStore(migrate_dir)
+        if not self.migration_logger:
+            self.migration_logger = MigrationLogger(migrate_dir)
+        return self.pending_choices
 
-                            action = choice["action"]
-                            if action and action.startswith("research_"):
-                                search_filter = action.split("_", 1)[1]
-                                log_queue.put(
-                                    f"[RESEARCH] User requested {search_filter.upper()} search"
-                                )
+    def resolve_migration_choice(self, choice_id, action, video_id=None):
+        """
+        Answer one queued migration choice.
+        action: select | manual | best | skip | research_songs | research_videos
+        Returns a dict with the resulting status and the log lines produced.
+        """
+        store = self.pending_choices
+        entry = store.get(choice_id) if store else None
+        if not entry:
+            return {"choice_id": choice_id, "status": "missing", "logs": []}
 
-                                cleaned = self._search_and_clean(
-                                    query,
-                                    title,
-                                    artist,
-                                    match_threshold,
-                                    search_filter=search_filter,
-                                )
+        logs = Queue()
+        path = entry["file"]
+        title = entry.get("title")
+        artist = entry.get("artist")
+        result = {"choice_id": choice_id}
 
-                                if cleaned:
-                                    choice_event = threading.Event()
-                                    self.migration_choices[migration_id] = {
-                                        "event": choice_event,
-                                        "action": None,
-                                        "video_id": None,
-                                    }
-
-                                    log_queue.put(
-                                        json.dumps(
-                                            {
-                                                "type": "choice",
-                                                "file": path,
-                                                "title": title,
-                                                "artist": artist,
-                                                "candidates": cleaned[:10],
-                                                "allow_research": False,  # prevent infinite loop
-                                                "allow_manual": True,
-                                                "search_filter": search_filter,
-                                            }
-                                        )
-                                    )
-
-                                    choice_event.wait()
-                                    choice = self.migration_choices[migration_id]
-                                    del self.migration_choices[migration_id]
-
-                                    if choice["action"] == "select":
-                                        self._apply_migration(
-                                            lyrics_dir,
-                                            playlist_dir,
-                                            path,
-                                            choice["video_id"],
-                                            log_queue,
-                                        )
-                                    if choice["action"] == "manual":
-                                        log_queue.put("[MANUAL] User provided video ID")
-
-                                        self._apply_migration(
-                                            lyrics_dir,
-                                            playlist_dir,
-                                            path,
-                                            choice["video_id"],
-                                            log_queue,
-                                        )
-                                        continue
-                                    else:
-                                        self._log_migration(
-                                            path,
-                                            title,
-                                            artist,
-                                            "skipped",
-                                            "user skipped",
-                                        )
-                                        log_queue.put(
-                                            "[SKIP] User skipped after SONGS search"
-                                        )
-
-                                else:
-                                    self._log_migration(
-                                        path,
-                                        title,
-                                        artist,
-                                        "skipped",
-                                        "no matches were found",
-                                    )
-                                    log_queue.put("[SKIP] No SONGS matches found")
-
-                                continue
-
-                            self._log_migration(
-                                path,
-                                title,
-                                artist,
-                                "skipped",
-                                "user skipped",
-                            )
-                            log_queue.put("[SKIP] User skipped")
-                            continue
-                        elif fallback == "best":
-                            self._apply_migration(
-                                lyrics_dir,
-                                playlist_dir,
-                                path,
-                                cleaned[0]["videoId"],
-                                log_queue,
-                            )
-                            continue
-                        else:
-                            self._log_migration(
-                                path,
-                                title,
-                                artist,
-                                "ambiguous",
-                                "multiple_matches",
-                                candidates=cleaned[:10],
-                            )
-                            log_queue.put("[AMBIGUOUS] Multiple candidates found")
-                    else:
-                        self._log_migration(
-                            path, title, artist, "skipped", "low_confidence"
-                        )
-                        log_queue.put("[SKIPPED] Low Confidance")
+        try:
+            if action == "best":
+                action = "select"
+                video_id = entry["candidates"][0]["videoId"]
+
+            if action in ("select", "manual") and video_id:
+                if action == "manual":
+                    logs.put("[MANUAL] User provided video ID")
+                with self.migration_apply_lock:
+                    self._apply_migration(
+                        entry["lyrics_dir"],
+                        entry["playlist_dir"],
+                        path,
+                        video_id,
+                        logs,
+                    )
+                store.remove(choice_id)
+                result["status"] = "applied"
+
+            elif action and action.startswith("research_"):
+                search_filter = action.split("_", 1)[1]
+                logs.put(f"[RESEARCH] User requested {search_filter.upper()} search")
+
+                cleaned = self._search_and_clean(
+                    entry["query"],
+                    title,
+                    artist,
+                    entry.get("match_threshold", 0.85),
+                    search_filter=search_filter,
+                )
 
-                except Exception as e:
-                    log_queue.put(f"[ERROR] {filename}: {str(e)}")
-        except Exception as e:
-                log_queue.put(f"[ERROR] Migration thread error: {str(e)}")
+                if cleaned:
+                    result["status"] = "updated"
+                    result["choice"] = store.update(
+                        choice_id,
+                        candidates=cleaned[:10],
+                        search_filter=search_filter,
+                        allow_research=False,  # prevent infinite loop
+                    )
+                else:
+                    self._log_migration(
+                        path, title, artist, "skipped", "no matches were found"
+                    )
+                    logs.put(f"[SKIP] No {search_filter.upper()} matches found")
+                    store.remove(choice_id)
+                    result["status"] = "skipped"
 
-        finally:
-            log_queue.put("[MIGRATION] Completed")
-            if save_logs:
-                self.log_manager.stop_logging(migration_id)
+            else:
+                self._log_migration(path, title, artist, "skipped", "user skipped")
+                logs.put("[SKIP] User skipped")
+                store.remove(choice_id)
+                result["status"] = "skipped"
 
-            self.active_downloads.pop(migration_id, None)
-            log_queue.put("[END]")
+        except Exception as e:
+            logs.put(f"[ERROR] {os.path.basename(path)}: {str(e)}")
+            result["status"] = "error"
+            result["error"] = str(e)
+
+        messages = []
+        while not logs.empty():
+            messages.append(logs.get())
+
+        # Mirror into the migration's live stream when it is still running
+        migration_id = entry.get("migration_id")
+        if migration_id in self.active_downloads and migration_id in self.log_queues:
+            for message in messages:
+                self.log_queues[migration_id].put(message)
+
+        result["logs"] = messages
+        return result
+
+    def _get_ytmusic(self):
+        """Per-thread YTMusic client so pool workers don't share a session"""
+        client = getattr(self._thread_local, "ytmusic", None)
+        if client is None:
+            client = YTMusic()
+            self._thread_local.ytmusic = client
+        return client
+
+    def _cached_search(self, query, search_filter, offline=False):
+        """YTMusic search through the persistent search cache"""
+        results = self.search_cache.get(query, search_filter)
+        if results is not None or offline:
+            return results or []
+
+        results = UPSTREAM.call(
+            "ytmusic_search", self._get_ytmusic().search, query, filter=search_filter
+        )
+        self.search_cache.set(query, search_filter, results)
+        return results
 
     def _search_and_clean(
-        self, query, title, artist, match_threshold, search_filter, log_queue=None
+        self,
+        query,
+        title,
+        artist,
+        match_threshold,
+        search_filter,
+        log_queue=None,
+        offline=False,
     ):
-        results = self.ytmusic.search(query, filter=search_filter)
+        results = self._cached_search(query, search_filter, offline=offline)
         if log_queue:
             log_queue.put(f"[RETRY] retrying result {results}")
         if not results:
@@ -1631,43 +2207,12 @@ class DownloadManager:
         except Exception:
             return None
 
-    def title_similarity(self, a, b):
-        return SequenceMatcher(None, a, b).ratio()
-
     def filter_song_matches(self, results, target_title, target_artist):
-        target_title_n = target_title
-
-        # Split artists by commas and normalize
-        target_artist_parts = [p.strip().lower() for p in target_artist.split(",")]
-
-        scored = []
-
-        for r in results:
-            # Get all artist names from result
-            result_artists = [a["name"].lower() for a in r.get("artists", [])]
-
-            # Calculate how many target artist parts match
-            matching_parts = sum(
-                1
-                for part in target_artist_parts
-                if any(part in artist or artist in part for artist in result_artists)
-            )
-
-            # Require at least one artist to match (or adjust threshold)
-            if matching_parts == 0:
-                continue
-
-            result_title_n = r.get("title", "")
-            score = self.title_similarity(target_title_n, result_title_n)
-
-            # Bonus for more artist matches
-            artist_match_ratio = matching_parts / len(target_artist_parts)
-            adjusted_score = score * (0.7 + 0.3 * artist_match_ratio)  # Weighted
-
-            scored.append((adjusted_score, r))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored
+        """
+        Score search results against a local track, best first.
+        Results sharing no artist with the track are dropped.
+        """
+        return score_candidates(target_title, target_artist, results)
 
     def _extract_video_id(self, base_name):
         """
@@ -1677,7 +2222,10 @@ class DownloadManager:
         match = YOUTUBE_ID_RE.search(base_name)
         return match.group("id") if match else None
 
-    def _apply_migration(self, lyrics_dir, playlist_dir, path, video_id, log_queue):
+    def _apply_migration(
+        self, lyrics_dir, playlist_dir, path, video_id, log_queue, playlist_batch=None
+    ):
+        """Rename a file to carry video_id; returns its path afterwards, or None"""
         base, ext = os.path.splitext(path)
         dirname = os.path.dirname(path)
         filename = os.path.basename(base)
@@ -1695,7 +2243,7 @@ class DownloadManager:
                 new_path=path,
                 video_id=video_id,
             )
-            return
+            return path
 
         if existing_id and existing_id != video_id:
             log_queue.put(f"[UPDATE] Replacing videoId {existing_id} → {video_id}")
@@ -1719,11 +2267,16 @@ class DownloadManager:
             )
             return
 
+        if playlist_batch:
+            # Journaled before the rename; playlists are rewritten at the next flush
+            playlist_batch.add(path, new_path)
+
         os.rename(path, new_path)
         log_queue.put(f"[RENAMED] Audio → {new_filename}")
 
         self._migrate_lyrics(lyrics_dir, path, new_path, video_id, log_queue)
-        self._migrate_playlists(playlist_dir, path, new_path, log_queue)
+        if not playlist_batch:
+            self._migrate_playlists(playlist_dir, path, new_path, log_queue)
 
         self._log_migration(
             path,
@@ -1734,6 +2287,7 @@ class DownloadManager:
             new_path=new_path,
             video_id=video_id,
         )
+        return new_path
 
     def _migrate_lyrics(self, lyrics_dir, old_audio, new_audio, video_id, log_queue):
         if not lyrics_dir:
@@ -1763,53 +2317,16 @@ class DownloadManager:
         if not playlist_dir:
             return
 
-        updated = 0
-        old_name = os.path.basename(old_audio)
-        new_name = os.path.basename(new_audio)
-
-        for root, _, files in os.walk(playlist_dir):
-            for f in files:
-                if not f.lower().endswith((".m3u", ".m3u8")):
-                    continue
-
-                playlist_path = os.path.join(root, f)
-
-                try:
-                    with open(playlist_path, "r", encoding="utf-8") as file:
-                        lines = file.readlines()
-
-                    changed = False
-                    new_lines = []
-
-                    for line in lines:
-                        stripped = line.strip()
-
-                        if stripped.endswith(old_name):
-                            line = line.replace(old_name, new_name)
-                            changed = True
-
-                        new_lines.append(line)
-
-                    if changed:
-                        with open(playlist_path, "w", encoding="utf-8") as file:
-                            file.writelines(new_lines)
-
-                        updated += 1
-                        log_queue.put(f"[PLAYLIST] Updated {f}")
-
-                except Exception as e:
-                    log_queue.put(f"[FAIL] Playlist {f}: {e}")
-
-        if updated == 0:
-            log_queue.put("[INFO] No playlist references found")
-
-
+        batch = PlaylistRenameBatch(playlist_dir, index=self.playlist_index)
+        batch.add(old_audio, new_audio)
+        batch.flush(log_queue)
 
     def start_move_copy(self, operation_id, source_audio, source_lyrics, source_playlists,
                         dest_audio, dest_lyrics, dest_playlists, process_audio,
                         process_lyrics, process_playlists, update_playlists, mode,
                         save_logs=False, log_queue=None):
-        sse_log_queue = Queue()
+        self._journal_job(operation_id, "move_copy", locals())
+        sse_log_queue = LogBuffer()
         self.log_queues[operation_id] = sse_log_queue
         self.active_downloads[operation_id] = True
 
@@ -1824,15 +2341,19 @@ class DownloadManager:
         else:
             thread_log_queue = sse_log_queue
 
-        thread = threading.Thread(
-            target=self._move_copy_thread,
+        self.jobs.submit(
+            operation_id,
+            "move_copy",
+            self._move_copy_thread,
             args=(operation_id, source_audio, source_lyrics, source_playlists,
                 dest_audio, dest_lyrics, dest_playlists, process_audio,
                 process_lyrics, process_playlists, update_playlists, mode,
                 thread_log_queue, save_logs),
-            daemon=True
+            log_queue=thread_log_queue,
+            on_cancel=lambda log_queue: self._job_cancelled(
+                operation_id, log_queue, save_logs
+            ),
         )
-        thread.start()
 
     def _move_copy_thread(self, operation_id, source_audio, source_lyrics, source_playlists,
                         dest_audio, dest_lyrics, dest_playlists, process_audio,
@@ -1842,151 +2363,76 @@ class DownloadManager:
             log_queue.put("[MOVE/COPY] Starting library move/copy operation")
             log_queue.put(f"[MODE] {mode.upper()}")
 
-            audio_map = {}   # old_path -> new_path
-            lyrics_map = {}
-            playlist_map = {}
-
-            if process_audio and os.path.isdir(source_audio):
-                log_queue.put("[AUDIO] Scanning source audio directory...")
-                for root, _, files in os.walk(source_audio):
-                    for f in files:
-                        if f.lower().endswith(AUDIO_EXTENSIONS):
-                            old_path = os.path.join(root, f)
-                            rel_path = os.path.relpath(old_path, source_audio)
-                            new_path = os.path.join(dest_audio, rel_path)
-                            audio_map[old_path] = new_path
-
-            if process_lyrics and os.path.isdir(source_lyrics):
-                log_queue.put("[LYRICS] Scanning source lyrics directory...")
-                for root, _, files in os.walk(source_lyrics):
-                    for f in files:
-                        if f.lower().endswith('.lrc'):
-                            old_path = os.path.join(root, f)
-                            rel_path = os.path.relpath(old_path, source_lyrics)
-                            new_path = os.path.join(dest_lyrics, rel_path)
-                            lyrics_map[old_path] = new_path
-
-            if process_playlists and os.path.isdir(source_playlists):
-                log_queue.put("[PLAYLIST] Scanning source playlist directory...")
-                for root, _, files in os.walk(source_playlists):
-                    for f in files:
-                        if f.lower().endswith(('.m3u', '.m3u8', '.pls')):
-                            old_path = os.path.normpath(os.path.join(root, f))
-                            if not os.path.exists(old_path):
-                                log_queue.put(f"[WARNING] Playlist file not found: {old_path}")
-                                continue
-                            rel_path = os.path.relpath(old_path, source_playlists)
-                            new_path = os.path.normpath(os.path.join(dest_playlists, rel_path))
-                            playlist_map[old_path] = new_path
-
-            total_files = len(audio_map) + len(lyrics_map) + len(playlist_map)
-            processed = 0
-
-            def process_file(old, new, file_type):
-                nonlocal processed
-                try:
-                    old = os.path.normpath(old)
-                    new = os.path.normpath(new)
-                    if not os.path.exists(old):
-                        log_queue.put(f"[WARNING] Source {file_type} file not found: {old}")
-                        processed += 1
-                        log_queue.put(f"[PROGRESS] {processed}/{total_files}")
-                        return
-
-                    dest_dir = os.path.dirname(new)
-                    os.makedirs(dest_dir, exist_ok=True)
-
-                    # Check if destination directory is writable
-                    if not os.access(dest_dir, os.W_OK):
-                        log_queue.put(f"[ERROR] Destination directory not writable: {dest_dir}")
-                        processed += 1
-                        log_queue.put(f"[PROGRESS] {processed}/{total_files}")
-                        return
-
-                    # If destination file exists and is read-only, try to make it writable
-                    if os.path.exists(new) and not os.access(new, os.W_OK):
-                        try:
-                            os.chmod(new, 0o644)
-                            log_queue.put(f"[{file_type}] Changed permissions for existing file: {os.path.basename(new)}")
-                        except Exception as perm_e:
-                            log_queue.put(f"[WARNING] Could not change permissions for {new}: {str(perm_e)}")
-
-                    if mode == 'move':
-                        shutil.move(old, new)
-                        log_queue.put(f"[{file_type}] Moved: {os.path.basename(old)}")
-                    else:
-                        shutil.copy2(old, new)
-                        log_queue.put(f"[{file_type}] Copied: {os.path.basename(old)}")
-                except PermissionError as e:
-                    log_queue.put(f"[ERROR] Permission denied when {mode}ing {file_type} from {old} to {new}: {str(e)}. Check write permissions on destination directory.")
-                except Exception as e:
-                    log_queue.put(f"[ERROR] Failed to {mode} {file_type} {old}: {str(e)}")
-                finally:
-                    processed += 1
-                    log_queue.put(f"[PROGRESS] {processed}/{total_files}")
-
-            for old, new in audio_map.items():
-                process_file(old, new, "AUDIO")
-
-            for old, new in lyrics_map.items():
-                process_file(old, new, "LYRICS")
+            audio_map, lyrics_map, playlist_map = self._scan_move_copy(
+                source_audio, source_lyrics, source_playlists,
+                dest_audio, dest_lyrics, dest_playlists,
+                process_audio, process_lyrics, process_playlists, log_queue,
+            )
 
-            for old, new in playlist_map.items():
-                process_file(old, new, "PLAYLIST")
+            # Files finished by an interrupted run of the same job are skipped;
+            # in move mode they are gone from the source, so take them from
+            # the journal to keep playlist references complete
+            engine = TransferEngine(
+                mode,
+                journal_path=os.path.join(
+                    self.transfer_journal_dir,
+                    journal_key(mode, source_audio, source_lyrics, source_playlists,
+                                dest_audio, dest_lyrics, dest_playlists) + ".jsonl",
+                ),
+                workers=storage_workers(dest_audio or dest_playlists),
+            )
+            for old, new in engine.resumed("AUDIO").items():
+                audio_map.setdefault(old, new)
+            resumed_playlists = engine.resumed("PLAYLIST") if process_playlists else {}
+            for old, new in resumed_playlists.items():
+                playlist_map.setdefault(old, new)
+            if engine.journal.done:
+                log_queue.put(f"[RESUME] {len(engine.journal.done)} files already transferred by a previous run")
+
+            # Index source playlists before anything moves so reference
+            # updates only touch playlists that contain a moved track.
+            # Playlists an earlier run already transferred are no longer in
+            # the source index and may still hold old references.
+            affected_playlists = set()
+            if update_playlists and playlist_map:
+                affected_playlists = self._affected_playlists(audio_map, source_playlists)
+                affected_playlists.update(os.path.abspath(old) for old in resumed_playlists)
+
+            items = (
+                [(old, new, "AUDIO") for old, new in audio_map.items()]
+                + [(old, new, "LYRICS") for old, new in lyrics_map.items()]
+                + [(old, new, "PLAYLIST") for old, new in playlist_map.items()]
+            )
+            log_queue.put(f"[MOVE/COPY] {len(items)} files, {engine.workers} workers")
+            # The journal outlives the transfer until references are updated,
+            # so a job stopped in between redoes them when run again
+            result = engine.run(
+                items,
+                log_queue,
+                checkpoint=lambda: self.jobs.checkpoint(log_queue),
+                keep_journal=True,
+            )
+            self._record_transfer_rate(result["bytes"], result["elapsed"])
+            self.jobs.checkpoint(log_queue)
 
             if update_playlists and process_playlists and playlist_map:
                 log_queue.put("[PLAYLIST] Updating references in moved/copied playlists...")
-                old_to_new_audio = audio_map
-                new_to_old_audio = {v: k for k, v in old_to_new_audio.items()}
-
-                for old_playlist, new_playlist in playlist_map.items():
-                    with open(old_playlist, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-
-                    path_style = self._detect_playlist_path_style(lines)
-                    playlist_dir_old = os.path.dirname(old_playlist)
-                    playlist_dir_new = os.path.dirname(new_playlist)
-
-                    updated_lines = []
-                    changes = 0
-
-                    for line in lines:
-                        stripped = line.strip()
-                        if not stripped or stripped.startswith('#'):
-                            updated_lines.append(line)
-                            continue
-
-                        # Resolve original audio file path from playlist entry
-                        if path_style == 'absolute':
-                            old_audio_path = stripped
-                        elif path_style == 'relative':
-                            old_audio_path = os.path.normpath(os.path.join(playlist_dir_old, stripped))
-                        else:  # filename only
-                            basename = os.path.basename(stripped)
-                            matches = [old for old in old_to_new_audio if os.path.basename(old) == basename]
-                            old_audio_path = matches[0] if matches else None
-
-                        if old_audio_path and old_audio_path in old_to_new_audio:
-                            new_audio_path = old_to_new_audio[old_audio_path]
-                            if path_style == 'absolute':
-                                new_entry = new_audio_path
-                            elif path_style == 'relative':
-                                new_entry = os.path.relpath(new_audio_path, playlist_dir_new)
-                            else:  # filename only
-                                new_entry = os.path.basename(new_audio_path)
-                            updated_lines.append(new_entry + '\n')
-                            changes += 1
-                            log_queue.put(f"[PLAYLIST] Updated reference: {os.path.basename(old_audio_path)} → {os.path.basename(new_audio_path)}")
-                        else:
-                            # Keep original line (could not resolve or not moved)
-                            updated_lines.append(line)
+                self._update_playlist_references(
+                    audio_map,
+                    {old: new for old, new in playlist_map.items()
+                     if os.path.abspath(old) in affected_playlists},
+                    source_audio,
+                    log_queue,
+                )
 
-                    if changes > 0:
-                        with open(new_playlist, 'w', encoding='utf-8') as f:
-                            f.writelines(updated_lines)
-                        log_queue.put(f"[PLAYLIST] Updated {changes} entries in {os.path.basename(new_playlist)}")
+            if process_playlists and mode == 'move':
+                self.playlist_index.scan(source_playlists)
 
+            if not result["failed"]:
+                engine.journal.remove()
             log_queue.put("[MOVE/COPY COMPLETE]")
+        except JobCancelled:
+            log_queue.put("[CANCELLED] Move/copy cancelled, run it again to resume")
         except Exception as e:
             log_queue.put(f"[ERROR] Move/copy operation failed: {str(e)}")
         finally:
@@ -1995,6 +2441,321 @@ class DownloadManager:
             self.active_downloads.pop(operation_id, None)
             log_queue.put("[END]")
 
+    def plan_move_copy(self, source_audio, source_lyrics, source_playlists,
+                       dest_audio, dest_lyrics, dest_playlists, process_audio,
+                       process_lyrics, process_playlists, update_playlists, mode):
+        """
+        Dry run of a move/copy: scan the sources once and report what would
+        happen. Nothing is created, moved or rewritten.
+        """
+        log_queue = Queue()  # scan messages are not needed here
+        maps = self._scan_move_copy(
+            source_audio, source_lyrics, source_playlists,
+            dest_audio, dest_lyrics, dest_playlists,
+            process_audio, process_lyrics, process_playlists, log_queue,
+        )
+
+        plan = {
+            "mode": mode,
+            "files": {},
+            "bytes": {},
+            "total_files": 0,
+            "total_bytes": 0,
+            "bytes_to_copy": 0,
+            "renames": 0,
+            "unchanged": 0,
+            "conflicts": [],
+            "missing_sources": 0,
+        }
+        dest_devices = {}
+
+        for file_type, file_map in zip(("audio", "lyrics", "playlists"), maps):
+            plan["files"][file_type] = len(file_map)
+            plan["bytes"][file_type] = 0
+
+            for old, new in file_map.items():
+                try:
+                    src_stat = os.stat(old)
+                except OSError:
+                    plan["missing_sources"] += 1
+                    continue
+                plan["bytes"][file_type] += src_stat.st_size
+
+                if TransferEngine._unchanged(src_stat, new):
+                    plan["unchanged"] += 1
+                    continue
+                if os.path.exists(new):
+                    plan["conflicts"].append(new)
+
+                dest_dir = os.path.dirname(new)
+                if dest_dir not in dest_devices:
+                    dest_devices[dest_dir] = self._device_of(dest_dir)
+                if mode == "move" and dest_devices[dest_dir] == src_stat.st_dev:
+                    plan["renames"] += 1
+                else:
+                    plan["bytes_to_copy"] += src_stat.st_size
+
+            plan["total_files"] += plan["files"][file_type]
+            plan["total_bytes"] += plan["bytes"][file_type]
+
+        # Free space per destination filesystem (each counted once)
+        plan["destinations"] = []
+        seen_devices = set()
+        for dest in (dest_audio, dest_lyrics, dest_playlists):
+            if not dest:
+                continue
+            existing = self._existing_parent(dest)
+            device = self._device_of(existing)
+            if device in seen_devices:
+                continue
+            seen_devices.add(device)
+            usage = shutil.disk_usage(existing)
+            plan["destinations"].append({"path": dest, "free_bytes": usage.free})
+
+        free_total = sum(d["free_bytes"] for d in plan["destinations"])
+        plan["enough_space"] = plan["bytes_to_copy"] <= free_total
+
+        # Playlist entries that would be rewritten
+        audio_map, _, playlist_map = maps
+        plan["playlist_updates"] = {}
+        if update_playlists and process_playlists and playlist_map:
+            affected = self._affected_playlists(audio_map, source_playlists)
+            plan["playlist_updates"] = self._update_playlist_references(
+                audio_map,
+                {old: new for old, new in playlist_map.items()
+                 if os.path.abspath(old) in affected},
+                source_audio,
+                log_queue,
+                dry_run=True,
+            )
+        plan["playlist_entries"] = sum(plan["playlist_updates"].values())
+
+        # Duration from throughput measured on earlier transfers, or from a
+        # short read of the largest source file when nothing was measured yet
+        rate, rate_source = self._transfer_rate(maps[0] or maps[1] or maps[2])
+        plan["throughput_bytes_per_sec"] = rate
+        plan["throughput_source"] = rate_source
+        plan["estimated_seconds"] = (
+            round(plan["bytes_to_copy"] / rate + plan["renames"] * 0.001, 1)
+            if rate
+            else None
+        )
+        plan["conflict_count"] = len(plan["conflicts"])
+        plan["conflicts"] = plan["conflicts"][:50]
+        return plan
+
+    @staticmethod
+    def _existing_parent(path):
+        while path and not os.path.exists(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        return path
+
+    def _device_of(self, path):
+        try:
+            return os.stat(self._existing_parent(path)).st_dev
+        except OSError:
+            return None
+
+    def _transfer_rate(self, sample_map):
+        """Return (bytes per second, "measured" | "sampled") or (None, None)"""
+        rate_file = os.path.join(self.transfer_journal_dir, "throughput.json")
+        try:
+            with open(rate_file, "r", encoding="utf-8") as f:
+                return json.load(f)["bytes_per_sec"], "measured"
+        except (OSError, ValueError, KeyError):
+            pass
+
+        sizes = []
+        for old in sample_map:
+            try:
+                sizes.append((os.path.getsize(old), old))
+            except OSError:
+                continue
+        if not sizes:
+            return None, None
+
+        _, sample = max(sizes)
+        start = time.monotonic()
+        read = 0
+        with open(sample, "rb") as f:
+            while read < 32 * 1024 * 1024:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+                read += len(chunk)
+        elapsed = time.monotonic() - start
+        if not read or elapsed <= 0:
+            return None, None
+        return int(read / elapsed), "sampled"
+
+    def _record_transfer_rate(self, copied_bytes, elapsed):
+        """Keep a moving average of copy throughput for dry-run estimates"""
+        # Tiny transfers are dominated by overhead and would skew the estimate
+        if copied_bytes < 16 * 1024 * 1024 or elapsed <= 0:
+            return
+
+        rate_file = os.path.join(self.transfer_journal_dir, "throughput.json")
+        rate = copied_bytes / elapsed
+        try:
+            with open(rate_file, "r", encoding="utf-8") as f:
+                rate = 0.7 * json.load(f)["bytes_per_sec"] + 0.3 * rate
+        except (OSError, ValueError, KeyError):
+            pass
+
+        try:
+            os.makedirs(self.transfer_journal_dir, exist_ok=True)
+            tmp_path = rate_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"bytes_per_sec": int(rate), "updated": time.time()}, f)
+            os.replace(tmp_path, rate_file)
+        except OSError as e:
+            print(f"Error saving transfer throughput: {e}")
+
+    def _scan_move_copy(self, source_audio, source_lyrics, source_playlists,
+                        dest_audio, dest_lyrics, dest_playlists, process_audio,
+                        process_lyrics, process_playlists, log_queue):
+        """Map every source file to its destination: (audio, lyrics, playlists)"""
+        audio_map = {}   # old_path -> new_path
+        lyrics_map = {}
+        playlist_map = {}
+
+        if process_audio and os.path.isdir(source_audio):
+            log_queue.put("[AUDIO] Scanning source audio directory...")
+            for root, _, files in os.walk(source_audio):
+                for f in files:
+                    if f.lower().endswith(AUDIO_EXTENSIONS):
+                        old_path = os.path.join(root, f)
+                        rel_path = os.path.relpath(old_path, source_audio)
+                        new_path = os.path.join(dest_audio, rel_path)
+                        audio_map[old_path] = new_path
+
+        if process_lyrics and os.path.isdir(source_lyrics):
+            log_queue.put("[LYRICS] Scanning source lyrics directory...")
+            for root, _, files in os.walk(source_lyrics):
+                for f in files:
+                    if f.lower().endswith('.lrc'):
+                        old_path = os.path.join(root, f)
+                        rel_path = os.path.relpath(old_path, source_lyrics)
+                        new_path = os.path.join(dest_lyrics, rel_path)
+                        lyrics_map[old_path] = new_path
+
+        if process_playlists and os.path.isdir(source_playlists):
+            log_queue.put("[PLAYLIST] Scanning source playlist directory...")
+            for root, _, files in os.walk(source_playlists):
+                for f in files:
+                    if f.lower().endswith(('.m3u', '.m3u8', '.pls')):
+                        old_path = os.path.normpath(os.path.join(root, f))
+                        if not os.path.exists(old_path):
+                            log_queue.put(f"[WARNING] Playlist file not found: {old_path}")
+                            continue
+                        rel_path = os.path.relpath(old_path, source_playlists)
+                        new_path = os.path.normpath(os.path.join(dest_playlists, rel_path))
+                        playlist_map[old_path] = new_path
+
+        return audio_map, lyrics_map, playlist_map
+
+    def _affected_playlists(self, audio_map, source_playlists):
+        """Source playlists that reference at least one file in audio_map"""
+        self.playlist_index.scan(source_playlists)
+        affected = set()
+        for old_audio in audio_map:
+            affected.update(self.playlist_index.playlists_for(old_audio))
+        return affected
+
+    def _update_playlist_references(self, audio_map, playlist_map, source_audio,
+                                    log_queue, dry_run=False):
+        """
+        Point moved/copied playlists at the new audio locations.
+        Entries are resolved through path, relative path and basename
+        indexes, and playlists are rewritten in parallel.
+        Returns {playlist name: entries changed}; dry_run only counts.
+        """
+        def key(path):
+            return os.path.normcase(os.path.normpath(path))
+
+        by_path = {}
+        by_relpath = {}
+        by_name = {}
+        for old, new in audio_map.items():
+            by_path[key(os.path.abspath(old))] = new
+            if source_audio:
+                by_relpath[key(os.path.relpath(old, source_audio))] = new
+            # First file wins when several share a name, as before
+            by_name.setdefault(os.path.basename(old), new)
+
+        def resolve(entry, playlist_dir_old):
+            """Return (new audio path, entry style) or (None, None)"""
+            entry = entry.replace("\\", os.sep)
+            if os.path.isabs(entry):
+                return by_path.get(key(entry)), "absolute"
+            if os.sep in entry:
+                new = by_path.get(key(os.path.join(playlist_dir_old, entry)))
+                return new or by_relpath.get(key(entry)), "relative"
+            return by_name.get(entry), "filename"
+
+        def rewrite(old_playlist, new_playlist):
+            # In move mode the playlist has already been moved to new_playlist
+            source = old_playlist if os.path.exists(old_playlist) else new_playlist
+            with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.readlines()
+
+            playlist_dir_old = os.path.dirname(os.path.abspath(old_playlist))
+            playlist_dir_new = os.path.dirname(os.path.abspath(new_playlist))
+            changes = 0
+
+            for i, line in enumerate(lines):
+                stripped = line.strip()
+                if not stripped or stripped.startswith('#'):
+                    continue
+
+                new_audio_path, style = resolve(stripped, playlist_dir_old)
+                if not new_audio_path:
+                    continue  # could not resolve or not moved
+
+                if style == 'absolute':
+                    new_entry = os.path.abspath(new_audio_path)
+                elif style == 'relative':
+                    new_entry = os.path.relpath(new_audio_path, playlist_dir_new)
+                else:
+                    new_entry = os.path.basename(new_audio_path)
+
+                if new_entry != stripped:
+                    lines[i] = new_entry + '\n'
+                    changes += 1
+
+            if changes and not dry_run:
+                write_lines_atomic(new_playlist, lines)
+                self.playlist_index.update_playlist(new_playlist, lines)
+            return changes
+
+        updated = {}
+        if not playlist_map:
+            if not dry_run:
+                log_queue.put("[PLAYLIST] No playlists reference moved audio")
+            return updated
+
+        with ThreadPoolExecutor(
+            max_workers=min(8, len(playlist_map)), thread_name_prefix="playlist-refs"
+        ) as pool:
+            futures = {
+                pool.submit(rewrite, old, new): new for old, new in playlist_map.items()
+            }
+            for future in as_completed(futures):
+                name = os.path.basename(futures[future])
+                try:
+                    changes = future.result()
+                    if changes:
+                        updated[name] = changes
+                        if not dry_run:
+                            log_queue.put(f"[PLAYLIST] Updated {changes} entries in {name}")
+                except Exception as e:
+                    log_queue.put(f"[ERROR] Failed to update references in {name}: {str(e)}")
+
+        return updated
+
     def _log_migration(
         self,
         file_path,
@@ -0,0 +1,161 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+# States of jobs that were not done when the server stopped
+UNFINISHED_STATES = ("queued", "running", "paused")
+FINISHED_JOBS_RETENTION = 7 * 24 * 3600
+
+
+class JobStore:
+    """
+    SQLite journal of every operation: its parameters, its state and the
+    state of each item it processes (tracks, retry entries, files).
+
+    Written as jobs change, so after a restart unfinished() lists the
+    operations to start again and item_states() tells them what is done.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    submitted REAL,
+                    updated REAL
+                )
+                """
+            )
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    detail TEXT,
+                    updated REAL,
+                    PRIMARY KEY (job_id, item)
+                )
+                """
+            )
+
+    # ---------- jobs ----------
+
+    def record(self, job_id, job_type, params):
+        """Save a job's parameters; an existing job keeps its items"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO jobs (id, type, params, state, submitted, updated)
+                VALUES (?, ?, ?, 'queued', ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    params = excluded.params, state = 'queued', updated = excluded.updated
+                """,
+                (job_id, job_type, json.dumps(params, ensure_ascii=False), now, now),
+            )
+
+    def set_state(self, job_id, state):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, updated = ? WHERE id = ?",
+                (state, time.time(), job_id),
+            )
+
+    def params(self, job_id):
+        """Saved parameters of a job, or None if it is not journaled"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT params FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unfinished(self):
+        """[(job id, type, params)] in submission order"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT id, type, params FROM jobs
+                WHERE state IN ({",".join("?" * len(UNFINISHED_STATES))})
+                ORDER BY submitted
+                """,
+                UNFINISHED_STATES,
+            ).fetchall()
+        return [(job_id, job_type, json.loads(params)) for job_id, job_type, params in rows]
+
+    def cleanup(self, retention=FINISHED_JOBS_RETENTION):
+        """Forget finished jobs older than retention; close out interrupted cancels"""
+        cutoff = time.time() - retention
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = 'cancelled' WHERE state = 'cancelling'"
+            )
+            self.conn.execute(
+                f"""
+                DELETE FROM job_items WHERE job_id IN (
+                    SELECT id FROM jobs WHERE updated < ?
+                    AND state NOT IN ({",".join("?" * len(UNFINISHED_STATES))})
+                )
+                """,
+                (cutoff, *UNFINISHED_STATES),
+            )
+            self.conn.execute(
+                f"""
+                DELETE FROM jobs WHERE updated < ?
+                AND state NOT IN ({",".join("?" * len(UNFINISHED_STATES))})
+                """,
+                (cutoff, *UNFINISHED_STATES),
+            )
+
+    # ---------- items ----------
+
+    def set_item(self, job_id, item, state, detail=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO job_items (job_id, item, state, detail, updated)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id, item) DO UPDATE SET
+                    state = excluded.state, detail = excluded.detail,
+                    updated = excluded.updated
+                """,
+                (job_id, item, state, detail, time.time()),
+            )
+
+    def item_states(self, job_id):
+        """{item: state} for one job"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT item, state FROM job_items WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def done_items(self, job_id):
+        """{item: detail} of the items of one job that are done"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT item, detail FROM job_items WHERE job_id = ? AND state = 'done'",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def item_counts(self, job_id):
+        """{state: count} for one job"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT state, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY state",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
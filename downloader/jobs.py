@@ -0,0 +1,387 @@
+import os
+import time
+import heapq
+import signal
+import itertools
+import threading
+import subprocess
+
+from .log_buffer import EntryLog
+
+# Lower runs first: single tracks before bulk work before library-wide jobs
+JOB_PRIORITIES = {
+    "download": 0,
+    "retry": 0,
+    "fix_playlist": 1,
+    "bulk_retry": 2,
+    "sync": 2,
+    "move_copy": 3,
+    "migration": 3,
+}
+FINISHED_JOBS_KEPT = 100
+
+
+class JobCancelled(Exception):
+    """Raised at a checkpoint of a job that has been cancelled"""
+
+
+def terminate_process(process, timeout=5):
+    """Stop a child process and whatever it started (yt-dlp -> ffmpeg)"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "posix":
+            # Children are started in their own session, see new_session_kwargs
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def new_session_kwargs():
+    """Popen arguments that let terminate_process() reach grandchildren"""
+    return {"start_new_session": True} if os.name == "posix" else {}
+
+
+class JobScheduler:
+    """
+    Bounded worker pool shared by every long-running operation.
+
+    Jobs wait in a priority queue (JOB_PRIORITIES, then submission order) and
+    at most max_workers run at once, so bursts of requests queue up instead of
+    starting competing yt-dlp/ffmpeg pipelines.
+
+    Running jobs are controlled cooperatively: job code calls checkpoint()
+    with its log queue between items, which blocks while the job is paused
+    and raises JobCancelled once it is cancelled. Child processes registered
+    with track_process() are terminated on cancel. A cancelled or failed job
+    can be queued again with requeue(); the operations resume from their own
+    progress records.
+    """
+
+    def __init__(self, max_workers=3):
+        self.max_workers = max_workers
+        self.cond = threading.Condition()
+        self.queue = []  # (priority, seq, job id)
+        self.jobs = {}  # job id -> job dict
+        self.seq = itertools.count()
+        self.workers = []
+        self.by_queue = {}  # log queue -> job id
+        self.on_state = None  # callback(job id, state), e.g. a persistent journal
+
+    def _notify(self, job_id, state):
+        """Report a state change (lock held, so reports arrive in order)"""
+        if self.on_state:
+            try:
+                self.on_state(job_id, state)
+            except Exception as e:
+                print(f"Error recording job state: {e}")
+
+    def submit(self, job_id, job_type, target, args=(), log_queue=None, on_cancel=None,
+               resume_args=None):
+        """
+        Queue target(*args); returns the queue position (0 = starting now).
+        on_cancel(log_queue) runs if the job is cancelled while queued, with
+        its current log queue. resume_args(args) adjusts the arguments when
+        the job is requeued.
+        """
+        job = {
+            "id": job_id,
+            "type": job_type,
+            "priority": JOB_PRIORITIES.get(job_type, 2),
+            "state": "queued",
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "target": target,
+            "args": args,
+            "log_queue": log_queue,
+            "on_cancel": on_cancel,
+            "resume_args": resume_args,
+            "cancel": threading.Event(),
+            "unpaused": threading.Event(),
+            "processes": set(),
+        }
+        job["unpaused"].set()
+        with self.cond:
+            self.jobs[job_id] = job
+            if log_queue is not None:
+                self.by_queue[log_queue] = job_id
+            heapq.heappush(self.queue, (job["priority"], next(self.seq), job_id))
+            self._ensure_workers()
+            position = self._position(job_id)
+            self._notify(job_id, "queued")
+            self.cond.notify()
+
+        if position and log_queue:
+            log_queue.put(f"[QUEUE] Waiting for a free worker (position {position})")
+        return position
+
+    def _ensure_workers(self):
+        """Start workers up to max_workers (lock must be held)"""
+        while len(self.workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker, name=f"job-worker-{len(self.workers)}", daemon=True
+            )
+            self.workers.append(worker)
+            worker.start()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.queue:
+                    self.cond.wait()
+                _, _, job_id = heapq.heappop(self.queue)
+                job = self.jobs.get(job_id)
+                if not job or job["state"] != "queued":
+                    continue
+                job["state"] = "running"
+                job["started"] = time.time()
+                self._notify(job_id, "running")
+
+            try:
+                job["target"](*job["args"])
+                state = "finished"
+            except JobCancelled:
+                state = "cancelled"
+            except Exception as e:
+                state = "failed"
+                if job["log_queue"]:
+                    job["log_queue"].put(f"[ERROR] Job failed: {str(e)}")
+            if job["cancel"].is_set():
+                state = "cancelled"
+
+            with self.cond:
+                job["state"] = state
+                job["finished"] = time.time()
+                self._prune()
+                self._notify(job_id, state)
+
+    def _prune(self):
+        """Forget the oldest finished jobs (lock must be held)"""
+        finished = [
+            j for j in self.jobs.values() if j["state"] in ("finished", "failed", "cancelled")
+        ]
+        if len(finished) > FINISHED_JOBS_KEPT:
+            finished.sort(key=lambda j: j["finished"] or 0)
+            for job in finished[: len(finished) - FINISHED_JOBS_KEPT]:
+                self.jobs.pop(job["id"], None)
+                self.by_queue.pop(job["log_queue"], None)
+
+    # ---------- queries ----------
+
+    def _position(self, job_id):
+        """0 if running, 1-based place among queued jobs, None if unknown (lock held)"""
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+        if job["state"] in ("running", "paused", "cancelling"):
+            return 0
+        if job["state"] != "queued":
+            return None
+        queued = sorted(
+            entry for entry in self.queue if self.jobs.get(entry[2], {}).get("state") == "queued"
+        )
+        waiting = [entry[2] for entry in queued]
+        # A free worker will pick the job up right away
+        idle = self.max_workers - self._running_count()
+        index = waiting.index(job_id)
+        return 0 if index < idle else index - idle + 1
+
+    def _running_count(self):
+        """Jobs holding a worker, paused ones included"""
+        return sum(
+            1 for j in self.jobs.values() if j["state"] in ("running", "paused", "cancelling")
+        )
+
+    def _describe(self, job):
+        return {
+            "id": job["id"],
+            "type": job["type"],
+            "priority": job["priority"],
+            "state": job["state"],
+            "position": self._position(job["id"]),
+            "submitted": job["submitted"],
+            "started": job["started"],
+            "finished": job["finished"],
+        }
+
+    def get(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            return self._describe(job) if job else None
+
+    def position(self, job_id):
+        with self.cond:
+            return self._position(job_id)
+
+    def list(self):
+        with self.cond:
+            return [self._describe(j) for j in self.jobs.values()]
+
+    def status(self):
+        with self.cond:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running_count(),
+                "queued": sum(1 for j in self.jobs.values() if j["state"] == "queued"),
+            }
+
+    # ---------- cancellation ----------
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs are dropped; running or paused jobs stop at
+        their next checkpoint and their child processes are terminated.
+        Returns the state afterwards, or None if the job is unknown.
+        """
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None
+            state = job["state"]
+            if state == "queued":
+                job["state"] = "cancelled"
+                job["finished"] = time.time()
+            elif state in ("running", "paused"):
+                job["state"] = "cancelling"
+                job["cancel"].set()
+                job["unpaused"].set()
+                processes = list(job["processes"])
+            else:
+                return state
+            self._notify(job_id, job["state"])
+
+        if state == "queued":
+            if job["on_cancel"]:
+                # Requeued jobs log to a new queue: hand over the current one
+                job["on_cancel"](job["log_queue"])
+            return "cancelled"
+
+        if job["log_queue"]:
+            job["log_queue"].put("[CANCELLED] Stopping...")
+        for process in processes:
+            terminate_process(process)
+        return "cancelling"
+
+    def pause(self, job_id):
+        """Hold a running job at its next checkpoint; it keeps its worker"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None
+            if job["state"] != "running":
+                return job["state"]
+            job["state"] = "paused"
+            job["unpaused"].clear()
+            self._notify(job_id, "paused")
+        return "paused"
+
+    def resume(self, job_id):
+        """Let a paused job continue"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None
+            if job["state"] != "paused":
+                return job["state"]
+            job["state"] = "running"
+            job["unpaused"].set()
+            self._notify(job_id, "running")
+        return "running"
+
+    def requeue(self, job_id, log_queue):
+        """
+        Queue a cancelled or failed job again under the same id, logging to
+        log_queue. Returns its queue position, or None if it cannot be requeued.
+        """
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if not job or job["state"] not in ("cancelled", "failed"):
+                return None
+
+            old_queue = job["log_queue"]
+            args = tuple(log_queue if a is old_queue else a for a in job["args"])
+            if job["resume_args"]:
+                args = job["resume_args"](args)
+            self.by_queue.pop(old_queue, None)
+            self.by_queue[log_queue] = job_id
+
+            job.update({
+                "args": args,
+                "log_queue": log_queue,
+                "state": "queued",
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "cancel": threading.Event(),
+                "unpaused": threading.Event(),
+                "processes": set(),
+            })
+            job["unpaused"].set()
+            heapq.heappush(self.queue, (job["priority"], next(self.seq), job_id))
+            self._ensure_workers()
+            position = self._position(job_id)
+            self._notify(job_id, "queued")
+            self.cond.notify()
+
+        if position:
+            log_queue.put(f"[QUEUE] Waiting for a free worker (position {position})")
+        return position
+
+    # ---------- hooks for job code ----------
+
+    def _job_id(self, log_queue):
+        """Job of a log queue; an EntryLog belongs to its target's job (lock held)"""
+        if isinstance(log_queue, EntryLog):
+            log_queue = log_queue.target
+        return self.by_queue.get(log_queue)
+
+    def _job_for(self, log_queue):
+        with self.cond:
+            return self.jobs.get(self._job_id(log_queue))
+
+    def job_id_for(self, log_queue):
+        with self.cond:
+            return self._job_id(log_queue)
+
+    def checkpoint(self, log_queue):
+        """Block while the job is paused; raise JobCancelled once it is cancelled"""
+        job = self._job_for(log_queue)
+        if not job:
+            return
+        if not job["unpaused"].is_set():
+            # The job's own queue, so the line is not held back by an EntryLog
+            job["log_queue"].put("[PAUSED] Waiting to be resumed")
+            job["unpaused"].wait()
+            if not job["cancel"].is_set():
+                job["log_queue"].put("[RESUMED] Continuing")
+        if job["cancel"].is_set():
+            raise JobCancelled()
+
+    def cancelled(self, log_queue):
+        job = self._job_for(log_queue)
+        return bool(job and job["cancel"].is_set())
+
+    def track_process(self, log_queue, process):
+        """Register a child process to terminate if the job is cancelled"""
+        job = self._job_for(log_queue)
+        if not job:
+            return
+        with self.cond:
+            job["processes"].add(process)
+        if job["cancel"].is_set():
+            terminate_process(process)
+
+    def untrack_process(self, log_queue, process):
+        job = self._job_for(log_queue)
+        if job:
+            with self.cond:
+                job["processes"].discard(process)
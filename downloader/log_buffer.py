@@ -0,0 +1,153 @@
+import time
+import threading
+from queue import Queue
+from collections import deque
+
+LOG_BUFFER_LINES = 2000
+# How long the logs of a finished operation stay readable
+FINISHED_LOGS_GRACE = 10 * 60
+
+
+class LogBuffer(Queue):
+    """
+    Queue for an operation's log stream that never grows past max_lines.
+
+    When full, the oldest line is dropped; the next reader is told how many
+    lines it missed. "[END]" is always the newest line, so it is never lost.
+    """
+
+    def __init__(self, max_lines=LOG_BUFFER_LINES):
+        self.max_lines = max_lines
+        super().__init__()
+
+    def _init(self, maxsize):
+        self.queue = deque()
+        self.bytes = 0
+        self.dropped = 0
+        self.unreported = 0
+
+    def _qsize(self):
+        return len(self.queue) + (1 if self.unreported else 0)
+
+    def _put(self, item):
+        if len(self.queue) >= self.max_lines:
+            self.bytes -= len(self.queue.popleft())
+            self.dropped += 1
+            self.unreported += 1
+        self.queue.append(item)
+        self.bytes += len(item)
+
+    def _get(self):
+        if self.unreported:
+            dropped, self.unreported = self.unreported, 0
+            return f"[WARNING] {dropped} log lines dropped"
+        item = self.queue.popleft()
+        self.bytes -= len(item)
+        return item
+
+    def stats(self):
+        with self.mutex:
+            return {
+                "lines": len(self.queue),
+                "bytes": self.bytes,
+                "dropped": self.dropped,
+            }
+
+
+class EntryLog:
+    """
+    Log queue for one of several items a job runs at once. Lines are held
+    back until go_live() (called when the item is next in line), then flushed
+    in order and passed straight through to target, so items do not
+    interleave in the job's log.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.lock = threading.Lock()
+        self.lines = []
+        self.live = False
+
+    def put(self, line):
+        with self.lock:
+            if not self.live:
+                self.lines.append(line)
+                return
+        self.target.put(line)
+
+    def go_live(self):
+        with self.lock:
+            lines, self.lines = self.lines, []
+            for line in lines:
+                self.target.put(line)
+            self.live = True
+
+
+class LogReaper:
+    """
+    Frees the log buffers of finished operations once the grace period has
+    passed, so log_queues does not keep every operation's output forever.
+    """
+
+    def __init__(self, log_queues, active, grace=FINISHED_LOGS_GRACE, interval=60):
+        self.log_queues = log_queues
+        self.active = active
+        self.grace = grace
+        self.interval = interval
+        self.finished = {}  # operation id -> time it was first seen finished
+        self.reaped = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"Error freeing log buffers: {e}")
+
+    def reap(self):
+        """Drop buffers finished for longer than the grace period; returns their count"""
+        now = time.monotonic()
+        reaped = 0
+        with self.lock:
+            for operation_id in list(self.log_queues):
+                if operation_id in self.active:
+                    # Requeued or still running
+                    self.finished.pop(operation_id, None)
+                    continue
+                since = self.finished.setdefault(operation_id, now)
+                if now - since >= self.grace:
+                    self.log_queues.pop(operation_id, None)
+                    self.finished.pop(operation_id, None)
+                    reaped += 1
+            for operation_id in list(self.finished):
+                if operation_id not in self.log_queues:
+                    self.finished.pop(operation_id, None)
+            self.reaped += reaped
+        return reaped
+
+    def stats(self):
+        buffers = [
+            q.stats() for q in list(self.log_queues.values()) if isinstance(q, LogBuffer)
+        ]
+        with self.lock:
+            reaped = self.reaped
+        return {
+            "buffers": len(buffers),
+            "active": sum(1 for i in list(self.log_queues) if i in self.active),
+            "retained_lines": sum(b["lines"] for b in buffers),
+            "retained_bytes": sum(b["bytes"] for b in buffers),
+            "dropped_lines": sum(b["dropped"] for b in buffers),
+            "reaped": reaped,
+            "max_lines": LOG_BUFFER_LINES,
+            "grace_seconds": self.grace,
+        }
@@ -1,4 +1,5 @@
 from ytmusicapi import YTMusic
+from .ratelimit import UPSTREAM
 
 class LyricsManager:
     def __init__(self):
@@ -7,8 +8,12 @@ class LyricsManager:
     def get_lyrics(self, title, artist, video_id, log_queue):
         try:
             log_queue.put("[LYRICS] Searching for lyrics...")
-            lyrics_id = self.ytmusic.get_watch_playlist(video_id, limit=1)
-            lyrics_data = self.ytmusic.get_lyrics(lyrics_id["lyrics"], timestamps=True)
+            lyrics_id = UPSTREAM.call(
+                "ytmusic", self.ytmusic.get_watch_playlist, video_id, limit=1
+            )
+            lyrics_data = UPSTREAM.call(
+                "ytmusic", self.ytmusic.get_lyrics, lyrics_id["lyrics"], timestamps=True
+            )
             
             if not lyrics_data or not lyrics_data.get('lyrics'):
                 log_queue.put("[LYRICS] Lyrics not available for this track")
@@ -0,0 +1,172 @@
+import re
+from functools import lru_cache
+from unidecode import unidecode
+
+# Bracketed or dash-separated title decorations that never identify a song
+NOISE_WORDS = (
+    r"official(?:\s+(?:music|lyrics?|audio|hd))?(?:\s+(?:video|audio|visualizer|mv))?"
+    r"|(?:music|lyrics?|hd|4k)\s+video|lyrics?|audio|visualizer|video|mv|m/v"
+    r"|hd|hq|4k|explicit|clean|radio\s+edit|remaster(?:ed)?(?:\s+\d{4}|\s+in\s+\w+)?"
+    r"|\d{4}\s+remaster(?:ed)?|from\s+[^)\]]+|color\s+coded[^)\]]*"
+)
+BRACKET_NOISE_RE = re.compile(
+    rf"[\(\[]\s*(?:{NOISE_WORDS})\s*[\)\]]", re.IGNORECASE
+)
+DASH_NOISE_RE = re.compile(rf"\s+[-|]\s+(?:{NOISE_WORDS})\s*$", re.IGNORECASE)
+# "(feat. X)", "[with X]" anywhere, or a trailing bare "feat. X"
+FEAT_RE = re.compile(
+    r"[\(\[]\s*(?:feat|ft|featuring|with)\b\.?\s+([^\)\]]+)[\)\]]"
+    r"|\s\b(?:feat|ft|featuring)\b\.?\s+([^\(\[]+)$",
+    re.IGNORECASE,
+)
+ARTIST_SPLIT_RE = re.compile(
+    r"\s*(?:,|&|/|;|\+|\bx\b|\band\b|\bvs\.?|\bfeat\.?|\bft\.?|\bfeaturing\b)\s*",
+    re.IGNORECASE,
+)
+TOPIC_RE = re.compile(r"\s*-\s*topic$", re.IGNORECASE)
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_text(text):
+    """Lowercase ASCII form with punctuation collapsed to single spaces"""
+    return NON_WORD_RE.sub(" ", unidecode(text or "").lower()).strip()
+
+
+@lru_cache(maxsize=65536)
+def clean_title(title):
+    """
+    Strip decorations ("(Official Video)", "- Lyrics", "feat. X") from a title.
+    Returns (normalized_title, featured_artists).
+    """
+    title = title or ""
+    featured = tuple(
+        normalize_text(a)
+        for groups in FEAT_RE.findall(title)
+        for match in groups
+        for a in ARTIST_SPLIT_RE.split(match)
+        if normalize_text(a)
+    )
+    title = FEAT_RE.sub(" ", title)
+    title = BRACKET_NOISE_RE.sub(" ", title)
+    title = DASH_NOISE_RE.sub(" ", title)
+    return normalize_text(title), featured
+
+
+@lru_cache(maxsize=65536)
+def split_artists(artist):
+    """Split "A, B & C feat. D" into normalized names"""
+    artist = TOPIC_RE.sub("", artist or "")
+    return tuple(
+        name for name in (normalize_text(p) for p in ARTIST_SPLIT_RE.split(artist)) if name
+    )
+
+
+def strip_artist_part(title, artists):
+    """Turn "Artist - Title" or "Title - Artist" (video uploads) into "Title" """
+    if " - " not in (title or ""):
+        return title
+    head, tail = title.split(" - ", 1)
+    if any(a in artists for a in split_artists(head)):
+        return tail
+    head, tail = title.rsplit(" - ", 1)
+    if any(a in artists for a in split_artists(tail)):
+        return head
+    return title
+
+
+def bigrams(text):
+    padded = f" {text} "
+    return frozenset(padded[i : i + 2] for i in range(len(padded) - 1))
+
+
+def dice(a, b):
+    """Sørensen–Dice coefficient of two sets"""
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+class TitleFeatures:
+    """Pre-normalized title representation reused across comparisons"""
+
+    __slots__ = ("text", "tokens", "grams", "featured")
+
+    def __init__(self, title):
+        self.text, self.featured = clean_title(title)
+        self.tokens = frozenset(self.text.split())
+        self.grams = bigrams(self.text)
+
+
+def title_similarity(a, b):
+    """Similarity of two TitleFeatures in [0, 1]"""
+    if a.text == b.text:
+        return 1.0 if a.text else 0.0
+
+    token_score = dice(a.tokens, b.tokens)
+    gram_score = dice(a.grams, b.grams)
+
+    # One title fully containing the other ("Song" vs "Song Live at X")
+    if a.tokens and b.tokens and (a.tokens <= b.tokens or b.tokens <= a.tokens):
+        token_score = max(token_score, 0.9)
+
+    return 0.5 * token_score + 0.5 * gram_score
+
+
+def artist_match_ratio(target_artists, result_artists):
+    """Fraction of target artists found among the result artists"""
+    if not target_artists:
+        return 0.0
+
+    result_tokens = [frozenset(a.split()) for a in result_artists]
+    matched = 0
+    for name in target_artists:
+        tokens = frozenset(name.split())
+        for other, other_tokens in zip(result_artists, result_tokens):
+            if name in other or other in name or tokens <= other_tokens:
+                matched += 1
+                break
+    return matched / len(target_artists)
+
+
+def score_candidates(target_title, target_artist, results):
+    """
+    Score every search result against one local track in a single pass.
+    Target features are computed once; per-result work is set arithmetic.
+    Returns [(score, result)] sorted best first; results sharing no artist
+    with the target are dropped.
+    """
+    target = TitleFeatures(target_title)
+    target_artists = split_artists(target_artist)
+    # "Title (feat. X)" on the local side also names an artist
+    target_all_artists = target_artists + target.featured
+
+    scored = []
+    for r in results:
+        result_artists = tuple(
+            name
+            for a in r.get("artists") or []
+            for name in split_artists(a.get("name", ""))
+        )
+        raw_title = r.get("title", "")
+        candidate = TitleFeatures(
+            strip_artist_part(raw_title, result_artists + target_artists)
+        )
+        result_artists += candidate.featured
+
+        ratio = artist_match_ratio(target_artists, result_artists)
+        if ratio == 0 and target.featured:
+            ratio = artist_match_ratio(target_all_artists, result_artists)
+
+        # Require at least one artist to match
+        if ratio == 0:
+            continue
+
+        score = title_similarity(target, candidate) * (0.7 + 0.3 * ratio)
+        # On equal scores prefer the least decorated title ("Song" over
+        # "Song (feat. X)")
+        extra = abs(len(normalize_text(raw_title)) - len(target.text))
+        scored.append((score, -extra, r))
+
+    scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    return [(score, r) for score, _, r in scored]
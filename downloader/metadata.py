@@ -3,6 +3,7 @@ import subprocess
 import re
 from urllib.parse import urlparse, parse_qs
 from .utils import sanitize_filename
+from .ratelimit import UPSTREAM
 
 class MetadataManager:
     def __init__(self, temp_dir):
@@ -21,7 +22,9 @@ class MetadataManager:
         ]
         
         log_queue.put("[PLAYLIST] Retrieving playlist metadata...")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = UPSTREAM.call(
+            'youtube', subprocess.run, cmd, capture_output=True, text=True, check=True
+        )
         
         entries = [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
         if entries:
@@ -35,7 +38,9 @@ class MetadataManager:
         cmd = ['yt-dlp', url, '--dump-json', '--skip-download']
         log_queue.put("[METADATA] Retrieving video metadata...")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = UPSTREAM.call(
+            'youtube', subprocess.run, cmd, capture_output=True, text=True, check=True
+        )
         metadata = json.loads(result.stdout)
         
         title = metadata.get('title', 'Unknown Title')
@@ -44,6 +49,16 @@ class MetadataManager:
         year = upload_date[:4] if upload_date else ''
         video_id = metadata.get('id', '')
         thumbnail_url = metadata.get('thumbnail', '')
+
+        # Audio-only formats, best first, for retries with an explicit format
+        audio_formats = sorted(
+            (
+                f for f in metadata.get('formats') or []
+                if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')
+            ),
+            key=lambda f: f.get('abr') or f.get('tbr') or 0,
+            reverse=True,
+        )
         
         log_queue.put(f"[METADATA] Title: {title}")
         log_queue.put(f"[METADATA] Artist: {uploader}")
@@ -55,5 +70,6 @@ class MetadataManager:
             'uploader': uploader,
             'year': year,
             'video_id': video_id,
-            'thumbnail_url': thumbnail_url
+            'thumbnail_url': thumbnail_url,
+            'audio_formats': [f['format_id'] for f in audio_formats if f.get('format_id')]
         }
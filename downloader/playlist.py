@@ -1,31 +1,162 @@
 import os
 import re
+import json
+import time
+import threading
 from datetime import datetime, timedelta
+from .playlist_index import PlaylistIndex, entry_basename, track_keys
+
+
+def write_lines_atomic(path, lines):
+    """Replace a text file without ever leaving it half written"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class M3UPlaylist:
+    """
+    In-memory model of an M3U playlist. Edits only change the model;
+    flush() writes the file once, atomically, and only if something changed.
+    """
+
+    HEADER_KEYS = ("PLAYLIST", "CREATED", "UPDATED", "ADDED", "REMOVED", "NEW")
+
+    def __init__(self, path, index=None):
+        self.path = path
+        self.index = index
+        self.exists = os.path.exists(path)
+        self.dirty = False
+        self.lines = []
+        if self.exists:
+            with open(path, "r", encoding="utf-8") as f:
+                self.lines = [line.rstrip("\n") for line in f]
+
+    # ---------- reading ----------
+
+    def track_positions(self):
+        """Line numbers (0-based) of track entries"""
+        return [
+            i for i, line in enumerate(self.lines)
+            if line.strip() and not line.startswith("#")
+        ]
+
+    def tracks(self):
+        return [self.lines[i].strip() for i in self.track_positions()]
+
+    def header(self, key):
+        prefix = f"#{key}:"
+        for line in self.lines:
+            if line.startswith(prefix):
+                return line[len(prefix):].strip()
+        return None
+
+    def path_style(self):
+        """How entries are stored: "absolute", "relative" or "filename" """
+        for line in self.tracks():
+            if os.path.isabs(line):
+                return "absolute"
+            if "/" in line or "\\" in line:
+                return "relative"
+            return "filename"
+        return "filename"
+
+    def format_entry(self, track_path, style=None):
+        """Write track_path the way the existing entries are written"""
+        style = style or self.path_style()
+        if style == "absolute":
+            return os.path.abspath(track_path)
+        if style == "relative":
+            return os.path.relpath(track_path, start=os.path.dirname(self.path))
+        return os.path.basename(track_path)
+
+    def contains(self, track_path):
+        """True if an entry refers to the same track (path, name or video ID)"""
+        keys = set(track_keys(os.path.abspath(track_path)))
+        base_dir = os.path.dirname(os.path.abspath(self.path))
+        return any(
+            keys.intersection(track_keys(entry, base_dir)) for entry in self.tracks()
+        )
+
+    # ---------- editing ----------
+
+    def append(self, entry):
+        self.lines.append(entry)
+        self.dirty = True
+
+    def insert(self, position, entry):
+        """Insert at a 1-based track position; past the end appends"""
+        positions = self.track_positions()
+        target = max(0, position - 1)
+        if target >= len(positions):
+            self.lines.append(entry)
+            target = len(positions)
+        else:
+            self.lines.insert(positions[target], entry)
+        self.dirty = True
+        return target + 1
+
+    def remove_at(self, positions):
+        """Remove the tracks at the given 1-based positions"""
+        track_lines = self.track_positions()
+        drop = {track_lines[p - 1] for p in positions if 0 < p <= len(track_lines)}
+        if drop:
+            self.lines = [line for i, line in enumerate(self.lines) if i not in drop]
+            self.dirty = True
+        return len(drop)
+
+    def set_tracks(self, entries):
+        """Replace every entry, keeping the header block"""
+        first = next(iter(self.track_positions()), len(self.lines))
+        self.lines = self.lines[:first] + list(entries)
+        self.dirty = True
+
+    def set_headers(self, headers):
+        """Replace the header block (comments before the first entry)"""
+        first = next(iter(self.track_positions()), len(self.lines))
+        self.lines = ["#EXTM3U"] + [
+            f"#{key}:{value}" if key in ("PLAYLIST", "CREATED") else f"#{key}: {value}"
+            for key, value in headers
+        ] + self.lines[first:]
+        self.dirty = True
+
+    def flush(self):
+        """Write the playlist if it changed; returns True when written"""
+        if not self.dirty:
+            return False
+        lines = [line + "\n" for line in self.lines]
+        write_lines_atomic(self.path, lines)
+        if self.index:
+            self.index.update_playlist(self.path, lines)
+        self.exists = True
+        self.dirty = False
+        return True
+
 
 class PlaylistManager:
+    def __init__(self, index=None):
+        self.index = index
+
     def create_m3u_playlist(self, playlist_title, file_paths, playlist_dir, 
                            playlist_options, log_queue):
         """Create or update an M3U playlist file with change tracking"""
         try:
             # Create playlist filename
             playlist_file = os.path.join(playlist_dir, f"{playlist_title}.m3u")
-            
-            # Read existing playlist if it exists
+            playlist = M3UPlaylist(playlist_file, self.index)
+            action = "Updated" if playlist.exists else "Created"
+
+            # Existing entries, normalized for comparison
             existing_entries = {}
-            created_time = datetime.now().isoformat()
-            if os.path.exists(playlist_file):
-                with open(playlist_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        # Extract creation time if available
-                        if line.startswith("#CREATED:"):
-                            created_time = line.split(":", 1)[1].strip()
-                        # Extract file entries
-                        elif not line.startswith("#") and line.strip():
-                            entry = line.strip()
-                            # Normalize path for comparison
-                            normalized = self._normalize_playlist_path(entry, playlist_dir)
-                            existing_entries[normalized] = entry
+            for entry in playlist.tracks():
+                normalized = self._normalize_playlist_path(entry, playlist_dir)
+                existing_entries[normalized] = entry
             
             # Prepare new entries
             new_entries = {}
@@ -44,40 +175,28 @@ class PlaylistManager:
             added = set(new_entries.keys()) - set(existing_entries.keys())
             removed = set(existing_entries.keys()) - set(new_entries.keys())
             unchanged = set(new_entries.keys()) & set(existing_entries.keys())
-            
-            # Generate change log
-            change_log = []
-            change_log.append(f"#UPDATED: {datetime.now().isoformat()}")
-            
-            if added:
-                change_log.append(f"#ADDED: {len(added)} files")
-            if removed:
-                change_log.append(f"#REMOVED: {len(removed)} files")
-            
-            # Write M3U file with change tracking
-            with open(playlist_file, 'w', encoding='utf-8') as f:
-                # Write metadata headers
-                f.write("#EXTM3U\n")
-                f.write(f"#PLAYLIST:{playlist_title}\n")
-                f.write(f"#CREATED:{created_time}\n")
-                
-                # Write change log
-                f.write("\n".join(change_log) + "\n")
-
-                if added:
-                    f.write(f"#NEW: {datetime.now().isoformat()}\n")
-
-                
-                # Write file entries with change comments
-                for normalized_path in new_entries:
-                    entry = new_entries[normalized_path]
-                    
-                    # Add comment for new files
-                    
-                    f.write(f"{entry}\n")
-            
+
+            existing_order = list(existing_entries)
+            new_order = list(new_entries)
+
+            if playlist.exists and existing_order == new_order:
+                log_queue.put(f"[PLAYLIST] Playlist unchanged: {os.path.basename(playlist_file)} "
+                              f"({len(unchanged)} entries)")
+                return True
+
+            if new_order[:len(existing_order)] == existing_order:
+                # Only new tracks at the end: append them to the model
+                for normalized in new_order[len(existing_order):]:
+                    playlist.append(new_entries[normalized])
+            else:
+                playlist.set_tracks(new_entries[n] for n in new_order)
+
+            self._set_change_headers(playlist, playlist_title, len(added), len(removed))
+
+            # One atomic write per operation
+            playlist.flush()
+
             # Log results
-            action = "Updated" if os.path.exists(playlist_file) else "Created"
             log_msg = (f"[PLAYLIST] {action} playlist: {os.path.basename(playlist_file)} "
                     f"({len(unchanged)} unchanged, {len(added)} added, {len(removed)} removed)")
             log_queue.put(log_msg)
@@ -87,6 +206,108 @@ class PlaylistManager:
             log_queue.put(f"[ERROR] Failed to update M3U playlist: {str(e)}")
             return False
 
+    def _set_change_headers(self, playlist, playlist_title, added, removed):
+        """Metadata headers and change log of one playlist update"""
+        now = datetime.now().isoformat()
+        headers = [
+            ("PLAYLIST", playlist_title),
+            ("CREATED", playlist.header("CREATED") or now),
+            ("UPDATED", now),
+        ]
+        if added:
+            headers.append(("ADDED", f"{added} files"))
+        if removed:
+            headers.append(("REMOVED", f"{removed} files"))
+        if added:
+            headers.append(("NEW", now))
+        playlist.set_headers(headers)
+
+    def diff_playlist(self, remote_entries, local_files_by_id, playlist):
+        """
+        Compare a flat remote playlist with the local library and M3U file.
+
+        Returns a dict with:
+          existing  - [(position, video_id, path)] remote tracks found locally
+          missing   - [(position, remote entry)] remote tracks with no local file
+          removed   - [position] M3U tracks not in the remote playlist (1-based)
+          listed    - {video_id: M3U entry} remote tracks the M3U already has
+          reordered - True if the listed tracks are not in remote order
+        """
+        existing, missing, order = [], [], []
+        seen = set()
+        for position, entry in enumerate(remote_entries, 1):
+            video_id = entry.get("id")
+            if not video_id or video_id in seen:
+                continue
+            seen.add(video_id)
+            order.append(video_id)
+            local = local_files_by_id.get(video_id)
+            if local:
+                existing.append((position, video_id, local["path"]))
+            else:
+                missing.append((position, entry))
+
+        listed, listed_order, removed = {}, [], []
+        for position, entry in enumerate(playlist.tracks(), 1):
+            video_id = self._extract_video_id_from_filename(entry_basename(entry))
+            if video_id in seen and video_id not in listed:
+                listed[video_id] = entry
+                listed_order.append(video_id)
+            else:
+                removed.append(position)
+
+        remote_order = [video_id for video_id in order if video_id in listed]
+        return {
+            "existing": existing,
+            "missing": missing,
+            "removed": removed,
+            "listed": listed,
+            "reordered": listed_order != remote_order,
+        }
+
+    def sync_playlist(self, playlist, playlist_title, tracks, diff, playlist_options, log_queue):
+        """
+        Patch an M3U model to hold tracks [(video_id, path)] in remote order.
+        Entries already present keep their text; only removals, inserts and,
+        if needed, a reorder are applied, and the file is written once.
+        Returns {"added": n, "removed": n, "reordered": bool, "written": bool}.
+        """
+        listed = diff["listed"]
+        if playlist.tracks():
+            style = playlist.path_style()
+        elif playlist_options.get("filenames_only"):
+            style = "filename"
+        elif playlist_options.get("relative_paths"):
+            style = "relative"
+        else:
+            style = "absolute"
+
+        removed = playlist.remove_at(diff["removed"])
+        added = sum(1 for video_id, _ in tracks if video_id not in listed)
+
+        if diff["reordered"]:
+            playlist.set_tracks(
+                listed.get(video_id) or playlist.format_entry(path, style)
+                for video_id, path in tracks
+            )
+        else:
+            # Walking in remote order, tracks before each insert are already
+            # in place, so the remote position is the insert position
+            for position, (video_id, path) in enumerate(tracks, 1):
+                if video_id not in listed:
+                    playlist.insert(position, playlist.format_entry(path, style))
+
+        if playlist.dirty:
+            self._set_change_headers(playlist, playlist_title, added, removed)
+        written = playlist.flush()
+
+        return {
+            "added": added,
+            "removed": removed,
+            "reordered": diff["reordered"],
+            "written": written,
+        }
+
     def _normalize_playlist_path(self, path, base_dir):
         """Normalize playlist path for consistent comparison"""
         # Expand relative paths to absolute
@@ -147,3 +368,170 @@ class PlaylistManager:
                 files_by_id[file_info["video_id"]] = file_info
 
         return files_by_id
+
+
+class PlaylistRenameBatch:
+    """
+    Collects audio file renames and rewrites playlist references in one pass
+    per affected playlist instead of rewriting every playlist per rename.
+
+    Renames are appended to a journal before the audio file is renamed, and
+    the journal is only removed once every affected playlist has been
+    replaced, so an interrupted run is repaired by replay() on the next one.
+    """
+
+    def __init__(
+        self, playlist_dir, journal_path=None, checkpoint=200, interval=30, index=None
+    ):
+        self.playlist_dir = playlist_dir
+        self.journal_path = journal_path
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.index = index or PlaylistIndex()
+        self.lock = threading.Lock()
+        self.pending = {}  # old path -> new path, in rename order
+        self.last_flush = time.monotonic()
+
+    # ---------- recording ----------
+
+    def add(self, old_path, new_path):
+        """Record a rename; call before renaming the file on disk"""
+        with self.lock:
+            self.pending[old_path] = new_path
+            if self.journal_path and self.playlist_dir:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({
+                        "playlist_dir": self.playlist_dir,
+                        "old": old_path,
+                        "new": new_path,
+                    }, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def due(self):
+        with self.lock:
+            return bool(self.pending) and (
+                len(self.pending) >= self.checkpoint
+                or time.monotonic() - self.last_flush >= self.interval
+            )
+
+    # ---------- flushing ----------
+
+    def flush(self, log_queue):
+        """Rewrite every playlist that references a pending rename"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+
+            # Renames that never happened (file still at its old path) are dropped
+            renames = [
+                (old, new)
+                for old, new in pending.items()
+                if os.path.exists(new) or not os.path.exists(old)
+            ]
+            # Entries with a directory must name the renamed file itself; bare
+            # file names can only be matched by name
+            by_path = {}
+            by_name = {}
+            for old, new in renames:
+                new_name = os.path.basename(new)
+                by_name[os.path.basename(old)] = new_name
+                for kind, key in track_keys(os.path.abspath(old)):
+                    if kind == "path":
+                        by_path[key] = new_name
+
+            updated = 0
+            if renames and self.playlist_dir and os.path.isdir(self.playlist_dir):
+                self.index.scan(self.playlist_dir)
+                affected = set()
+                for old, _ in renames:
+                    affected.update(self.index.playlists_for(old))
+
+                for playlist_path in sorted(affected):
+                    try:
+                        if self._rewrite(playlist_path, by_path, by_name):
+                            updated += 1
+                            log_queue.put(
+                                f"[PLAYLIST] Updated {os.path.basename(playlist_path)}"
+                            )
+                    except Exception as e:
+                        log_queue.put(
+                            f"[FAIL] Playlist {os.path.basename(playlist_path)}: {e}"
+                        )
+                        # Keep the journal so the next run retries
+                        self.pending.update(pending)
+                        return updated
+
+            if self.journal_path and not self.pending and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+        if renames and self.playlist_dir and updated == 0:
+            log_queue.put("[INFO] No playlist references found")
+        return updated
+
+    def _rewrite(self, playlist_path, by_path, by_name):
+        with open(playlist_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        base_dir = os.path.dirname(os.path.abspath(playlist_path))
+        changed = False
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            old_name = entry_basename(stripped)
+            path_key = next(
+                (key for kind, key in track_keys(stripped, base_dir) if kind == "path"),
+                None,
+            )
+            if path_key:
+                new_name = by_path.get(path_key)
+            else:
+                new_name = by_name.get(old_name)
+            if new_name:
+                head, _, tail = line.rpartition(old_name)
+                lines[i] = head + new_name + tail
+                changed = True
+
+        if changed:
+            write_lines_atomic(playlist_path, lines)
+            self.index.update_playlist(playlist_path, lines)
+        return changed
+
+    # ---------- crash recovery ----------
+
+    @classmethod
+    def replay(cls, journal_path, log_queue, index=None):
+        """Finish playlist rewrites left behind by an interrupted migration"""
+        if not os.path.exists(journal_path):
+            return 0
+
+        batches = {}
+        try:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    playlist_dir = record.get("playlist_dir")
+                    if playlist_dir not in batches:
+                        batches[playlist_dir] = cls(playlist_dir, index=index)
+                    batch = batches[playlist_dir]
+                    batch.pending[record["old"]] = record["new"]
+        except Exception as e:
+            log_queue.put(f"[FAIL] Playlist rename journal: {e}")
+            return 0
+
+        total = sum(len(b.pending) for b in batches.values())
+        log_queue.put(f"[PLAYLIST] Replaying {total} unfinished playlist renames")
+
+        updated = 0
+        clean = True
+        for batch in batches.values():
+            updated += batch.flush(log_queue)
+            clean = clean and not batch.pending
+
+        if clean:
+            os.remove(journal_path)
+        return updated
@@ -0,0 +1,144 @@
+import os
+import re
+import threading
+
+PLAYLIST_EXTENSIONS = (".m3u", ".m3u8")
+VIDEO_ID_RE = re.compile(r"_([A-Za-z0-9_-]{11})$")
+
+
+def entry_basename(entry):
+    """File name of a playlist entry, whatever separator the playlist uses"""
+    return re.split(r"[\\/]", entry.strip())[-1]
+
+
+def track_keys(path_or_entry, base_dir=None):
+    """
+    Identities a track can be matched by: normalized absolute path,
+    case-folded basename and, when the file name carries one, video ID.
+    """
+    entry = os.path.expanduser(path_or_entry.strip())
+    name = entry_basename(entry)
+    keys = [("name", name.lower())]
+
+    if os.path.isabs(entry):
+        keys.append(("path", os.path.normcase(os.path.normpath(entry))))
+    elif base_dir and ("/" in entry or "\\" in entry):
+        full = os.path.join(base_dir, entry.replace("\\", os.sep))
+        keys.append(("path", os.path.normcase(os.path.normpath(full))))
+
+    match = VIDEO_ID_RE.search(os.path.splitext(name)[0])
+    if match:
+        keys.append(("id", match.group(1)))
+    return keys
+
+
+class PlaylistIndex:
+    """
+    Reverse index from tracks to the playlist lines that reference them.
+
+    Playlists are indexed lazily per directory and re-read only when their
+    mtime changes; code that writes a playlist calls update_playlist() so the
+    index stays current without rescanning.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.playlists = {}  # playlist path -> (mtime, [(line_no, keys)])
+        self.refs = {}  # key -> {(playlist path, line_no)}
+
+    # ---------- maintenance ----------
+
+    def scan(self, playlist_dir):
+        """Index new or changed playlists under playlist_dir, forget deleted ones"""
+        if not playlist_dir or not os.path.isdir(playlist_dir):
+            return
+
+        prefix = os.path.join(os.path.abspath(playlist_dir), "")
+        seen = set()
+        for root, _, files in os.walk(playlist_dir):
+            for f in files:
+                if not f.lower().endswith(PLAYLIST_EXTENSIONS):
+                    continue
+                playlist_path = os.path.abspath(os.path.join(root, f))
+                seen.add(playlist_path)
+                try:
+                    mtime = os.path.getmtime(playlist_path)
+                    with self.lock:
+                        known = self.playlists.get(playlist_path)
+                    if known and known[0] == mtime:
+                        continue
+                    self.update_playlist(playlist_path)
+                except Exception:
+                    continue
+
+        with self.lock:
+            stale = [
+                p for p in self.playlists if p.startswith(prefix) and p not in seen
+            ]
+        for playlist_path in stale:
+            self.remove_playlist(playlist_path)
+
+    def update_playlist(self, playlist_path, lines=None):
+        """(Re)index one playlist, from lines just written or from disk"""
+        playlist_path = os.path.abspath(playlist_path)
+        if lines is None:
+            with open(playlist_path, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.readlines()
+
+        base_dir = os.path.dirname(playlist_path)
+        entries = []
+        for line_no, line in enumerate(lines, 1):
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                entries.append((line_no, track_keys(stripped, base_dir)))
+
+        mtime = os.path.getmtime(playlist_path)
+        with self.lock:
+            self._unindex(playlist_path)
+            self.playlists[playlist_path] = (mtime, entries)
+            for line_no, keys in entries:
+                for key in keys:
+                    self.refs.setdefault(key, set()).add((playlist_path, line_no))
+
+    def remove_playlist(self, playlist_path):
+        with self.lock:
+            self._unindex(os.path.abspath(playlist_path))
+
+    def _unindex(self, playlist_path):
+        """Drop one playlist's references (lock must be held)"""
+        _, entries = self.playlists.pop(playlist_path, (None, ()))
+        for line_no, keys in entries:
+            for key in keys:
+                refs = self.refs.get(key)
+                if refs:
+                    refs.discard((playlist_path, line_no))
+                    if not refs:
+                        del self.refs[key]
+
+    # ---------- queries ----------
+
+    def references(self, track_path):
+        """Sorted (playlist path, line number) pairs referencing a track"""
+        found = set()
+        with self.lock:
+            for key in track_keys(os.path.abspath(track_path)):
+                found.update(self.refs.get(key, ()))
+        return sorted(found)
+
+    def playlists_for(self, track_path):
+        """Sorted playlist paths that reference a track"""
+        return sorted({playlist for playlist, _ in self.references(track_path)})
+
+    def playlists_with_name(self, basename):
+        """Playlists with an entry whose file name is basename"""
+        with self.lock:
+            refs = self.refs.get(("name", basename.lower()), ())
+            return sorted({playlist for playlist, _ in refs})
+
+    def stats(self):
+        with self.lock:
+            return {
+                "playlists": len(self.playlists),
+                "entries": sum(len(e) for _, e in self.playlists.values()),
+                "keys": len(self.refs),
+            }
@@ -0,0 +1,190 @@
+import re
+import time
+import threading
+
+
+class RateLimiter:
+    """Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `burst`; acquire() blocks until a
+    token is available.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and consume them"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Upstream answers that mean "slow down"
+THROTTLE_PATTERN = re.compile(r"HTTP Error 429|Too Many Requests|\b429\b", re.I)
+
+# Requests per second and burst for each upstream budget
+UPSTREAM_BUDGETS = {
+    "youtube": (1.0, 4),  # yt-dlp: metadata, playlist listings, downloads
+    "ytmusic_search": (5.0, 5),  # YTMusic search (migration)
+    "ytmusic": (2.0, 4),  # YTMusic watch playlists and lyrics
+    "thumbnail": (5.0, 10),  # cover art downloaded with tracks
+    "images": (10.0, 20),  # /proxy-image and artwork URLs
+}
+
+
+def is_throttled(error):
+    """True if an exception or yt-dlp output says the upstream is rate limiting us"""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = str(error)
+    stderr = getattr(error, "stderr", None)
+    if stderr:
+        text += f"\n{stderr}"
+    return bool(THROTTLE_PATTERN.search(text))
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Token bucket that slows down when the upstream throttles.
+
+    A throttled() report halves the rate, holds every caller back for the
+    Retry-After time (or an exponential backoff) and caps the rate just below
+    the one that was throttled. Successful calls give back a share of the
+    configured rate up to that cap, and the cap itself rises only slowly, so
+    throughput settles just under the upstream's limit instead of bouncing
+    off it.
+    """
+
+    def __init__(self, rate, burst=None, min_fraction=0.1, recovery=0.05, probe=0.002,
+                 max_backoff=300):
+        super().__init__(rate, burst)
+        self.base_rate = self.rate
+        self.ceiling = self.rate
+        self.min_rate = self.base_rate * min_fraction
+        self.recovery = recovery
+        self.probe = probe
+        self.max_backoff = max_backoff
+        self.blocked_until = 0.0
+        self.strikes = 0  # throttles in a row, for the backoff
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available; returns the seconds waited"""
+        started = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self._refill()
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return time.monotonic() - started
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        with self.lock:
+            self.strikes += 1
+            self.ceiling = max(self.min_rate, self.rate * 0.9)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            delay = retry_after or min(self.max_backoff, 2 ** self.strikes)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    def succeeded(self):
+        with self.lock:
+            self.strikes = 0
+            self.ceiling = min(self.base_rate, self.ceiling + self.base_rate * self.probe)
+            self.rate = min(self.ceiling, self.rate + self.base_rate * self.recovery)
+
+
+class UpstreamLimits:
+    """One adaptive limiter per upstream budget, shared by every caller.
+
+    Calls go through call() (or acquire() + report() when the caller runs the
+    request itself, like a yt-dlp subprocess), which also keeps per-budget
+    metrics.
+    """
+
+    def __init__(self, budgets=None):
+        self.lock = threading.Lock()
+        self.limiters = {}
+        self.metrics = {}
+        for name, (rate, burst) in (budgets or UPSTREAM_BUDGETS).items():
+            self.limiters[name] = AdaptiveRateLimiter(rate, burst)
+            self.metrics[name] = {"calls": 0, "waited": 0.0, "throttled": 0, "errors": 0}
+
+    def acquire(self, name):
+        waited = self.limiters[name].acquire()
+        with self.lock:
+            self.metrics[name]["calls"] += 1
+            self.metrics[name]["waited"] += waited
+
+    def report(self, name, throttled=False, retry_after=None, error=False):
+        """Feed back the outcome of a call made after acquire()"""
+        limiter = self.limiters[name]
+        if throttled:
+            limiter.throttled(retry_after)
+            with self.lock:
+                self.metrics[name]["throttled"] += 1
+        elif error:
+            with self.lock:
+                self.metrics[name]["errors"] += 1
+        else:
+            limiter.succeeded()
+
+    def call(self, name, fn, *args, **kwargs):
+        """Run fn under the budget; 429 errors slow the budget down and are re-raised"""
+        self.acquire(name)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            throttled = is_throttled(e)
+            self.report(name, throttled=throttled, retry_after=self._retry_after(e),
+                        error=not throttled)
+            raise
+        self.report(name)
+        return result
+
+    @staticmethod
+    def _retry_after(error):
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    def stats(self):
+        with self.lock:
+            metrics = {name: dict(m) for name, m in self.metrics.items()}
+        for name, limiter in self.limiters.items():
+            with limiter.lock:
+                metrics[name].update({
+                    "rate": round(limiter.rate, 3),
+                    "base_rate": limiter.base_rate,
+                    "ceiling": round(limiter.ceiling, 3),
+                    "blocked_for": round(max(0.0, limiter.blocked_until - time.monotonic()), 1),
+                })
+            metrics[name]["waited"] = round(metrics[name]["waited"], 1)
+        return metrics
+
+
+# Shared by the download manager, the image proxy and artwork downloads
+UPSTREAM = UpstreamLimits()
@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from urllib.parse import urlparse, parse_qs
+
+# Failures that another attempt will not fix
+HOPELESS_ERRORS = ("unavailable", "geo_blocked")
+
+ERROR_PATTERNS = [
+    (
+        "rate_limited",
+        re.compile(r"HTTP Error 429|Too Many Requests|rate.?limit", re.I),
+    ),
+    (
+        "geo_blocked",
+        re.compile(
+            r"not available in your country|geo.?restrict|blocked it in your country"
+            r"|not made this video available in your country",
+            re.I,
+        ),
+    ),
+    (
+        "unavailable",
+        re.compile(
+            r"Video unavailable|Private video|video has been removed|has been terminated"
+            r"|This video is not available|video is no longer available"
+            r"|copyright claim|members-only|Incomplete YouTube ID|is not a valid URL",
+            re.I,
+        ),
+    ),
+    (
+        "format",
+        re.compile(r"Requested format is not available|No video formats found", re.I),
+    ),
+    (
+        "network",
+        re.compile(
+            r"timed out|Connection (reset|refused|aborted)|Temporary failure in name resolution"
+            r"|Unable to download (webpage|API page)|IncompleteRead|HTTP Error 5\d\d"
+            r"|Remote end closed connection|getaddrinfo failed|Network is unreachable",
+            re.I,
+        ),
+    ),
+]
+
+
+def classify_error(text):
+    """Kind of a yt-dlp failure: rate_limited, geo_blocked, unavailable, format, network or unknown"""
+    for kind, pattern in ERROR_PATTERNS:
+        if text and pattern.search(text):
+            return kind
+    return "unknown"
+
+
+def video_key(url):
+    """YouTube video ID of a URL, or the URL itself"""
+    parsed = urlparse(url)
+    if parsed.hostname and parsed.hostname.endswith("youtu.be"):
+        return parsed.path.strip("/") or url
+    return parse_qs(parsed.query).get("v", [url])[0]
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter for the given 0-based attempt"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class FormatCache:
+    """
+    Per-video retry knowledge, saved as one JSON file: the audio format that
+    last worked, and videos found unavailable or geo-blocked (kept for ttl
+    seconds so bulk retries skip them without asking YouTube again).
+    """
+
+    def __init__(self, path, ttl=7 * 86400):
+        self.path = str(path)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error loading format cache: {e}")
+            return {}
+
+    def _save(self):
+        """Write atomically (lock must be held)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving format cache: {e}")
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return dict(entry) if entry else {}
+
+    def remember_format(self, key, format_id):
+        with self.lock:
+            self.entries[key] = {"format": format_id, "time": time.time()}
+            self._save()
+
+    def mark_unavailable(self, key, reason):
+        with self.lock:
+            entry = self.entries.setdefault(key, {})
+            entry.update({"unavailable": reason, "time": time.time()})
+            self._save()
+
+    def unavailable(self, key):
+        """Reason a video was found unavailable, if that is still recent"""
+        entry = self.get(key)
+        if entry.get("unavailable") and time.time() - entry.get("time", 0) < self.ttl:
+            return entry["unavailable"]
+        return None
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "formats": sum(1 for e in self.entries.values() if e.get("format")),
+                "unavailable": sum(1 for e in self.entries.values() if e.get("unavailable")),
+            }
+
+
+class RetryEngine:
+    """
+    Retries a failed download a few times, waiting with exponential backoff
+    and jitter between attempts. The error of each attempt decides what
+    happens next: unavailable or geo-blocked videos are not retried (and are
+    remembered), rate limits wait longer, and other failures move on to the
+    next audio-only format reported by the video's metadata.
+    """
+
+    def __init__(self, format_cache, attempts=3, base_delay=2.0, max_delay=60.0,
+                 rate_limit_delay=30.0):
+        self.format_cache = format_cache
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+        self.lock = threading.Lock()
+        self.stats_counts = {"attempts": 0, "succeeded": 0, "skipped": 0, "failed": 0}
+
+    def _count(self, key):
+        with self.lock:
+            self.stats_counts[key] += 1
+
+    def run(self, url, download, log_queue, checkpoint=None):
+        """
+        download(format_id, report) makes one attempt (format_id None means
+        yt-dlp's bestaudio) and returns the output file or None, filling
+        report with "error" and "audio_formats" (best first).
+        Returns (output file or None, error kind or None).
+        """
+        key = video_key(url)
+        reason = self.format_cache.unavailable(key)
+        if reason:
+            log_queue.put(f"[RETRY] Skipped: video was found {reason.replace('_', ' ')} recently")
+            self._count("skipped")
+            return None, reason
+
+        format_id = cached = self.format_cache.get(key).get("format")
+        if format_id:
+            log_queue.put(f"[FORMAT] Using cached format {format_id}")
+        tried = set()
+        kind = None
+
+        for attempt in range(self.attempts):
+            if attempt:
+                # Rate limits need a longer pause than a dropped connection
+                base = self.rate_limit_delay if kind == "rate_limited" else self.base_delay
+                delay = backoff_delay(attempt - 1, base, max(self.max_delay, base))
+                log_queue.put(
+                    f"[RETRY] Attempt {attempt + 1}/{self.attempts} in {delay:.1f}s ({kind})"
+                )
+                self._wait(delay, checkpoint)
+
+            tried.add(format_id)
+            report = {}
+            self._count("attempts")
+            output_file = download(format_id, report)
+            if output_file:
+                if format_id or cached:
+                    self.format_cache.remember_format(key, format_id)
+                self._count("succeeded")
+                return output_file, None
+
+            kind = classify_error(report.get("error", ""))
+            if kind in HOPELESS_ERRORS:
+                log_queue.put(f"[RETRY] Not retrying: video is {kind.replace('_', ' ')}")
+                self.format_cache.mark_unavailable(key, kind)
+                break
+
+            if kind not in ("network", "rate_limited"):
+                # Anything else may be the format: fall back to the next one
+                remaining = [f for f in report.get("audio_formats", []) if f not in tried]
+                if remaining:
+                    format_id = remaining[0]
+                    log_queue.put(f"[FORMAT] Falling back to audio format {format_id}")
+                elif format_id is not None:
+                    format_id = None
+
+        self._count("failed")
+        return None, kind
+
+    @staticmethod
+    def _wait(seconds, checkpoint):
+        """Sleep in short steps so pausing or cancelling the job still works"""
+        deadline = time.monotonic() + seconds
+        while True:
+            if checkpoint:
+                checkpoint()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(0.5, remaining))
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.stats_counts)
+        return {**counts, "cache": self.format_cache.stats()}
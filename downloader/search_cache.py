@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from unidecode import unidecode
+
+
+class SearchCache:
+    """Disk-backed cache of raw YouTube Music search results.
+
+    Results are stored before scoring, so a migration can be replayed with a
+    different match threshold or fallback without touching the network.
+    One JSON file per (normalized query, filter) keeps writes small and atomic.
+    """
+
+    def __init__(self, cache_dir, ttl=30 * 86400):
+        self.cache_dir = str(cache_dir)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_query(query):
+        """Case, accent and whitespace insensitive form of a search query"""
+        return " ".join(unidecode(query or "").lower().split())
+
+    def _path(self, query, search_filter):
+        raw = f"{self.normalize_query(query)}|{search_filter or ''}"
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def get(self, query, search_filter):
+        """Return cached results, or None on a miss or expired entry"""
+        path = self._path(query, search_filter)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        if self.ttl and time.time() - entry.get("time", 0) > self.ttl:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return entry.get("results")
+
+    def set(self, query, search_filter, results):
+        path = self._path(query, search_filter)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {
+            "query": self.normalize_query(query),
+            "filter": search_filter,
+            "time": time.time(),
+            "results": results,
+        }
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error caching search results: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        """Remove every cached search"""
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if filename.endswith(".json"):
+                    os.remove(os.path.join(root, filename))
+
+    def stats(self):
+        entries = 0
+        for _, _, files in os.walk(self.cache_dir):
+            entries += sum(1 for f in files if f.endswith(".json"))
+        with self.lock:
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,359 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+from .ratelimit import RateLimiter
+from .log_buffer import LogBuffer
+from .jobs import JobCancelled
+
+MIN_INTERVAL_MINUTES = 5
+
+
+class SharedDownloads:
+    """
+    Global gate for track downloads of Fix Playlist runs and playlist syncs.
+
+    A track is downloaded by one caller at a time; others asking for the
+    same video in the same codec, quality and directory wait and get the
+    same file. Downloads share a concurrency limit and a per-minute budget.
+    """
+
+    def __init__(self, max_concurrent=3, per_minute=30):
+        self.max_concurrent = max_concurrent
+        self.per_minute = per_minute
+        self.slots = threading.Semaphore(max_concurrent)
+        self.limiter = RateLimiter(rate=per_minute / 60.0, burst=max_concurrent)
+        self.lock = threading.Lock()
+        self.inflight = {}  # (video ID, codec, quality, dir) -> {"event", "result", "error"}
+        self.stats = {"downloads": 0, "shared": 0}
+
+    def fetch(self, key, download, checkpoint=None):
+        """
+        Run download() for key, a (video ID, codec, quality, audio dir)
+        tuple, unless it is already running; returns its result or raises
+        its error. checkpoint() is called while waiting so cancels get
+        through. If the running download's own job is cancelled, a waiter
+        downloads the track itself.
+        """
+        while True:
+            with self.lock:
+                pending = self.inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = {"event": threading.Event(), "result": None, "error": None}
+                    self.inflight[key] = pending
+                else:
+                    self.stats["shared"] += 1
+
+            if owner:
+                return self._download(key, pending, download, checkpoint)
+
+            while not pending["event"].wait(timeout=0.5):
+                if checkpoint:
+                    checkpoint()
+            if isinstance(pending["error"], JobCancelled):
+                continue
+            if pending["error"]:
+                raise pending["error"]
+            return pending["result"]
+
+    def _download(self, key, pending, download, checkpoint):
+        try:
+            while not self.slots.acquire(timeout=0.5):
+                if checkpoint:
+                    checkpoint()
+            try:
+                self.limiter.acquire()
+                pending["result"] = download()
+            finally:
+                self.slots.release()
+            with self.lock:
+                self.stats["downloads"] += 1
+            return pending["result"]
+        except Exception as e:
+            pending["error"] = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            pending["event"].set()
+
+    def status(self):
+        with self.lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "per_minute": self.per_minute,
+                "in_progress": len(self.inflight),
+                **self.stats,
+            }
+
+
+class PlaylistSyncScheduler:
+    """
+    Keeps subscribed YouTube playlists mirrored to local M3U files.
+
+    Each subscription is re-synced with the Fix Playlist engine once its
+    interval has passed. Subscriptions and the video ID -> file registry are
+    saved in state_dir, so tracks downloaded for one playlist are referenced,
+    not downloaded again, by every other playlist that contains them.
+    """
+
+    def __init__(self, manager, state_dir):
+        self.manager = manager
+        self.state_dir = state_dir
+        self.path = os.path.join(state_dir, "subscriptions.json")
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = set()
+        self.thread = None
+        self.history_dir = None
+        self.fail_dir = None
+        self.subscriptions, self.tracks = self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return OrderedDict(), {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            subscriptions = OrderedDict(
+                (s["id"], s) for s in state.get("subscriptions", [])
+            )
+            return subscriptions, state.get("tracks", {})
+        except Exception as e:
+            print(f"Error loading playlist subscriptions: {e}")
+            return OrderedDict(), {}
+
+    def _save(self):
+        """Write atomically (lock must be held)"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "subscriptions": list(self.subscriptions.values()),
+                    "tracks": self.tracks,
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
+
+    # ---------- registry ----------
+
+    def subscribe(self, url, interval_minutes, audio_dir, lyrics_dir, playlist_dir,
+                  playlist_options=None, mpd_options=None):
+        """Add (or update) a subscription; it is synced right away"""
+        with self.lock:
+            existing = next(
+                (s for s in self.subscriptions.values() if s["url"] == url), None
+            )
+            subscription = existing or {
+                "id": uuid.uuid4().hex[:12],
+                "url": url,
+                "title": None,
+                "created": time.time(),
+                "last_sync": None,
+                "last_result": None,
+                "last_operation_id": None,
+            }
+            subscription.update({
+                "interval_minutes": max(MIN_INTERVAL_MINUTES, int(interval_minutes)),
+                "audio_dir": audio_dir,
+                "lyrics_dir": lyrics_dir,
+                "playlist_dir": playlist_dir,
+                "playlist_options": playlist_options or {},
+                "mpd_options": mpd_options or {},
+                "enabled": True,
+                "next_sync": time.time(),
+            })
+            self.subscriptions[subscription["id"]] = subscription
+            self._save()
+        self.wakeup.set()
+        return dict(subscription)
+
+    def update(self, subscription_id, **fields):
+        with self.lock:
+            subscription = self.subscriptions.get(subscription_id)
+            if not subscription:
+                return None
+            if "interval_minutes" in fields:
+                interval = max(MIN_INTERVAL_MINUTES, int(fields["interval_minutes"]))
+                subscription["interval_minutes"] = interval
+                if subscription["last_sync"]:
+                    subscription["next_sync"] = subscription["last_sync"] + interval * 60
+            if "enabled" in fields:
+                subscription["enabled"] = bool(fields["enabled"])
+            self._save()
+        self.wakeup.set()
+        return dict(subscription)
+
+    def unsubscribe(self, subscription_id):
+        with self.lock:
+            removed = self.subscriptions.pop(subscription_id, None)
+            if removed:
+                self._save()
+        return removed is not None
+
+    def list(self):
+        with self.lock:
+            return [
+                dict(s, syncing=s["id"] in self.running)
+                for s in self.subscriptions.values()
+            ]
+
+    def sync_now(self, subscription_id=None):
+        """Make one (or every enabled) subscription due; returns the ids queued"""
+        with self.lock:
+            ids = [subscription_id] if subscription_id else [
+                s["id"] for s in self.subscriptions.values() if s["enabled"]
+            ]
+            ids = [i for i in ids if i in self.subscriptions]
+            for i in ids:
+                self.subscriptions[i]["next_sync"] = time.time()
+        self.wakeup.set()
+        return ids
+
+    # ---------- scheduling ----------
+
+    def start(self, history_dir=None, fail_dir=None):
+        """Start the background loop once; later calls only refresh the log dirs"""
+        self.history_dir = history_dir or self.history_dir
+        self.fail_dir = fail_dir or self.fail_dir
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def _loop(self):
+        while True:
+            now = time.time()
+            wait = 60
+            with self.lock:
+                for subscription in self.subscriptions.values():
+                    if not subscription["enabled"] or subscription["id"] in self.running:
+                        continue
+                    if subscription["next_sync"] <= now:
+                        self.running.add(subscription["id"])
+                        self._submit(subscription["id"])
+                    else:
+                        wait = min(wait, subscription["next_sync"] - now)
+
+            self.wakeup.wait(timeout=max(1, wait))
+            self.wakeup.clear()
+
+    def _submit(self, subscription_id):
+        """Queue a sync on the manager's job pool (lock must be held)"""
+        operation_id = f"sync-{int(time.time() * 1000)}-{subscription_id}"
+        log_queue = LogBuffer()
+        self.manager.log_queues[operation_id] = log_queue
+        self.manager.active_downloads[operation_id] = True
+        self.subscriptions[subscription_id]["last_operation_id"] = operation_id
+
+        def cancelled(current_queue):
+            self.manager._job_cancelled(operation_id, current_queue, False)
+            with self.lock:
+                self.running.discard(subscription_id)
+                current = self.subscriptions.get(subscription_id)
+                if current:
+                    # Skip this round rather than queueing it again at once
+                    current["next_sync"] = time.time() + current["interval_minutes"] * 60
+
+        self.manager.jobs.submit(
+            operation_id,
+            "sync",
+            self._sync,
+            args=(subscription_id, operation_id, log_queue),
+            log_queue=log_queue,
+            on_cancel=cancelled,
+        )
+
+    def _sync(self, subscription_id, operation_id, log_queue):
+        with self.lock:
+            subscription = dict(self.subscriptions.get(subscription_id) or {})
+            # Tracks downloaded for other subscriptions, still on disk
+            known_tracks = {
+                video_id: {"path": path, "video_id": video_id}
+                for video_id, path in self.tracks.items()
+            }
+        if not subscription:
+            # Unsubscribed while queued
+            with self.lock:
+                self.running.discard(subscription_id)
+            self.manager.active_downloads.pop(operation_id, None)
+            log_queue.put("[END]")
+            return
+
+        known_tracks = {
+            video_id: info
+            for video_id, info in known_tracks.items()
+            if os.path.exists(info["path"])
+        }
+
+        results = None
+        try:
+            for key in ("audio_dir", "lyrics_dir", "playlist_dir"):
+                os.makedirs(subscription[key], exist_ok=True)
+
+            results = self.manager._fix_playlist_thread(
+                subscription["url"],
+                operation_id,
+                log_queue,
+                subscription["audio_dir"],
+                subscription["lyrics_dir"],
+                subscription["playlist_dir"],
+                {"download_missing": True},
+                subscription["playlist_options"],
+                subscription["mpd_options"],
+                None,
+                self.history_dir,
+                self.fail_dir,
+                False,
+                known_tracks=known_tracks,
+            )
+        except Exception as e:
+            print(f"Playlist sync failed for {subscription['url']}: {e}")
+        finally:
+            finished = time.time()
+            with self.lock:
+                self.running.discard(subscription_id)
+                current = self.subscriptions.get(subscription_id)
+                if current:
+                    current["last_sync"] = finished
+                    current["next_sync"] = finished + current["interval_minutes"] * 60
+                    if results:
+                        current["title"] = results["playlist_title"]
+                        current["last_result"] = {
+                            key: results[key]
+                            for key in (
+                                "total_tracks",
+                                "existing_tracks",
+                                "downloaded_tracks",
+                                "removed_tracks",
+                                "missing_tracks",
+                            )
+                        }
+                    elif self.manager.jobs.cancelled(log_queue):
+                        current["last_result"] = {"cancelled": True}
+                    else:
+                        current["last_result"] = {"error": "Sync failed, see logs"}
+                if results:
+                    self.tracks.update(results["files"])
+                self._save()
+            self.wakeup.set()
+
+    def status(self):
+        with self.lock:
+            return {
+                "subscriptions": len(self.subscriptions),
+                "syncing": sorted(self.running),
+                "known_tracks": len(self.tracks),
+                "downloads": self.manager.shared_downloads.status(),
+            }
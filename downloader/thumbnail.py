@@ -3,6 +3,7 @@ import requests
 import tempfile
 import subprocess
 from pathlib import Path
+from .ratelimit import UPSTREAM
 
 class ThumbnailManager:
     def __init__(self, temp_dir=None):
@@ -18,8 +19,7 @@ class ThumbnailManager:
 
         try:
             log_queue.put("[THUMBNAIL] Downloading cover art...")
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
+            response = UPSTREAM.call("thumbnail", self._get, url)
             
             with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False, dir=self.temp_dir) as temp_file:
                 for chunk in response.iter_content(chunk_size=8192):
@@ -32,6 +32,12 @@ class ThumbnailManager:
             log_queue.put(f"[ERROR] Thumbnail download failed: {str(e)}")
             return None
 
+    @staticmethod
+    def _get(url):
+        response = requests.get(url, stream=True, timeout=30)
+        response.raise_for_status()
+        return response
+
     def embed_thumbnail(self, audio_file, thumbnail_path, codec, log_queue):
         """Embed thumbnail into audio file using FFmpeg with format-specific handling"""
         if not thumbnail_path or not os.path.exists(thumbnail_path):
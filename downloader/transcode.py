@@ -0,0 +1,104 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Containers yt-dlp's bestaudio comes in that already hold the target codec
+COPY_SOURCES = {
+    "opus": (".webm", ".opus", ".ogg"),
+    "aac": (".m4a", ".mp4", ".aac"),
+}
+
+
+def _encoder_args(codec, quality_setting):
+    """ffmpeg audio encoder arguments matching yt-dlp's --audio-quality"""
+    vbr = quality_setting == "0"
+    bitrate = quality_setting.lower()
+    if codec == "flac":
+        return ["-c:a", "flac", "-compression_level", "12"]
+    if codec == "wav":
+        return ["-c:a", "pcm_s16le"]
+    if codec == "opus":
+        return ["-c:a", "libopus", "-b:a", "160k" if vbr else bitrate]
+    if codec == "aac":
+        return ["-c:a", "aac", "-b:a", "256k" if vbr else bitrate]
+    # mp3 (and "best")
+    if vbr:
+        return ["-c:a", "libmp3lame", "-q:a", "0"]
+    return ["-c:a", "libmp3lame", "-b:a", bitrate]
+
+
+def ffmpeg_commands(source, output, codec, quality_setting, metadata):
+    """
+    Commands to turn a fetched file into output, to try in order: a stream
+    copy when the source already holds the target codec at best quality,
+    then a real encode.
+    """
+    tags = []
+    for key, value in metadata.items():
+        if value:
+            tags.extend(["-metadata", f"{key}={value}"])
+
+    def command(audio_args):
+        return [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", source, "-vn", *audio_args, *tags, output,
+        ]
+
+    commands = []
+    if quality_setting == "0" and source.lower().endswith(COPY_SOURCES.get(codec, ())):
+        commands.append(command(["-c:a", "copy"]))
+    commands.append(command(_encoder_args(codec, quality_setting)))
+    return commands
+
+
+class TranscodePool:
+    """
+    Transcode stage of the download engine: at most `workers` ffmpeg
+    processes (one per CPU core by default) run at once, and fetched tracks
+    wait here for a core while their job goes on fetching the next one.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 2
+        self.slots = threading.Semaphore(self.workers)
+        self.lock = threading.Lock()
+        self.counts = {"waiting": 0, "running": 0, "done": 0, "copied": 0}
+        self.busy_seconds = 0.0
+
+    @contextmanager
+    def slot(self, checkpoint=None):
+        """Hold a core; checkpoint() is called while waiting so cancels get through"""
+        with self.lock:
+            self.counts["waiting"] += 1
+        try:
+            while not self.slots.acquire(timeout=0.5):
+                if checkpoint:
+                    checkpoint()
+        finally:
+            with self.lock:
+                self.counts["waiting"] -= 1
+
+        started = time.monotonic()
+        with self.lock:
+            self.counts["running"] += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.counts["running"] -= 1
+                self.counts["done"] += 1
+                self.busy_seconds += time.monotonic() - started
+            self.slots.release()
+
+    def copied(self):
+        with self.lock:
+            self.counts["copied"] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                **self.counts,
+                "busy_seconds": round(self.busy_seconds, 1),
+            }
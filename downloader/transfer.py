@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import errno
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .jobs import JobCancelled
+
+CHUNK_SIZE = 8 * 1024 * 1024
+# copy_file_range/sendfile unsupported for this pair of files
+FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+
+def storage_workers(path):
+    """Worker count suited to the storage holding path: few for spinning disks"""
+    # The destination may not exist yet; use its nearest existing parent
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+
+    try:
+        st_dev = os.stat(path).st_dev
+        sys_dir = f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+        # Whole disks have queue/ directly, partitions under their parent
+        for candidate in ("queue/rotational", "../queue/rotational"):
+            rotational = os.path.join(sys_dir, candidate)
+            if os.path.exists(rotational):
+                with open(rotational, "r") as f:
+                    return 2 if f.read().strip() == "1" else 8
+    except (OSError, ValueError):
+        pass
+    return 4
+
+
+def journal_key(*parts):
+    """Stable id for a transfer job, so re-running it finds its journal"""
+    raw = json.dumps([str(p) for p in parts])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class TransferJournal:
+    """Append-only record of finished transfers, one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = {}  # old path -> {"new": ..., "type": ..., "action": ...}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    self.done[record["old"]] = record
+
+    def verify(self):
+        """Forget records whose destination is gone or no longer matches the source"""
+        with self.lock:
+            for old, record in list(self.done.items()):
+                if not self._still_done(old, record["new"]):
+                    del self.done[old]
+
+    @staticmethod
+    def _still_done(old, new):
+        try:
+            dst_stat = os.stat(new)
+        except OSError:
+            return False
+        try:
+            src_stat = os.stat(old)
+        except FileNotFoundError:
+            return True  # moved away by the earlier run
+        except OSError:
+            return False
+        return (
+            dst_stat.st_size == src_stat.st_size
+            and int(dst_stat.st_mtime) == int(src_stat.st_mtime)
+        )
+
+    def record(self, old, new, file_type, action):
+        entry = {"old": old, "new": new, "type": file_type, "action": action}
+        with self.lock:
+            self.done[old] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def remove(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class TransferEngine:
+    """
+    Moves or copies a list of files with a worker pool.
+
+    Same-filesystem moves are a rename; everything else is copied with
+    copy_file_range/sendfile into a .part file that replaces the destination
+    once complete. Destinations with the same size and mtime as the source
+    are left alone. Finished files go to a journal so an interrupted job
+    resumes where it stopped.
+    """
+
+    def __init__(self, mode, journal_path=None, workers=4, progress_interval=0.5):
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.copied_bytes = 0
+        self.workers = max(1, workers)
+        self.progress_interval = progress_interval
+        self.journal = TransferJournal(journal_path) if journal_path else None
+        if self.journal:
+            # A record only stands if its file is still there as transferred
+            self.journal.verify()
+
+    def resumed(self, file_type=None):
+        """old -> new for files finished by an earlier, interrupted run"""
+        if not self.journal:
+            return {}
+        return {
+            old: r["new"]
+            for old, r in self.journal.done.items()
+            if file_type is None or r["type"] == file_type
+        }
+
+    def run(self, items, log_queue, checkpoint=None, keep_journal=False):
+        """
+        Transfer (old, new, file_type) items. Logs batched [PROGRESS] lines and
+        a summary per file type. Returns {"done": {old: new}, "failed": n,
+        "bytes": bytes copied, "elapsed": seconds}. The journal is removed
+        after a run without errors unless keep_journal is set.
+
+        checkpoint() is called before each file; if it raises JobCancelled the
+        remaining files are skipped, the journal is kept and JobCancelled is
+        raised once the files in flight are finished.
+        """
+        started = time.monotonic()
+        self.copied_bytes = 0
+        total = len(items)
+        lock = threading.Lock()
+        state = {"processed": 0, "last_progress": 0.0}
+        counts = {}
+        done = {}
+        failed = 0
+        cancelled = False
+
+        def progress(force=False):
+            with lock:
+                state["processed"] += 1
+                now = time.monotonic()
+                if not force and now - state["last_progress"] < self.progress_interval:
+                    if state["processed"] != total:
+                        return
+                state["last_progress"] = now
+                processed = state["processed"]
+            log_queue.put(f"[PROGRESS] {processed}/{total}")
+
+        pending = []
+        for old, new, file_type in items:
+            if self.journal and self.journal.done.get(old, {}).get("new") == new:
+                counts.setdefault(file_type, {}).setdefault("resumed", 0)
+                counts[file_type]["resumed"] += 1
+                done[old] = new
+                progress()
+            else:
+                pending.append((old, new, file_type))
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="transfer"
+        ) as pool:
+            def transfer(old, new):
+                if checkpoint:
+                    checkpoint()
+                return self._transfer(old, new)
+
+            futures = {
+                pool.submit(transfer, old, new): (old, new, file_type)
+                for old, new, file_type in pending
+            }
+            for future in as_completed(futures):
+                old, new, file_type = futures[future]
+                try:
+                    action = future.result()
+                    done[old] = new
+                    if self.journal:
+                        self.journal.record(old, new, file_type, action)
+                except JobCancelled:
+                    cancelled = True
+                    continue
+                except FileNotFoundError:
+                    action = "missing"
+                    log_queue.put(f"[WARNING] Source {file_type} file not found: {old}")
+                except PermissionError as e:
+                    action = "failed"
+                    failed += 1
+                    log_queue.put(
+                        f"[ERROR] Permission denied when {self.mode}ing {file_type} from {old} to {new}: {str(e)}. Check write permissions on destination directory."
+                    )
+                except Exception as e:
+                    action = "failed"
+                    failed += 1
+                    log_queue.put(f"[ERROR] Failed to {self.mode} {file_type} {old}: {str(e)}")
+
+                counts.setdefault(file_type, {}).setdefault(action, 0)
+                counts[file_type][action] += 1
+                progress()
+
+        for file_type, by_action in counts.items():
+            summary = ", ".join(f"{n} {action}" for action, n in sorted(by_action.items()))
+            log_queue.put(f"[{file_type}] {summary}")
+
+        if cancelled:
+            raise JobCancelled()
+
+        if self.journal and not failed and not keep_journal:
+            self.journal.remove()
+
+        return {
+            "done": done,
+            "failed": failed,
+            "bytes": self.copied_bytes,
+            "elapsed": time.monotonic() - started,
+        }
+
+    # ---------- single file ----------
+
+    def _transfer(self, old, new):
+        """Move or copy one file; returns the action taken"""
+        src_stat = os.stat(old)
+
+        dest_dir = os.path.dirname(new)
+        os.makedirs(dest_dir, exist_ok=True)
+        if not os.access(dest_dir, os.W_OK):
+            raise PermissionError(f"Destination directory not writable: {dest_dir}")
+
+        # If destination file exists and is read-only, try to make it writable
+        if os.path.exists(new) and not os.access(new, os.W_OK):
+            try:
+                os.chmod(new, 0o644)
+            except OSError:
+                pass
+
+        if self._unchanged(src_stat, new):
+            if self.mode == "move":
+                os.remove(old)
+            return "unchanged"
+
+        if self.mode == "move":
+            try:
+                os.replace(old, new)
+                return "moved"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            self._copy(old, new, src_stat.st_size)
+            os.remove(old)
+            return "moved"
+
+        self._copy(old, new, src_stat.st_size)
+        return "copied"
+
+    @staticmethod
+    def _unchanged(src_stat, new):
+        try:
+            dst_stat = os.stat(new)
+        except FileNotFoundError:
+            return False
+        return (
+            dst_stat.st_size == src_stat.st_size
+            and int(dst_stat.st_mtime) == int(src_stat.st_mtime)
+        )
+
+    def _copy(self, old, new, size):
+        tmp_path = f"{new}.part"
+        try:
+            with open(old, "rb") as src, open(tmp_path, "wb") as dst:
+                self._copy_data(src, dst, size)
+            shutil.copystat(old, tmp_path)
+            os.replace(tmp_path, new)
+            with self.lock:
+                self.copied_bytes += size
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _copy_data(src, dst, size):
+        """Kernel-side copy where available, plain buffered copy otherwise"""
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+
+        for name in ("copy_file_range", "sendfile"):
+            if not hasattr(os, name):
+                continue
+            offset = 0
+            try:
+                while offset < size:
+                    count = min(CHUNK_SIZE, size - offset)
+                    if name == "copy_file_range":
+                        sent = os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+                    else:
+                        os.lseek(dst_fd, offset, os.SEEK_SET)
+                        sent = os.sendfile(dst_fd, src_fd, offset, count)
+                    if sent == 0:
+                        break
+                    offset += sent
+                if offset >= size:
+                    return
+            except OSError as e:
+                if e.errno not in FALLBACK_ERRNOS:
+                    raise
+            # Start over with the next method
+            os.ftruncate(dst_fd, 0)
+
+        src.seek(0)
+        dst.seek(0)
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
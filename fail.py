@@ -1,9 +1,14 @@
 import os
 import json
+import threading
 from datetime import datetime, timedelta
 
 
 class FailLogger:
+    # Shared by every instance: loggers are created per operation, but
+    # operations (and parallel downloads) write the same week files
+    lock = threading.Lock()
+
     def __init__(self, fail_dir):
         self.fail_dir = fail_dir
         os.makedirs(fail_dir, exist_ok=True)
@@ -83,59 +88,22 @@ class FailLogger:
     #
     #     return True
 
-    def _same_entry(self, a, b):
-        return (
-            a.get("type") == b.get("type")
-            and a.get("url") == b.get("url")
-            and a.get("playlist_title") == b.get("playlist")
-        )
-
     def remove_entry(self, entry_to_remove):
         """Remove a failed entry from ALL week files"""
-        removed = False
-
-        for filename in os.listdir(self.fail_dir):
-            if not filename.startswith("fail_") or not filename.endswith(".json"):
-                continue
-
-            path = os.path.join(self.fail_dir, filename)
+        return self.remove_entries([entry_to_remove]) > 0
 
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    entries = json.load(f)
-            except Exception:
-                continue
-
-            new_entries = [
-                e for e in entries if not self._same_entry(e, entry_to_remove)
-            ]
-
-            if len(new_entries) != len(entries):
-                removed = True
-                if new_entries:
-                    with open(path, "w", encoding="utf-8") as f:
-                        json.dump(new_entries, f, indent=2, ensure_ascii=False)
-                else:
-                    # Remove empty week file
-                    os.remove(path)
-
-        return removed
-
-    def log_fail(self, entry):
+    def remove_entries(self, entries_to_remove):
         """
-        Log a failed entry with GLOBAL merge across all week files
+        Remove several failed entries from ALL week files in one pass;
+        returns the number of records removed
         """
-        try:
-            entry = entry.copy()
+        keys = {
+            (e.get("type"), e.get("url"), e.get("playlist")) for e in entries_to_remove
+        }
 
-            # Ensure statuses list
-            status = entry.pop("status", None)
-            if status:
-                entry["statuses"] = [status]
-            else:
-                entry.setdefault("statuses", [])
+        with self.lock:
+            removed = 0
 
-            # ---- SEARCH ALL FILES FOR MERGE ----
             for filename in os.listdir(self.fail_dir):
                 if not filename.startswith("fail_") or not filename.endswith(".json"):
                     continue
@@ -148,51 +116,96 @@ class FailLogger:
                 except Exception:
                     continue
 
-                for existing in entries:
-                    if (
-                        existing.get("type") == entry.get("type")
-                        and existing.get("url") == entry.get("url")
-                        and existing.get("playlist_title")
-                        == entry.get("playlist_title")
-                    ):
-                        # ---- MERGE ----
+                new_entries = [
+                    e
+                    for e in entries
+                    if (e.get("type"), e.get("url"), e.get("playlist_title")) not in keys
+                ]
+
+                if len(new_entries) != len(entries):
+                    removed += len(entries) - len(new_entries)
+                    if new_entries:
+                        with open(path, "w", encoding="utf-8") as f:
+                            json.dump(new_entries, f, indent=2, ensure_ascii=False)
+                    else:
+                        # Remove empty week file
+                        os.remove(path)
+
+            return removed
+
+    def log_fail(self, entry):
+        """
+        Log a failed entry with GLOBAL merge across all week files
+        """
+        with self.lock:
+            try:
+                entry = entry.copy()
+
+                # Ensure statuses list
+                status = entry.pop("status", None)
+                if status:
+                    entry["statuses"] = [status]
+                else:
+                    entry.setdefault("statuses", [])
+
+                # ---- SEARCH ALL FILES FOR MERGE ----
+                for filename in os.listdir(self.fail_dir):
+                    if not filename.startswith("fail_") or not filename.endswith(".json"):
+                        continue
+
+                    path = os.path.join(self.fail_dir, filename)
+
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            entries = json.load(f)
+                    except Exception:
+                        continue
+
+                    for existing in entries:
                         if (
-                            existing.get("index") is None
-                            and entry.get("index") is not None
+                            existing.get("type") == entry.get("type")
+                            and existing.get("url") == entry.get("url")
+                            and existing.get("playlist_title")
+                            == entry.get("playlist_title")
                         ):
-                            existing["index"] = entry["index"]
+                            # ---- MERGE ----
+                            if (
+                                existing.get("index") is None
+                                and entry.get("index") is not None
+                            ):
+                                existing["index"] = entry["index"]
 
-                        existing_statuses = existing.get("statuses", [])
-                        for s in entry["statuses"]:
-                            if s not in existing_statuses:
-                                existing_statuses.append(s)
+                            existing_statuses = existing.get("statuses", [])
+                            for s in entry["statuses"]:
+                                if s not in existing_statuses:
+                                    existing_statuses.append(s)
 
-                        existing["statuses"] = existing_statuses
-                        existing["timestamp"] = entry.get("timestamp")
+                            existing["statuses"] = existing_statuses
+                            existing["timestamp"] = entry.get("timestamp")
 
-                        with open(path, "w", encoding="utf-8") as f:
-                            json.dump(entries, f, indent=2, ensure_ascii=False)
+                            with open(path, "w", encoding="utf-8") as f:
+                                json.dump(entries, f, indent=2, ensure_ascii=False)
 
-                        return True
+                            return True
 
-            # ---- NOT FOUND → APPEND TO CURRENT WEEK ----
-            week_file = self.get_week_file()
-            entries = []
+                # ---- NOT FOUND → APPEND TO CURRENT WEEK ----
+                week_file = self.get_week_file()
+                entries = []
 
-            if os.path.exists(week_file):
-                with open(week_file, "r", encoding="utf-8") as f:
-                    try:
-                        entries = json.load(f)
-                    except json.JSONDecodeError:
-                        entries = []
+                if os.path.exists(week_file):
+                    with open(week_file, "r", encoding="utf-8") as f:
+                        try:
+                            entries = json.load(f)
+                        except json.JSONDecodeError:
+                            entries = []
 
-            entries.append(entry)
+                entries.append(entry)
 
-            with open(week_file, "w", encoding="utf-8") as f:
-                json.dump(entries, f, indent=2, ensure_ascii=False)
+                with open(week_file, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=2, ensure_ascii=False)
 
-            return True
+                return True
 
-        except Exception as e:
-            print(f"Error logging fail: {str(e)}")
-            return False
+            except Exception as e:
+                print(f"Error logging fail: {str(e)}")
+                return False
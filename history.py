@@ -1,9 +1,14 @@
 import os
 import json
+import threading
 from datetime import datetime, timedelta
 
 
 class HistoryLogger:
+    # Shared by every instance: loggers are created per operation, but
+    # operations (and parallel downloads) write the same week files
+    lock = threading.Lock()
+
     def __init__(self, history_dir):
         self.history_dir = history_dir
         os.makedirs(history_dir, exist_ok=True)
@@ -19,26 +24,27 @@ class HistoryLogger:
         
     def log_download(self, entry):
         """Log a download entry to the history file"""
-        try:
-            file_path = self.get_week_file()
+        with self.lock:
+            try:
+                file_path = self.get_week_file()
             
-            # Read existing entries
-            entries = []
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        entries = json.load(f)
-                    except json.JSONDecodeError:
-                        entries = []
+                # Read existing entries
+                entries = []
+                if os.path.exists(file_path):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        try:
+                            entries = json.load(f)
+                        except json.JSONDecodeError:
+                            entries = []
             
-            # Add new entry
-            entries.append(entry)
+                # Add new entry
+                entries.append(entry)
             
-            # Write back to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(entries, f, indent=2, ensure_ascii=False)
+                # Write back to file
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, indent=2, ensure_ascii=False)
                 
-            return True
-        except Exception as e:
-            print(f"Error logging history: {str(e)}")
-            return False
+                return True
+            except Exception as e:
+                print(f"Error logging history: {str(e)}")
+                return False
@@ -0,0 +1,378 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+CHUNK_SIZE = 8192
+
+
+class ImageProxyCache:
+    """Bounded on-disk cache in front of remote artwork/thumbnail URLs.
+
+    All upstream calls share one pooled session. Concurrent requests for the
+    same URL are coalesced into a single upstream fetch, and each upstream
+    host gets a fixed number of concurrent connections.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_bytes=256 * 1024 * 1024,
+        max_image_bytes=10 * 1024 * 1024,
+        per_host_limit=4,
+        timeout=10,
+        default_ttl=86400,
+        max_ttl=30 * 86400,
+        min_ttl=60,
+        upstream=None,
+    ):
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.max_image_bytes = max_image_bytes
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        # no-cache images are still reused this long before revalidating
+        self.min_ttl = min_ttl
+        # Shared request budget (UpstreamLimits); its "images" budget is used
+        self.upstream = upstream
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=per_host_limit * 4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT})
+
+        self.lock = threading.Lock()
+        self.index = OrderedDict()  # key -> entry, least recently used first
+        self.total_bytes = 0
+        self.inflight = {}  # key -> threading.Event of the fetch in progress
+        self.host_slots = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        self._load_index()
+
+    # ---------- public API ----------
+
+    def get(self, url):
+        """Return (entry, open file) for url, fetching it upstream if needed.
+
+        The file is opened under the lock, so it stays readable even if the
+        entry is evicted while it is being streamed. Returns None when the
+        image could not be retrieved.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+        # One extra round lets a waiter take over if the leader's fetch failed
+        for _ in range(2):
+            with self.lock:
+                entry = self.index.get(key)
+                handle = self._open(entry) if entry else None
+                if entry and not handle:
+                    # Nothing left to serve or revalidate
+                    self._drop(key)
+                    entry = None
+                elif entry and entry["expires"] > time.time():
+                    self.index.move_to_end(key)
+                    self.hits += 1
+                    return entry, handle
+                elif handle:
+                    handle.close()
+
+                event = self.inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = threading.Event()
+                    self.inflight[key] = event
+
+            if not leader:
+                event.wait(self.timeout * 2)
+                continue
+
+            try:
+                return self._fetch(key, url, entry)
+            except Exception:
+                # Serve the stale copy rather than nothing if upstream is down
+                if entry:
+                    with self.lock:
+                        handle = self._open(entry)
+                    if handle:
+                        return entry, handle
+                raise
+            finally:
+                with self.lock:
+                    self.inflight.pop(key, None)
+                event.set()
+
+        return None
+
+    @staticmethod
+    def _open(entry):
+        """Open an entry's file, or None if it is gone (call with the lock held)."""
+        try:
+            return open(entry["path"], "rb")
+        except FileNotFoundError:
+            return None
+
+    def iter_file(self, handle, entry):
+        """Stream an opened cache file, cleaning up uncacheable responses."""
+        try:
+            while True:
+                chunk = handle.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            handle.close()
+            if entry.get("transient") and os.path.exists(entry["path"]):
+                os.remove(entry["path"])
+
+    def max_age(self, entry):
+        """Seconds the browser may reuse the image for."""
+        if entry.get("transient"):
+            return 0
+        return max(0, int(entry["expires"] - time.time()))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.index),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "inflight": len(self.inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+            }
+
+    # ---------- upstream ----------
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            slot = self.host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self.host_slots[host] = slot
+        return slot
+
+    def _fetch(self, key, url, stale_entry):
+        headers = {}
+        if stale_entry:
+            if stale_entry.get("etag"):
+                headers["If-None-Match"] = stale_entry["etag"]
+            if stale_entry.get("last_modified"):
+                headers["If-Modified-Since"] = stale_entry["last_modified"]
+
+        # Wait for the upstream budget before taking one of the host's slots,
+        # so a throttled budget does not hold a slot while it sleeps
+        if self.upstream:
+            self.upstream.acquire("images")
+        with self._host_slot(url):
+            try:
+                response = self.session.get(
+                    url, headers=headers, stream=True, timeout=self.timeout
+                )
+            except Exception:
+                # Timeouts and connection errors count against the budget too
+                if self.upstream:
+                    self.upstream.report("images", error=True)
+                raise
+            if self.upstream:
+                retry_after = response.headers.get("Retry-After", "")
+                self.upstream.report(
+                    "images",
+                    throttled=response.status_code == 429,
+                    retry_after=int(retry_after) if retry_after.isdigit() else None,
+                    error=response.status_code >= 400,
+                )
+            try:
+                if response.status_code == 304 and stale_entry:
+                    revalidated = self._revalidate(key, stale_entry, response.headers)
+                    if revalidated:
+                        return revalidated
+                    tmp_path = None
+                else:
+                    response.raise_for_status()
+
+                    content_type = response.headers.get("content-type", "image/jpeg")
+                    if not content_type.startswith("image/"):
+                        raise ValueError(f"Not an image: {content_type}")
+
+                    tmp_path = self._download(response)
+            finally:
+                response.close()
+
+        if tmp_path is None:
+            # Evicted while revalidating, and a 304 has no body: fetch in full
+            return self._fetch(key, url, None)
+
+        with self.lock:
+            self.misses += 1
+
+        ttl, store = self._parse_ttl(response.headers)
+        entry = {
+            "key": key,
+            "url": url,
+            "path": os.path.join(self.cache_dir, f"{key}.img"),
+            "content_type": content_type,
+            "size": os.path.getsize(tmp_path),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "expires": time.time() + ttl,
+        }
+
+        if not store:
+            # no-store: hand the file to this request only, never index it
+            entry["path"] = tmp_path
+            entry["transient"] = True
+            return entry, open(tmp_path, "rb")
+
+        with self.lock:
+            self._drop(key, keep_files=True)
+            os.replace(tmp_path, entry["path"])
+            self._write_meta(entry)
+            self.index[key] = entry
+            self.total_bytes += entry["size"]
+            # Opened before evicting, which may drop an oversized entry at once
+            handle = open(entry["path"], "rb")
+            self._evict()
+
+        return entry, handle
+
+    def _revalidate(self, key, entry, headers):
+        """Extend an entry after a 304; (entry, open file) or None if its file is gone."""
+        ttl, _ = self._parse_ttl(headers)
+        with self.lock:
+            handle = self._open(entry)
+            if not handle:
+                self._drop(key)
+                return None
+            entry["expires"] = time.time() + ttl
+            self.revalidated += 1
+            if key in self.index:
+                self.index.move_to_end(key)
+        self._write_meta(entry)
+        return entry, handle
+
+    def _download(self, response):
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_image_bytes:
+            raise ValueError("Image too large")
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > self.max_image_bytes:
+                        raise ValueError("Image too large")
+                    f.write(chunk)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _parse_ttl(self, headers):
+        """Return (ttl_seconds, storable) from upstream cache headers."""
+        cache_control = headers.get("Cache-Control", "").lower()
+        directives = [d.strip() for d in cache_control.split(",") if d.strip()]
+
+        if "no-store" in directives or "private" in directives:
+            return 0, False
+        if "no-cache" in directives:
+            return self.min_ttl, True
+
+        for directive in directives:
+            match = re.match(r"(?:s-)?max-age=(\d+)", directive)
+            if match:
+                return min(int(match.group(1)), self.max_ttl), True
+
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                expires_at = parsedate_to_datetime(expires).timestamp()
+                date = headers.get("Date")
+                now = parsedate_to_datetime(date).timestamp() if date else time.time()
+                return min(max(0, int(expires_at - now)), self.max_ttl), True
+            except (TypeError, ValueError):
+                return 0, True
+
+        return self.default_ttl, True
+
+    # ---------- disk index ----------
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _write_meta(self, entry):
+        meta_path = self._meta_path(entry["key"])
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+
+    def _load_index(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if filename.endswith((".part", ".tmp")):
+                # Leftovers from an interrupted fetch
+                os.remove(path)
+                continue
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if not os.path.exists(entry["path"]):
+                    os.remove(path)
+                    continue
+                entries.append((os.path.getmtime(path), entry))
+            except Exception:
+                continue
+
+        entries.sort(key=lambda e: e[0])
+        for _, entry in entries:
+            self.index[entry["key"]] = entry
+            self.total_bytes += entry["size"]
+
+        with self.lock:
+            self._evict()
+
+    def _drop(self, key, keep_files=False):
+        """Remove an entry from the index (lock must be held)."""
+        entry = self.index.pop(key, None)
+        if not entry:
+            return
+        self.total_bytes -= entry["size"]
+        if keep_files:
+            return
+        for path in (entry["path"], self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Evict least recently used entries until under budget (lock held)."""
+        while self.total_bytes > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            self._drop(key)
@@ -11,6 +11,7 @@ from mutagen.mp4 import MP4
 from mutagen.flac import FLAC
 from mutagen.flac import Picture
 from mutagen.id3 import ID3, TIT2, TPE1, TALB, TYER, TDRC, APIC
+from downloader.ratelimit import UPSTREAM
 
 
 def update_audio_metadata(file_path, metadata):
@@ -225,6 +226,12 @@ def embed_artwork_from_file(file_path, artwork_file):
         return False
 
 
+def _get_image(url, headers):
+    response = requests.get(url, headers=headers, stream=True, timeout=30)
+    response.raise_for_status()
+    return response
+
+
 def embed_artwork_from_url(file_path, url):
     """Embed artwork from URL"""
     try:
@@ -234,8 +241,7 @@ def embed_artwork_from_url(file_path, url):
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        response = requests.get(url, headers=headers, stream=True, timeout=30)
-        response.raise_for_status()
+        response = UPSTREAM.call("images", _get_image, url, headers)
 
         # Check content type
         content_type = response.headers.get("content-type", "")
@@ -1,5 +1,8 @@
 import os
 import json
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 
@@ -84,3 +87,93 @@ class MigrationLogger:
         except Exception as e:
             print(f"Error logging Migration: {e}")
             return False
+
+
+class PendingChoiceStore:
+    """
+    Persistent queue of migration files waiting for a manual match choice.
+    Entries are keyed by file path so re-running a migration replaces the
+    previous entry for the same file instead of duplicating it.
+    """
+
+    def __init__(self, migrate_dir):
+        self.migrate_dir = migrate_dir
+        self.path = os.path.join(migrate_dir, "pending_choices.json")
+        self.lock = threading.Lock()
+        os.makedirs(migrate_dir, exist_ok=True)
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return OrderedDict((e["id"], e) for e in json.load(f))
+        except Exception as e:
+            print(f"Error loading pending choices: {e}")
+            return OrderedDict()
+
+    def _save(self):
+        """Write atomically so a crash never leaves a truncated queue"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self.entries.values()), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def choice_id(file_path):
+        return hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:16]
+
+    def add(self, entry):
+        """Queue an entry and return its id"""
+        entry = dict(entry)
+        entry["id"] = self.choice_id(entry["file"])
+        entry.setdefault("created", datetime.now().isoformat())
+        with self.lock:
+            self.entries.pop(entry["id"], None)
+            self.entries[entry["id"]] = entry
+            self._save()
+        return entry["id"]
+
+    def get(self, choice_id):
+        with self.lock:
+            entry = self.entries.get(choice_id)
+            return dict(entry) if entry else None
+
+    def update(self, choice_id, **fields):
+        with self.lock:
+            entry = self.entries.get(choice_id)
+            if not entry:
+                return None
+            entry.update(fields)
+            self._save()
+            return dict(entry)
+
+    def remove(self, choice_id):
+        with self.lock:
+            if self.entries.pop(choice_id, None) is None:
+                return False
+            self._save()
+            return True
+
+    def ids(self, migration_id=None):
+        with self.lock:
+            return [
+                e["id"]
+                for e in self.entries.values()
+                if migration_id is None or e.get("migration_id") == migration_id
+            ]
+
+    def list(self, offset=0, limit=30, migration_id=None):
+        """Return (page, total) in queue order"""
+        with self.lock:
+            entries = [
+                dict(e)
+                for e in self.entries.values()
+                if migration_id is None or e.get("migration_id") == migration_id
+            ]
+        return entries[offset : offset + limit], len(entries)
+
+    def count(self):
+        with self.lock:
+            return len(self.entries)
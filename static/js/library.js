@@ -252,12 +252,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
     if (cache && cache.items.length > 0) {
       renderLibrary(cache.items, true);
-
-      libraryMeta.textContent =
-        `${cache.items.length} / ${cache.totalCount} tracks` +
-        ` [${cache.totalDuration} listening time]`;
-
-      librarySize.textContent = cache.totalSize;
+      renderPlaylistMeta(cache);
     } else {
       loadPlaylistPage(true);
     }
@@ -318,17 +313,12 @@ document.addEventListener("DOMContentLoaded", () => {
         cache.cacheAge = data.cache_age;
       }
 
-      const cacheInfo =
-        cache.cacheAge != null
-          ? ` • cache ${formatCacheAge(cache.cacheAge)} ago`
-          : "";
-
-      libraryMeta.textContent =
-        `${cache.items.length} / ${cache.totalCount} tracks ` +
-        `[${cache.totalDuration} listening time]` +
-        cacheInfo;
+      cache.totalsPending = data.totals_pending;
+      renderPlaylistMeta(cache);
 
-      librarySize.textContent = `${cache.totalSize}`;
+      if (data.totals_pending) {
+        pollPlaylistTotals(currentPlaylist, cache);
+      }
 
       renderLibrary(cache.items.slice(-data.items.length)); // Only render new items
     } catch (e) {
@@ -338,6 +328,58 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  function renderPlaylistMeta(cache) {
+    const cacheInfo =
+      cache.cacheAge != null
+        ? ` • cache ${formatCacheAge(cache.cacheAge)} ago`
+        : "";
+
+    const duration = cache.totalsPending
+      ? "calculating…"
+      : `${cache.totalDuration} listening time`;
+
+    libraryMeta.textContent =
+      `${cache.items.length} / ${cache.totalCount} tracks ` +
+      `[${duration}]` +
+      cacheInfo;
+
+    librarySize.textContent = cache.totalsPending ? "" : `${cache.totalSize}`;
+  }
+
+  // Totals are computed server-side after the first page is returned
+  async function pollPlaylistTotals(playlistName, cache) {
+    if (cache.totalsPolling) return;
+    cache.totalsPolling = true;
+
+    try {
+      while (cache.totalsPending) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+
+        const res = await fetch(
+          `/playlist/${encodeURIComponent(playlistName)}/totals?` +
+            `audioDir=${encodeURIComponent(audioDir)}` +
+            `&playlistDir=${encodeURIComponent(playlistDir)}`,
+        );
+        if (!res.ok) break;
+
+        const data = await res.json();
+        if (!data.pending) {
+          cache.totalsPending = false;
+          cache.totalSize = data.total_size;
+          cache.totalDuration = data.total_duration;
+        }
+      }
+    } catch (e) {
+      console.error("Error loading playlist totals:", e);
+    } finally {
+      cache.totalsPolling = false;
+    }
+
+    if (mode === "playlist" && currentPlaylist === playlistName) {
+      renderPlaylistMeta(cache);
+    }
+  }
+
   async function loadLibrary(reset = false, source = "all") {
     if (searchInput.value.trim() !== "") return;
     if (loading) return;
@@ -369,7 +411,7 @@ document.addEventListener("DOMContentLoaded", () => {
           playlistDir = prefs.playlistDir;
           lyricsDir = prefs.lyricsDir;
         }
-        endpoint = `/library?dir=${encodeURIComponent(audioDir)}&lyricsDir=${encodeURIComponent(lyricsDir)}&offset=${cache.offset}&limit=${limit}&reset=${reset}`;
+        endpoint = `/library?dir=${encodeURIComponent(audioDir)}&lyricsDir=${encodeURIComponent(lyricsDir)}&playlistDir=${encodeURIComponent(playlistDir || "")}&offset=${cache.offset}&limit=${limit}&reset=${reset}`;
       }
 
       const res = await fetch(endpoint);
@@ -669,6 +711,7 @@ document.addEventListener("DOMContentLoaded", () => {
     year: document.getElementById("info-year"),
     fileFormat: document.getElementById("info-format"),
     path: document.getElementById("info-path"),
+    playlists: document.getElementById("info-playlists"),
   };
 
   const failedFields = {
@@ -786,6 +829,9 @@ document.addEventListener("DOMContentLoaded", () => {
       infoFields.year.textContent = entry.year || "";
       infoFields.fileFormat.textContent = entry.format?.toUpperCase() || "—";
       infoFields.path.textContent = entry.path;
+      infoFields.playlists.textContent = entry.playlists?.length
+        ? entry.playlists.join(", ")
+        : "—";
     }
   }
 
@@ -22,6 +22,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const playlistDirInput = document.getElementById("playlist-migrate-dir");
   const matchThresholdInput = document.getElementById("strong-match-threshold");
   const fallbackInput = document.getElementById("fallback-policy");
+  const offlineInput = document.getElementById("migrate-offline");
 
   const migrateBtn = document.getElementById("start-migration-btn");
 
@@ -44,6 +45,47 @@ document.addEventListener("DOMContentLoaded", () => {
 
   loadPreferences();
 
+  const reviewPendingBtn = document.getElementById("review-pending-btn");
+  const acceptBestPendingBtn = document.getElementById(
+    "accept-best-pending-btn",
+  );
+  const skipPendingBtn = document.getElementById("skip-pending-btn");
+
+  async function resolveAllPending(action) {
+    try {
+      const response = await fetch("/migrate/choice", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ all: true, action }),
+      });
+      const data = await response.json();
+      const results = data.results || [];
+      const failed = results.filter((r) => r.status === "error").length;
+      addLog(
+        `[MIGRATION] Resolved ${results.length - failed} pending choices (${failed} failed)`,
+      );
+    } catch (error) {
+      addLog(`[ERROR] ${error.message}`, "error");
+    }
+    window.App.loadPendingChoices();
+  }
+
+  reviewPendingBtn.addEventListener("click", () =>
+    window.App.openPendingChoices(),
+  );
+  acceptBestPendingBtn.addEventListener("click", () => {
+    if (confirm("Use the highest scoring match for every pending file?")) {
+      resolveAllPending("best");
+    }
+  });
+  skipPendingBtn.addEventListener("click", () => {
+    if (confirm("Skip every pending file?")) {
+      resolveAllPending("skip");
+    }
+  });
+
+  window.App.loadPendingChoices();
+
   migrateBtn.addEventListener("click", async () => {
     const match_perc = matchThresholdInput.value;
     const fallback = fallbackInput.value;
@@ -81,6 +123,7 @@ document.addEventListener("DOMContentLoaded", () => {
           playlist_dir: playlistDir,
           match_perc: match_perc,
           fallback: fallback,
+          offline: offlineInput.checked,
         }),
       });
 
@@ -93,6 +93,8 @@ document.addEventListener("DOMContentLoaded", () => {
       { tag: "[download]", type: "download" },
       { tag: "[ExtractAudio]", type: "convert" },
       { tag: "[Convert]", type: "convert" },
+      { tag: "[TRANSCODE]", type: "convert" },
+      { tag: "[FETCH]", type: "download" },
       { tag: "[SUCCESS]", type: "success" },
       { tag: "[FIX PLAYLIST COMPLETE]", type: "success" },
       { tag: "[FIX PLAYLIST SUMMARY]", type: "lyrics" },
@@ -158,18 +160,95 @@ document.addEventListener("DOMContentLoaded", () => {
   const moveProgressBar = document.getElementById("move-progress-bar");
   const moveTitle = document.getElementById("move-title");
 
+  const planMoveBtn = document.getElementById("plan-move-btn");
+  const movePlanDiv = document.getElementById("move-plan");
+  const movePlanBody = document.getElementById("move-plan-body");
+  const movePlanEstimate = document.getElementById("move-plan-estimate");
+
+  function getMoveOptions() {
+      return {
+          source_audio: document.getElementById("move-audio-source").value,
+          source_lyrics: document.getElementById("move-lyrics-source").value,
+          source_playlists: document.getElementById("move-playlists-source").value,
+          dest_audio: document.getElementById("move-audio-dest").value,
+          dest_lyrics: document.getElementById("move-lyrics-dest").value,
+          dest_playlists: document.getElementById("move-playlists-dest").value,
+          process_audio: document.getElementById("move-audio-enabled").checked,
+          process_lyrics: document.getElementById("move-lyrics-enabled").checked,
+          process_playlists: document.getElementById("move-playlists-enabled").checked,
+          update_playlists: document.getElementById("move-update-playlists").checked,
+          mode: document.getElementById("move-mode").value,
+      };
+  }
+
+  function formatPlanBytes(bytes) {
+      const units = ["B", "KB", "MB", "GB", "TB"];
+      let i = 0;
+      while (bytes >= 1024 && i < units.length - 1) {
+          bytes /= 1024;
+          i++;
+      }
+      return `${bytes.toFixed(i ? 1 : 0)} ${units[i]}`;
+  }
+
+  function formatPlanDuration(seconds) {
+      if (seconds == null) return "unknown";
+      if (seconds < 60) return `${Math.ceil(seconds)}s`;
+      const minutes = Math.round(seconds / 60);
+      return minutes < 60
+          ? `${minutes}m`
+          : `${Math.floor(minutes / 60)}h ${minutes % 60}m`;
+  }
+
+  function renderMovePlan(plan) {
+      const free = plan.destinations
+          .map((d) => `${d.path}: ${formatPlanBytes(d.free_bytes)} free`)
+          .join("<br>");
+      const playlists = Object.entries(plan.playlist_updates)
+          .map(([name, count]) => `${name} (${count})`)
+          .join(", ");
+
+      movePlanEstimate.textContent = `~${formatPlanDuration(plan.estimated_seconds)}`;
+      movePlanBody.innerHTML = `
+          <div>Files: ${plan.files.audio} audio, ${plan.files.lyrics} lyrics, ${plan.files.playlists} playlists
+              (${formatPlanBytes(plan.total_bytes)})</div>
+          <div>To copy: ${formatPlanBytes(plan.bytes_to_copy)}
+              • renames: ${plan.renames} • unchanged: ${plan.unchanged}</div>
+          <div>Conflicts (would be overwritten): ${plan.conflict_count}</div>
+          <div>Playlist entries to rewrite: ${plan.playlist_entries}${playlists ? ` — ${playlists}` : ""}</div>
+          <div class="${plan.enough_space ? "" : "warning"}">${free}${plan.enough_space ? "" : "<br>⚠️ Not enough free space"}</div>
+          <small class="text-muted">Throughput: ${plan.throughput_bytes_per_sec ? `${formatPlanBytes(plan.throughput_bytes_per_sec)}/s (${plan.throughput_source})` : "unknown"}</small>
+      `;
+      movePlanDiv.style.display = "block";
+  }
+
+  planMoveBtn.addEventListener("click", async () => {
+      planMoveBtn.disabled = true;
+      planMoveBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Planning...';
+
+      try {
+          const response = await fetch("/move_copy/start", {
+              method: "POST",
+              headers: { "Content-Type": "application/json" },
+              body: JSON.stringify({ ...getMoveOptions(), dry_run: true }),
+          });
+          const data = await response.json();
+          if (!response.ok || !data.plan) {
+              throw new Error(data.error || "Dry run failed");
+          }
+          renderMovePlan(data.plan);
+      } catch (error) {
+          console.error("Move/copy dry run error:", error);
+          if (window.App && window.App.addLog) {
+              window.App.addLog(`[ERROR] ${error.message}`, "error");
+          }
+      } finally {
+          planMoveBtn.disabled = false;
+          planMoveBtn.innerHTML = '<i class="fas fa-clipboard-list"></i> Dry Run';
+      }
+  });
+
   startMoveBtn.addEventListener("click", async () => {
-      const sourceAudio = document.getElementById("move-audio-source").value;
-      const sourceLyrics = document.getElementById("move-lyrics-source").value;
-      const sourcePlaylists = document.getElementById("move-playlists-source").value;
-      const destAudio = document.getElementById("move-audio-dest").value;
-      const destLyrics = document.getElementById("move-lyrics-dest").value;
-      const destPlaylists = document.getElementById("move-playlists-dest").value;
-      const processAudio = document.getElementById("move-audio-enabled").checked;
-      const processLyrics = document.getElementById("move-lyrics-enabled").checked;
-      const processPlaylists = document.getElementById("move-playlists-enabled").checked;
-      const updatePlaylists = document.getElementById("move-update-playlists").checked;
-      const mode = document.getElementById("move-mode").value;
       const saveLogs = document.getElementById("save-logs-toggle").checked;
 
       startMoveBtn.disabled = true;
@@ -185,17 +264,7 @@ document.addEventListener("DOMContentLoaded", () => {
               method: "POST",
               headers: { "Content-Type": "application/json" },
               body: JSON.stringify({
-                  source_audio: sourceAudio,
-                  source_lyrics: sourceLyrics,
-                  source_playlists: sourcePlaylists,
-                  dest_audio: destAudio,
-                  dest_lyrics: destLyrics,
-                  dest_playlists: destPlaylists,
-                  process_audio: processAudio,
-                  process_lyrics: processLyrics,
-                  process_playlists: processPlaylists,
-                  update_playlists: updatePlaylists,
-                  mode: mode,
+                  ...getMoveOptions(),
                   save_logs: saveLogs,
               }),
           });
@@ -919,6 +988,8 @@ document.addEventListener("DOMContentLoaded", () => {
       { tag: "[download]", type: "download" },
       { tag: "[ExtractAudio]", type: "convert" },
       { tag: "[Convert]", type: "convert" },
+      { tag: "[TRANSCODE]", type: "convert" },
+      { tag: "[FETCH]", type: "download" },
       { tag: "[SUCCESS]", type: "success" },
       { tag: "[WARNING]", type: "warning" },
       { tag: "[ERROR]", type: "error" },
@@ -1150,20 +1221,90 @@ document.addEventListener("DOMContentLoaded", () => {
     return null;
   }
 
-  function showMatchModal(payload, migrationId) {
+  // Pending migration choices live server-side and can be answered in any
+  // order; the modal pages through them 50 at a time.
+  const PENDING_PAGE = 50;
+  const pending = { items: [], offset: 0, total: 0, index: 0 };
+  const matchPosition = document.getElementById("match-position");
+  const matchPrev = document.getElementById("match-prev");
+  const matchNext = document.getElementById("match-next");
+  const matchLater = document.getElementById("match-later");
+
+  function updatePendingCount(total) {
+    pending.total = total;
+    const count = document.getElementById("pending-choices-count");
+    const panel = document.getElementById("pending-choices");
+    if (count) count.textContent = total;
+    if (panel) panel.style.display = total > 0 ? "block" : "none";
+  }
+
+  async function loadPendingChoices(offset = 0) {
+    const response = await fetch(
+      `/migrate/pending?offset=${offset}&limit=${PENDING_PAGE}`,
+    );
+    const data = await response.json();
+    pending.items = data.items || [];
+    pending.offset = offset;
+    updatePendingCount(data.total || 0);
+    return pending;
+  }
+
+  async function showPendingChoice(index) {
+    if (pending.total === 0) {
+      closeMatchModal();
+      return;
+    }
+    index = Math.max(0, Math.min(index, pending.total - 1));
+
+    if (
+      index < pending.offset ||
+      index >= pending.offset + pending.items.length
+    ) {
+      await loadPendingChoices(Math.floor(index / PENDING_PAGE) * PENDING_PAGE);
+      if (!pending.items.length) {
+        closeMatchModal();
+        return;
+      }
+      index = Math.min(index, pending.offset + pending.items.length - 1);
+    }
+
+    pending.index = index;
+    showMatchModal(pending.items[index - pending.offset]);
+  }
+
+  async function openPendingChoices() {
+    await loadPendingChoices(0);
+    showPendingChoice(0);
+  }
+
+  function closeMatchModal() {
+    modal.classList.add("hidden");
+    overlay.classList.add("hidden");
+  }
+
+  matchPrev.onclick = () => showPendingChoice(pending.index - 1);
+  matchNext.onclick = () => showPendingChoice(pending.index + 1);
+  matchLater.onclick = closeMatchModal;
+
+  function showMatchModal(payload) {
     modal.classList.remove("hidden");
     overlay.classList.remove("hidden", "closing");
     list.innerHTML = "";
 
+    const choiceId = payload.choice_id || payload.id;
+
     desc.textContent = `${payload.title} — ${payload.artist}`;
+    matchPosition.textContent = `${pending.index + 1} / ${pending.total}`;
+    matchPrev.disabled = pending.index <= 0;
+    matchNext.disabled = pending.index >= pending.total - 1;
 
     payload.candidates.forEach((c) => {
       const btn = document.createElement("button");
       btn.className = "match-item";
-      btn.onclick = () => submitChoice(migrationId, "select", c.videoId);
+      btn.onclick = () => submitChoice(choiceId, "select", c.videoId);
 
       btn.innerHTML = `
-      <img class="match-thumb" src="${c.thumbnail}">
+      <img class="match-thumb" src="${c.thumbnail ? `/proxy-image?url=${encodeURIComponent(c.thumbnail)}` : ""}">
       <div class="match-meta">
         <div class="match-title">${c.title}</div>
         <div class="match-artists">${c.artists.join(", ")}</div>
@@ -1180,9 +1321,7 @@ document.addEventListener("DOMContentLoaded", () => {
       list.appendChild(btn);
     });
 
-    skipBtn.onclick = () => submitChoice(migrationId, "skip");
-
-    console.log(payload);
+    skipBtn.onclick = () => submitChoice(choiceId, "skip");
 
     const manualWrapper = document.getElementById("manual-video-wrapper");
     const manualInput = document.getElementById("manual-video-id");
@@ -1205,11 +1344,11 @@ document.addEventListener("DOMContentLoaded", () => {
       if (payload.search_filter === "songs") {
         researchVideosBtn.style.display = "inline-flex";
         researchVideosBtn.onclick = () =>
-          submitChoice(migrationId, "research_videos");
+          submitChoice(choiceId, "research_videos");
       } else {
         researchSongsBtn.style.display = "inline-flex";
         researchSongsBtn.onclick = () =>
-          submitChoice(migrationId, "research_songs");
+          submitChoice(choiceId, "research_songs");
       }
     }
     /* show manual option when allowed */
@@ -1226,24 +1365,47 @@ document.addEventListener("DOMContentLoaded", () => {
           return;
         }
 
-        submitChoice(migrationId, "manual", videoId);
+        submitChoice(choiceId, "manual", videoId);
       };
     }
   }
 
-  async function submitChoice(migrationId, action, videoId = null) {
-    await fetch("/migrate/choice", {
+  async function submitChoice(choiceId, action, videoId = null) {
+    const response = await fetch("/migrate/choice", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({
-        migration_id: migrationId,
+        choice_id: choiceId,
         action,
         video_id: videoId,
       }),
     });
+    const data = await response.json();
 
-    modal.classList.add("hidden");
-    overlay.classList.add("hidden");
+    // A running migration already mirrors these lines into its stream
+    if (!eventSource) {
+      (data.logs || []).forEach((line) => addLog(line));
+    }
+    if (data.error) {
+      addLog(`[ERROR] ${data.error}`, "error");
+    }
+
+    if (data.status === "updated" && data.choice) {
+      pending.items[pending.index - pending.offset] = data.choice;
+      showMatchModal(data.choice);
+      return;
+    }
+
+    if (data.status === "error") {
+      showPendingChoice(pending.index + 1);
+      return;
+    }
+
+    pending.items.splice(pending.index - pending.offset, 1);
+    updatePendingCount(
+      data.pending !== undefined ? data.pending : Math.max(0, pending.total - 1),
+    );
+    showPendingChoice(pending.index);
   }
 
   // Start listening to the log stream
@@ -1256,7 +1418,11 @@ document.addEventListener("DOMContentLoaded", () => {
       try {
         const parsed = JSON.parse(event.data);
         if (parsed.type === "choice") {
-          showMatchModal(parsed, downloadId);
+          // Queued server-side; the migration keeps running meanwhile
+          updatePendingCount(parsed.pending);
+          if (modal.classList.contains("hidden")) {
+            openPendingChoices();
+          }
           return;
         }
       } catch (_) {}
@@ -1414,6 +1580,8 @@ document.addEventListener("DOMContentLoaded", () => {
     closeEventSource,
     disableManagementTab,
     enableManagementTab,
+    loadPendingChoices,
+    openPendingChoices,
     getCurrentDownloadId: () => currentDownloadId,
     setCurrentDownloadId: (id) => (currentDownloadId = id),
     logOutput,
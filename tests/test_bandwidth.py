@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader.bandwidth import BandwidthController  # noqa: E402
+from downloader.jobs import JobCancelled  # noqa: E402
+
+
+class BandwidthControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.controller = BandwidthController(
+            os.path.join(self.root, "bandwidth.json"), global_limit=1_000_000
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _run_slots(self, job_ids, hold=0.02):
+        """Open a slot per job id concurrently; returns the peak sums of limits"""
+        lock = threading.Lock()
+        held = {}
+        peaks = {"global": 0}
+
+        def download(job_id):
+            with self.controller.slot(job_id) as limit:
+                with lock:
+                    held[threading.get_ident()] = (job_id, limit)
+                    peaks["global"] = max(peaks["global"], sum(l for _, l in held.values()))
+                    for job in set(j for j, _ in held.values()):
+                        total = sum(l for j, l in held.values() if j == job)
+                        peaks[job] = max(peaks.get(job, 0), total)
+                time.sleep(hold)
+                with lock:
+                    del held[threading.get_ident()]
+
+        threads = [threading.Thread(target=download, args=(job_id,)) for job_id in job_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        return peaks
+
+    def test_concurrent_limits_stay_within_global_cap(self):
+        peaks = self._run_slots(["a", "b", "c"] * 4)
+        self.assertGreater(peaks["global"], 0)
+        self.assertLessEqual(peaks["global"], 1_000_000)
+        self.assertEqual(self.controller.status()["reserved"], {})
+
+    def test_concurrent_limits_stay_within_job_cap(self):
+        self.controller.configure(job_limits={"a": 200_000})
+        peaks = self._run_slots(["a"] * 6 + ["b"] * 3)
+        self.assertLessEqual(peaks["a"], 200_000)
+        self.assertLessEqual(peaks["global"], 1_000_000)
+
+    def test_second_job_waits_until_first_releases(self):
+        with self.controller.slot("a") as first:
+            self.assertEqual(first, 1_000_000)
+            granted = []
+            thread = threading.Thread(
+                target=lambda: granted.append(self.controller.slot("b").__enter__())
+            )
+            thread.start()
+            thread.join(timeout=0.3)
+            self.assertEqual(granted, [])
+        thread.join(timeout=5)
+        self.assertEqual(granted, [1_000_000])
+
+    def test_checkpoint_stops_the_wait(self):
+        def cancelled():
+            raise JobCancelled()
+
+        with self.controller.slot("a"):
+            with self.assertRaises(JobCancelled):
+                with self.controller.slot("b", checkpoint=cancelled):
+                    pass
+        self.assertEqual(self.controller.status()["active"], {})
+
+    def test_unlimited_without_caps(self):
+        self.controller.configure(global_limit=0)
+        with self.controller.slot("a") as first, self.controller.slot("a") as second:
+            self.assertEqual((first, second), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
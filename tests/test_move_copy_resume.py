@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# DownloadManager keeps its state under the home directory
+HOME = tempfile.mkdtemp()
+os.environ["HOME"] = HOME
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader.download import DownloadManager  # noqa: E402
+from downloader.jobs import JobCancelled  # noqa: E402
+
+
+class MoveCopyResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.src = os.path.join(self.root, "src")
+        self.dst = os.path.join(self.root, "dst")
+        for sub in ("audio", "lyrics", "playlists"):
+            os.makedirs(os.path.join(self.src, sub))
+
+        tracks = []
+        for i in range(3):
+            path = os.path.join(self.src, "audio", f"t{i}.mp3")
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            tracks.append(path)
+        with open(os.path.join(self.src, "playlists", "p.m3u"), "w") as f:
+            f.write("#EXTM3U\n" + "\n".join(tracks) + "\n")
+
+        self.manager = DownloadManager()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _run(self, operation_id):
+        args = [os.path.join(self.src, sub) for sub in ("audio", "lyrics", "playlists")]
+        args += [os.path.join(self.dst, sub) for sub in ("audio", "lyrics", "playlists")]
+        self.manager.start_move_copy(
+            operation_id, *args, True, True, True, True, "move"
+        )
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            job = self.manager.jobs.get(operation_id)
+            if job and job["state"] in ("finished", "failed", "cancelled"):
+                return job["state"]
+            time.sleep(0.05)
+        self.fail(f"{operation_id} did not finish")
+
+    def test_resume_after_cancel_rewrites_moved_playlists(self):
+        update_references = self.manager._update_playlist_references
+
+        def cancel_after_transfer(*args, **kwargs):
+            # Files are moved; the job stops before references are updated
+            self.manager.jobs.cancel("move-1")
+            raise JobCancelled()
+
+        self.manager._update_playlist_references = cancel_after_transfer
+        self.assertEqual(self._run("move-1"), "cancelled")
+
+        playlist = os.path.join(self.dst, "playlists", "p.m3u")
+        self.assertTrue(os.path.exists(playlist))
+        self.assertFalse(os.path.exists(os.path.join(self.src, "playlists", "p.m3u")))
+
+        self.manager._update_playlist_references = update_references
+        self.assertEqual(self._run("move-2"), "finished")
+
+        with open(playlist) as f:
+            entries = [line.strip() for line in f if not line.startswith("#")]
+        self.assertEqual(
+            entries,
+            [os.path.join(self.dst, "audio", f"t{i}.mp3") for i in range(3)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()